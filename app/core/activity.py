@@ -0,0 +1,34 @@
+from typing import List, Literal
+
+import numpy as np
+
+# ---
+# Activity histograms computed from the hourly ActivityBucket counters written at
+# ingest (see ListingBatch.activity_columns): re-binning a few thousand hourly
+# buckets replaces a scan of every communication. All times are UTC.
+# ---
+
+Granularity = Literal["hour", "day", "weekday"]
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def activity_histogram(hours: np.ndarray, calls: np.ndarray, sms: np.ndarray, granularity: Granularity) -> List[dict]:
+    """
+    Re-bins hourly counters (`hours` as datetime64[h]). "hour" and "day" return the
+    non-empty bins in time order; "weekday" always returns the 7 days, Monday first.
+    """
+    if granularity == "weekday":
+        # 1970-01-01 was a Thursday (weekday 3, Monday being 0).
+        bins = (hours.astype("datetime64[D]").astype(np.int64) + 3) % 7
+        labels = np.array(WEEKDAYS)
+        index = np.arange(7)
+    else:
+        bins = hours.astype("datetime64[D]" if granularity == "day" else "datetime64[h]")
+        index, bins = np.unique(bins, return_inverse=True)
+        labels = np.datetime_as_string(index.astype("datetime64[s]"), unit="s")
+    bin_calls = np.bincount(bins, weights=calls, minlength=len(index)).astype(np.int64)
+    bin_sms = np.bincount(bins, weights=sms, minlength=len(index)).astype(np.int64)
+    return [
+        {"bucket": label, "calls": call_count, "sms": sms_count, "total": call_count + sms_count}
+        for label, call_count, sms_count in zip(labels.tolist(), bin_calls.tolist(), bin_sms.tolist())
+    ]
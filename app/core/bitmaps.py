@@ -0,0 +1,144 @@
+from typing import Iterable, List
+
+import numpy as np
+
+# ---
+# Roaring-style compressed bitmaps of uint32 ids, in NumPy. Ids are grouped by
+# their high 16 bits; each group ("container") holds the low 16 bits either as a
+# sorted uint16 array, while it has at most ARRAY_MAX_SIZE ids, or as a 65536-bit
+# bitmap of 1024 uint64 words once it is denser. Sparse groups cost 2 bytes per
+# id and dense ones a flat 8 KiB, and set operations run container by container.
+# ---
+
+ARRAY_MAX_SIZE = 4096
+BITMAP_WORDS = 1024
+_EMPTY_ARRAY = np.empty(0, dtype=np.uint16)
+
+
+def _is_bitmap(container: np.ndarray) -> bool:
+    return container.dtype == np.uint64
+
+
+def _to_bitmap(container: np.ndarray) -> np.ndarray:
+    if _is_bitmap(container):
+        return container
+    bits = np.zeros(BITMAP_WORDS * 64, dtype=bool)
+    bits[container] = True
+    return np.packbits(bits, bitorder="little").view("<u8").astype(np.uint64)
+
+
+def _to_array(container: np.ndarray) -> np.ndarray:
+    if not _is_bitmap(container):
+        return container
+    bits = np.unpackbits(container.astype("<u8").view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _cardinality(container: np.ndarray) -> int:
+    if _is_bitmap(container):
+        return int(np.bitwise_count(container).sum())
+    return len(container)
+
+
+def _normalize(container: np.ndarray) -> np.ndarray:
+    """Stores a container in its smaller form."""
+    if _is_bitmap(container):
+        return _to_array(container) if _cardinality(container) <= ARRAY_MAX_SIZE else container
+    return _to_bitmap(container) if len(container) > ARRAY_MAX_SIZE else container
+
+
+def _contains(bitmap: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Which of the uint16 `values` are set in a bitmap container."""
+    values = values.astype(np.uint64)
+    return (bitmap[values >> np.uint64(6)] >> (values & np.uint64(63))) & np.uint64(1) == 1
+
+
+def _and(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _is_bitmap(a) and _is_bitmap(b):
+        return _normalize(a & b)
+    if _is_bitmap(a):
+        a, b = b, a
+    if _is_bitmap(b):
+        return a[_contains(b, a)]
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def _or(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _is_bitmap(a) or _is_bitmap(b):
+        return _to_bitmap(a) | _to_bitmap(b)
+    return _normalize(np.union1d(a, b))
+
+
+def _and_not(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if _is_bitmap(a):
+        return _normalize(a & ~_to_bitmap(b))
+    if _is_bitmap(b):
+        return a[~_contains(b, a)]
+    return np.setdiff1d(a, b, assume_unique=True)
+
+
+class CompressedBitmap:
+    """An immutable set of uint32 ids. `keys` are the sorted high halves, one per container."""
+
+    __slots__ = ("keys", "containers")
+
+    def __init__(self, keys: np.ndarray = None, containers: List[np.ndarray] = None):
+        self.keys = keys if keys is not None else np.empty(0, dtype=np.uint16)
+        self.containers = containers or []
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "CompressedBitmap":
+        ids = np.unique(np.asarray(ids, dtype=np.uint32))
+        high = (ids >> 16).astype(np.uint16)
+        keys, starts = np.unique(high, return_index=True)
+        bounds = np.append(starts, len(ids))
+        low = (ids & 0xFFFF).astype(np.uint16)
+        return cls(keys, [_normalize(low[start:end]) for start, end in zip(bounds[:-1], bounds[1:])])
+
+    def __len__(self) -> int:
+        return sum(_cardinality(container) for container in self.containers)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + sum(container.nbytes for container in self.containers)
+
+    def to_array(self) -> np.ndarray:
+        """The ids in increasing order."""
+        if not self.containers:
+            return np.empty(0, dtype=np.uint32)
+        return np.concatenate([
+            (np.uint32(key) << np.uint32(16)) | _to_array(container).astype(np.uint32)
+            for key, container in zip(self.keys.tolist(), self.containers)
+        ])
+
+    def _combine(self, other: "CompressedBitmap", operation, keep_left: bool, keep_right: bool) -> "CompressedBitmap":
+        """
+        Applies `operation` to the containers both bitmaps have; containers only one
+        of them has are kept as they are when keep_left/keep_right say so.
+        """
+        left = dict(zip(self.keys.tolist(), self.containers))
+        right = dict(zip(other.keys.tolist(), other.containers))
+        keys, containers = [], []
+        for key in sorted(left.keys() | right.keys()):
+            if key in left and key in right:
+                container = operation(left[key], right[key])
+            elif key in left:
+                container = left[key] if keep_left else _EMPTY_ARRAY
+            else:
+                container = right[key] if keep_right else _EMPTY_ARRAY
+            if _cardinality(container):
+                keys.append(key)
+                containers.append(container)
+        return CompressedBitmap(np.array(keys, dtype=np.uint16), containers)
+
+    def __and__(self, other: "CompressedBitmap") -> "CompressedBitmap":
+        return self._combine(other, _and, keep_left=False, keep_right=False)
+
+    def __or__(self, other: "CompressedBitmap") -> "CompressedBitmap":
+        return self._combine(other, _or, keep_left=True, keep_right=True)
+
+    def __sub__(self, other: "CompressedBitmap") -> "CompressedBitmap":
+        return self._combine(other, _and_not, keep_left=True, keep_right=False)
+
+    def intersection_count(self, other: "CompressedBitmap") -> int:
+        return len(self & other)
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from neo4j import Session
+
+from app.crud import graph_crud
+
+# ---
+# Co-location: subscribers whose communications went through the same cell tower
+# within a time window of each other. A ListingSet's (tower, time, caller) events
+# are loaded once per ListingSet version as arrays sorted by tower then time, so
+# every event's window is a contiguous slice found by binary search, and the
+# candidate event pairs are expanded and aggregated in bounded blocks, instead
+# of the quadratic self-join over Communication nodes a Cypher query would need.
+# ---
+
+# Candidate event pairs expanded at once, and in total before the sweep stops.
+BLOCK_PAIRS = 1_000_000
+MAX_CANDIDATE_PAIRS = 50_000_000
+# ListingSets whose events are kept in memory.
+MAX_CACHED_EVENT_SETS = 8
+
+
+@dataclass
+class TowerEvents:
+    """Events sorted by (tower, seconds); `tower` and `subscriber` index into the name arrays."""
+    version: int
+    tower_names: np.ndarray
+    subscriber_names: np.ndarray
+    tower: np.ndarray  # int64
+    subscriber: np.ndarray  # int64
+    seconds: np.ndarray  # int64, Unix time
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    @classmethod
+    def from_columns(cls, version: int, towers: List[str], subscribers: List[str], seconds: List[int]) -> "TowerEvents":
+        tower_names, tower = np.unique(np.array(towers, dtype=str), return_inverse=True)
+        subscriber_names, subscriber = np.unique(np.array(subscribers, dtype=str), return_inverse=True)
+        seconds = np.array(seconds, dtype=np.int64)
+        order = np.lexsort((seconds, tower))
+        return cls(version, tower_names, subscriber_names, tower[order].astype(np.int64), subscriber[order].astype(np.int64), seconds[order])
+
+
+@dataclass
+class Colocations:
+    """Subscriber pairs (a < b, as subscriber indexes), most co-located first."""
+    a: np.ndarray
+    b: np.ndarray
+    count: np.ndarray  # co-present event pairs
+    towers: np.ndarray  # distinct towers they shared
+    first_seen: np.ndarray  # seconds
+    last_seen: np.ndarray  # seconds
+    events: int  # events swept
+    truncated: bool  # MAX_CANDIDATE_PAIRS was reached
+
+
+def _group(keys: List[np.ndarray], count: np.ndarray, first: np.ndarray, last: np.ndarray):
+    """
+    Groups rows by `keys`: returns the distinct keys, the sum of `count`, the min of
+    `first`, the max of `last` and the number of rows of every group.
+    """
+    order = np.lexsort(keys[::-1])
+    keys = [key[order] for key in keys]
+    # same[k]: row k has the keys of row k - 1.
+    same = np.zeros(len(order), dtype=bool)
+    same[1:] = True
+    for key in keys:
+        same[1:] &= key[1:] == key[:-1]
+    starts = np.flatnonzero(~same)
+    return (
+        [key[starts] for key in keys],
+        np.add.reduceat(count[order], starts),
+        np.minimum.reduceat(first[order], starts),
+        np.maximum.reduceat(last[order], starts),
+        np.diff(np.append(starts, len(order))),
+    )
+
+
+def sweep_colocations(
+    events: TowerEvents,
+    window_seconds: int,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    max_candidates: int = MAX_CANDIDATE_PAIRS,
+) -> Colocations:
+    """
+    Pairs of distinct subscribers with events at the same tower at most
+    `window_seconds` apart, restricted to events in [start, end) (Unix seconds).
+    """
+    keep = np.ones(len(events), dtype=bool)
+    if start is not None:
+        keep &= events.seconds >= start
+    if end is not None:
+        keep &= events.seconds < end
+    tower, subscriber, seconds = events.tower[keep], events.subscriber[keep], events.seconds[keep]
+    n = len(seconds)
+    empty = np.empty(0, dtype=np.int64)
+    if n < 2:
+        return Colocations(empty, empty, empty, empty, empty, empty, n, False)
+
+    # One sorted key per event: towers are far enough apart that no window spans two.
+    offset = seconds - seconds.min()
+    key = tower * (int(offset.max()) + window_seconds + 1) + offset
+    window_end = np.searchsorted(key, key + window_seconds, side="right")
+    followers = window_end - np.arange(n) - 1
+    cumulative = np.cumsum(followers)
+    truncated = bool(cumulative[-1] > max_candidates)
+    if truncated:
+        n = int(np.searchsorted(cumulative, max_candidates, side="right"))
+        followers, cumulative = followers[:n], cumulative[:n]
+
+    parts = []
+    block_start = 0
+    while block_start < n:
+        block_end = max(int(np.searchsorted(cumulative, cumulative[block_start] - followers[block_start] + BLOCK_PAIRS, side="right")), block_start + 1)
+        block = np.arange(block_start, block_end)
+        i = np.repeat(block, followers[block])
+        if len(i):
+            # j walks the events following i inside its window.
+            first_follower = np.cumsum(followers[block]) - followers[block]
+            j = i + 1 + np.arange(len(i)) - np.repeat(first_follower, followers[block])
+            distinct = subscriber[i] != subscriber[j]
+            i, j = i[distinct], j[distinct]
+            if not len(i):
+                block_start = block_end
+                continue
+            a, b = np.minimum(subscriber[i], subscriber[j]), np.maximum(subscriber[i], subscriber[j])
+            parts.append(_group([a, b, tower[i]], np.ones(len(i), dtype=np.int64), seconds[i], seconds[j]))
+        block_start = block_end
+
+    if not parts:
+        return Colocations(empty, empty, empty, empty, empty, empty, len(seconds), truncated)
+    # Per (a, b, tower) across blocks, then per (a, b): one row per shared tower.
+    (a, b, _), count, first, last, _ = _group(
+        [np.concatenate([part[0][k] for part in parts]) for k in range(3)],
+        *[np.concatenate([part[k] for part in parts]) for k in (1, 2, 3)],
+    )
+    (a, b), count, first, last, towers = _group([a, b], count, first, last)
+    order = np.lexsort((first, -count))
+    return Colocations(a[order], b[order], count[order], towers[order], first[order], last[order], len(seconds), truncated)
+
+
+class ColocationEngine:
+    """Tower events of the most recently used ListingSets, stamped with the set's version."""
+
+    def __init__(self, max_sets: int = MAX_CACHED_EVENT_SETS):
+        self.max_sets = max_sets
+        self._entries: "OrderedDict[str, TowerEvents]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def events(self, db: Session, listing_set_id: str, version: int) -> TowerEvents:
+        with self._lock:
+            entry = self._entries.get(listing_set_id)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(listing_set_id)
+                return entry
+        # Loading runs outside the lock; two concurrent misses may both load.
+        columns = graph_crud.get_tower_events(db, listing_set_id)
+        entry = TowerEvents.from_columns(version, columns["towers"], columns["subscribers"], columns["seconds"])
+        with self._lock:
+            self._entries[listing_set_id] = entry
+            self._entries.move_to_end(listing_set_id)
+            while len(self._entries) > self.max_sets:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, listing_set_id: str):
+        with self._lock:
+            self._entries.pop(listing_set_id, None)
+
+
+# Create a single instance for the entire application.
+colocation_engine = ColocationEngine()
@@ -15,6 +15,38 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Ingestion Configuration
+# Number of normalized rows written to Neo4j in a single UNWIND transaction.
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 1000))
+# Directory where uploaded listing files are spooled before ingestion (system temp dir if unset).
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR") or None
+# Processes used to normalize chunks of large imports (0 or 1 normalizes in-process).
+INGEST_NORMALIZE_WORKERS = int(os.getenv("INGEST_NORMALIZE_WORKERS", 0))
+# Persistent ingestion job queue and its worker pool.
+INGEST_JOB_DB = os.getenv("INGEST_JOB_DB", "ingest_jobs.db")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+INGEST_MAX_JOBS_PER_USER = int(os.getenv("INGEST_MAX_JOBS_PER_USER", 1))
+# A running job claimed on another host whose heartbeat is older than this is
+# considered abandoned and requeued (jobs of this host are checked by PID).
+INGEST_JOB_STALE_SECONDS = int(os.getenv("INGEST_JOB_STALE_SECONDS", 600))
+
+# Analytics Configuration
+# Memory budget of the in-process cache of ListingSet contact graph snapshots.
+ANALYTICS_SNAPSHOT_CACHE_MB = int(os.getenv("ANALYTICS_SNAPSHOT_CACHE_MB", 256))
+# Memory budget of the cache of graph query results, and an optional directory where
+# results evicted from memory are kept, up to RESULT_CACHE_DISK_MB (disabled if unset).
+# Both budgets apply to every API process: N workers use up to N times as much.
+RESULT_CACHE_MB = int(os.getenv("RESULT_CACHE_MB", 128))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR") or None
+RESULT_CACHE_DISK_MB = int(os.getenv("RESULT_CACHE_DISK_MB", 1024))
+# Memory budget of the ListingSet member bitmaps used by the overlap and map endpoints.
+MEMBERSHIP_INDEX_MB = int(os.getenv("MEMBERSHIP_INDEX_MB", 128))
+# The phone number and tower indices live in the memory of every API process and
+# only see the imports that process runs. With several processes (uvicorn --workers),
+# each one reloads them from Neo4j once the ListingSets changed elsewhere, checking
+# at most this often. Caches keyed by ListingSet version need no such refresh.
+INDEX_REFRESH_SECONDS = int(os.getenv("INDEX_REFRESH_SECONDS", 30))
+
 print("Configuration loaded:")
 print(f"NEO4J_URI: {'Loaded' if NEO4J_URI else 'Not Found'}")
 print(f"NEO4J_USER: {'Loaded' if NEO4J_USER else 'Not Found'}")
\ No newline at end of file
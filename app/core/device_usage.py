@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Set, Tuple
+
+# ---
+# Device (handset) analysis over the USED edges maintained at ingest: one edge per
+# (Subscriber, Device) with the number of communications and first/last seen.
+# - SIM-swap timelines: the handsets a number rotated through, or the numbers a
+#   handset carried, in order of first use, with every change of hands.
+# - Shared-device clusters: subscribers and devices connected through shared
+#   handsets, expanded breadth-first one batched lookup per hop.
+# ---
+
+# Fetches the usages of (phone numbers, IMEIs); see graph_crud.get_device_usages.
+UsageFetcher = Callable[[List[str], List[str]], List[dict]]
+
+
+def swap_events(usages: List[dict], key: str) -> List[dict]:
+    """
+    Sorts `usages` by first use and returns the changes between consecutive entries:
+    {timestamp, previous, current} where `key` ("imei" or "phone_number") changed.
+    """
+    usages.sort(key=lambda usage: (usage["first_seen"], usage[key]))
+    return [
+        {"timestamp": current["first_seen"], "previous": previous[key], "current": current[key]}
+        for previous, current in zip(usages, usages[1:])
+    ]
+
+
+@dataclass
+class DeviceCluster:
+    subscribers: Set[str] = field(default_factory=set)
+    devices: Set[str] = field(default_factory=set)
+    usages: Dict[Tuple[str, str], dict] = field(default_factory=dict)
+    truncated: bool = False
+
+
+def expand_device_cluster(fetch: UsageFetcher, phone_numbers: List[str], imeis: List[str], max_nodes: int) -> DeviceCluster:
+    """
+    Grows a cluster from some subscribers and devices by following USED edges both
+    ways until nothing new is reached or it holds `max_nodes` subscribers and devices.
+    """
+    cluster = DeviceCluster(set(phone_numbers), set(imeis))
+    frontier_phones, frontier_imeis = list(cluster.subscribers), list(cluster.devices)
+    while frontier_phones or frontier_imeis:
+        next_phones, next_imeis = [], []
+        for usage in fetch(frontier_phones, frontier_imeis):
+            phone_number, imei = usage["phone_number"], usage["imei"]
+            new_nodes = (phone_number not in cluster.subscribers) + (imei not in cluster.devices)
+            if len(cluster.subscribers) + len(cluster.devices) + new_nodes > max_nodes:
+                cluster.truncated = True
+                continue
+            cluster.usages[(phone_number, imei)] = usage
+            if phone_number not in cluster.subscribers:
+                cluster.subscribers.add(phone_number)
+                next_phones.append(phone_number)
+            if imei not in cluster.devices:
+                cluster.devices.add(imei)
+                next_imeis.append(imei)
+        frontier_phones, frontier_imeis = next_phones, next_imeis
+    return cluster
@@ -0,0 +1,151 @@
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Literal, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is in requirements.txt; this guard only keeps CSV exports working without it.
+    pa = pq = None
+
+# ---
+# Streaming export of a ListingSet's communications. Rows are read from the
+# driver's record stream and cut into batches of EXPORT_BATCH_ROWS, each turned
+# into typed columns (int64 millisecond timestamps, float64 coordinates,
+# dictionary-encoded categories) and written right away as one Parquet row
+# group, one Arrow IPC stream batch, or CSV lines. Whatever the number of rows,
+# at most one batch is held in memory.
+# ---
+
+ExportFormat = Literal["parquet", "arrow", "csv"]
+EXPORT_BATCH_ROWS = 50_000
+# Order of the columns returned by listings_crud.iter_listing_communications.
+EXPORT_COLUMNS = ("caller", "recipient", "timestamp", "type", "duration", "imei", "location", "longitude", "latitude")
+EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_EXTENSIONS = {"parquet": "parquet", "arrow": "arrows", "csv": "csv"}
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def default_export_format() -> ExportFormat:
+    return "parquet" if arrow_available() else "csv"
+
+
+def _schema():
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("caller", pa.string()),
+        ("recipient", pa.string()),
+        ("timestamp", pa.timestamp("ms", tz="UTC")),
+        ("type", category),
+        ("duration", pa.string()),
+        ("imei", pa.string()),
+        ("location", category),
+        ("longitude", pa.float64()),
+        ("latitude", pa.float64()),
+    ])
+
+
+def iter_column_batches(rows: Iterable[Sequence], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[Dict[str, list]]:
+    """Groups rows (tuples in EXPORT_COLUMNS order) into column lists of at most `batch_rows`."""
+    columns = {name: [] for name in EXPORT_COLUMNS}
+    lists = [columns[name] for name in EXPORT_COLUMNS]
+    size = 0
+    for row in rows:
+        for values, value in zip(lists, row):
+            values.append(value)
+        size += 1
+        if size == batch_rows:
+            yield columns
+            columns = {name: [] for name in EXPORT_COLUMNS}
+            lists = [columns[name] for name in EXPORT_COLUMNS]
+            size = 0
+    if size:
+        yield columns
+
+
+def _record_batch(schema, columns: Dict[str, list]):
+    arrays = []
+    for column in schema:
+        if pa.types.is_dictionary(column.type):
+            arrays.append(pa.array(columns[column.name], pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[column.name], column.type))
+    return pa.record_batch(arrays, schema=schema)
+
+
+class _Spool(io.RawIOBase):
+    """Write-only file object whose bytes are drained by the streaming generator."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iso_millis(value) -> str:
+    return "" if value is None else datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat()
+
+
+def stream_export(rows: Iterable[Sequence], export_format: ExportFormat, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """Yields the encoded export of `rows` (tuples in EXPORT_COLUMNS order), one chunk per batch."""
+    if export_format == "csv":
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        timestamp = EXPORT_COLUMNS.index("timestamp")
+        for columns in iter_column_batches(rows, batch_rows):
+            values = [columns[name] for name in EXPORT_COLUMNS]
+            values[timestamp] = [_iso_millis(value) for value in values[timestamp]]
+            writer.writerows(zip(*values))
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+        if text.tell():
+            yield text.getvalue().encode("utf-8")
+        return
+
+    if not arrow_available():
+        raise RuntimeError(f"The {export_format} export requires pyarrow")
+    schema = _schema()
+    spool = _Spool()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(spool, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(spool, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    try:
+        for columns in iter_column_batches(rows, batch_rows):
+            if export_format == "parquet":
+                writer.write_table(pa.Table.from_batches([_record_batch(schema, columns)]))
+            else:
+                writer.write_batch(_record_batch(schema, columns))
+            data = spool.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield spool.drain()
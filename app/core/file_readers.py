@@ -0,0 +1,132 @@
+import codecs
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time
+from typing import Any, BinaryIO, Iterable, Iterator, Optional
+
+from openpyxl import load_workbook
+
+from app.core.config import INGEST_SPOOL_DIR
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+# Same layout the frontend's Excel parser produces for dates (Day/Month/Year).
+LISTING_DATE_FORMAT = '%d/%m/%Y %H:%M:%S'
+# Bytes read to pick a CSV file's encoding and dialect.
+CSV_SNIFF_BYTES = 64 * 1024
+
+
+def get_listing_file_extension(filename: Optional[str]) -> str:
+    """Returns the lowercased extension of an uploaded file, or raises ValueError if unsupported."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type '{extension or filename}'. Expected one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+    return extension
+
+
+def spool_upload(source: BinaryIO, extension: str) -> str:
+    """
+    Copies an uploaded file to a temporary file on disk in fixed-size blocks and
+    returns its path. The caller owns the file and must remove it when done.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=extension, dir=INGEST_SPOOL_DIR) as spooled:
+        shutil.copyfileobj(source, spooled, length=1024 * 1024)
+        return spooled.name
+
+
+def spool_rows(rows: Iterable[dict]) -> str:
+    """Writes already-parsed listing rows to a JSON Lines spool file and returns its path."""
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".jsonl", dir=INGEST_SPOOL_DIR) as spooled:
+        for row in rows:
+            spooled.write(json.dumps(row, ensure_ascii=False, default=str))
+            spooled.write("\n")
+        return spooled.name
+
+
+def _format_cell(value: Any) -> Any:
+    """Renders Excel cell values the way the frontend sends them in JSON imports."""
+    if isinstance(value, datetime):
+        return value.strftime(LISTING_DATE_FORMAT)
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, time):
+        return value.strftime('%H:%M:%S')
+    # Phone numbers are often stored as numbers; 699001122.0 must stay "699001122".
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def sniff_csv_encoding(sample: bytes) -> str:
+    """
+    'utf-8-sig' when the sample decodes as UTF-8, else 'cp1252': operator CSVs
+    saved from Excel on French Windows are cp1252, and their headers ("Numéro
+    Appelant", ...) only match the expected fields when decoded as such.
+    """
+    try:
+        # final=False: the sample may end inside a multi-byte character.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def iter_csv_rows(path: str) -> Iterator[dict]:
+    """
+    Streams the rows of a CSV file as dicts keyed by the header row. Decoding is
+    strict: a byte the sniffed encoding cannot decode fails the import instead of
+    silently turning header names into ones no field matches.
+    """
+    with open(path, "rb") as f:
+        encoding = sniff_csv_encoding(f.read(CSV_SNIFF_BYTES))
+    with open(path, newline='', encoding=encoding) as f:
+        sample = f.read(CSV_SNIFF_BYTES)
+        f.seek(0)
+        try:
+            # Operator exports are frequently semicolon-separated.
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        for row in csv.DictReader(f, dialect=dialect):
+            yield {k: v for k, v in row.items() if k is not None and v not in (None, '')}
+
+
+def iter_xlsx_rows(path: str) -> Iterator[dict]:
+    """Streams the rows of the first worksheet of an XLSX file using openpyxl's read-only mode."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        header = [str(h).strip() if h is not None else None for h in header]
+        for values in rows:
+            yield {
+                key: _format_cell(value)
+                for key, value in zip(header, values)
+                if key and value is not None and value != ''
+            }
+    finally:
+        workbook.close()
+
+
+def iter_jsonl_rows(path: str) -> Iterator[dict]:
+    """Streams the rows of a JSON Lines spool file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_listing_file(path: str, extension: str) -> Iterator[dict]:
+    """Streams listing rows from a spooled CSV, XLSX or JSON Lines file."""
+    if extension == ".jsonl":
+        return iter_jsonl_rows(path)
+    if extension == ".csv":
+        return iter_csv_rows(path)
+    if extension == ".xlsx":
+        return iter_xlsx_rows(path)
+    raise ValueError(f"Unsupported file type '{extension}'")
@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from neo4j import Session
+
+from app.core.config import INDEX_REFRESH_SECONDS
+from app.crud import graph_crud, listings_crud
+
+# ---
+# Geospatial helpers on the Web Mercator "slippy map" tile grid (zoom z has
+# 2^z x 2^z tiles, x growing eastwards and y southwards), shared by:
+# - the ActivityTile counters written at ingest for every zoom level of
+#   TILE_ZOOM_LEVELS, which the map endpoints return instead of raw points;
+# - TowerGridIndex, an in-memory grid index of the cell towers for bounding-box
+#   queries, kept up to date by ingestion and reloaded when another process
+#   changed the data, like the phone number index.
+# ---
+
+TILE_ZOOM_LEVELS = (2, 4, 6, 8, 10, 12, 14, 16)
+# Web Mercator does not reach the poles.
+MAX_LATITUDE = 85.05112878
+# Zoom level of the tower grid cells (about 10 km wide at the equator).
+GRID_ZOOM = 12
+
+BoundingBox = Tuple[float, float, float, float]  # west, south, east, north
+
+
+def lonlat_to_tile(lon: np.ndarray, lat: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Tile x/y of every coordinate at a zoom level."""
+    n = 1 << zoom
+    lat = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    x = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> BoundingBox:
+    """(west, south, east, north) of a tile, in degrees."""
+    n = 1 << zoom
+
+    def latitude(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, latitude(y + 1), (x + 1) / n * 360.0 - 180.0, latitude(y)
+
+
+def tile_ranges(bbox: BoundingBox, zoom: int) -> List[Tuple[int, int, int, int]]:
+    """
+    The (x_min, x_max, y_min, y_max) tile ranges covering a bounding box; a box
+    crossing the antimeridian (west > east) is split in two.
+    """
+    west, south, east, north = bbox
+    boxes = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+    ranges = []
+    for box_west, box_east in boxes:
+        x, y = lonlat_to_tile(np.array([box_west, box_east]), np.array([north, south]), zoom)
+        ranges.append((int(x[0]), int(x[1]), int(y[0]), int(y[1])))
+    return ranges
+
+
+def stored_zoom(zoom: int) -> int:
+    """The deepest stored tile zoom level not deeper than `zoom`."""
+    return max([level for level in TILE_ZOOM_LEVELS if level <= zoom] or [TILE_ZOOM_LEVELS[0]])
+
+
+class TowerGridIndex:
+    """
+    Towers with known coordinates, sorted by grid cell (x * 2^GRID_ZOOM + y), so
+    the towers of one column of cells are a contiguous slice found by binary search.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self._checked_at = 0.0
+
+    def _reset(self):
+        self.names = np.empty(0, dtype=object)
+        self.lon = np.empty(0)
+        self.lat = np.empty(0)
+        self._cells = np.empty(0, dtype=np.int64)
+        # (names, lon, lat) added since the last query; merged lazily.
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.loaded = False
+        # listings_crud.get_data_version() at the last load.
+        self._data_version: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._merge()
+            return len(self.names)
+
+    def add(self, names, lon, lat):
+        """Adds towers; unknown coordinates (NaN) are skipped and known towers keep their first coordinates."""
+        names, lon, lat = np.asarray(names, dtype=object), np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+        located = ~np.isnan(lon) & ~np.isnan(lat)
+        if located.any():
+            with self._lock:
+                self._pending.append((names[located], lon[located], lat[located]))
+
+    def _merge(self):
+        if not self._pending:
+            return
+        names = np.concatenate([pending[0] for pending in self._pending])
+        lon = np.concatenate([pending[1] for pending in self._pending])
+        lat = np.concatenate([pending[2] for pending in self._pending])
+        self._pending.clear()
+        _, first = np.unique(names.astype(str), return_index=True)
+        first = first[~np.isin(names[first].astype(str), self.names.astype(str))]
+        if not len(first):
+            return
+        names = np.concatenate([self.names, names[first]])
+        lon = np.concatenate([self.lon, lon[first]])
+        lat = np.concatenate([self.lat, lat[first]])
+        x, y = lonlat_to_tile(lon, lat, GRID_ZOOM)
+        cells = x * (1 << GRID_ZOOM) + y
+        order = np.argsort(cells, kind="stable")
+        self.names, self.lon, self.lat, self._cells = names[order], lon[order], lat[order], cells[order]
+
+    def ensure_loaded(self, db: Session):
+        """
+        Loads every tower with coordinates from Neo4j on first use, and again when
+        the data version changed since (checked at most every INDEX_REFRESH_SECONDS).
+        """
+        if self.loaded and time.monotonic() - self._checked_at < INDEX_REFRESH_SECONDS:
+            return
+        data_version = listings_crud.get_data_version(db)
+        self._checked_at = time.monotonic()
+        if self.loaded and data_version == self._data_version:
+            return
+        towers = graph_crud.get_cell_towers(db)
+        with self._lock:
+            # Towers added but not merged yet are kept; the load covers the rest.
+            pending = self._pending
+            self._reset()
+            self._pending = pending
+            self._data_version = data_version
+            self.loaded = True
+        self.add([tower["name"] for tower in towers], [tower["longitude"] for tower in towers], [tower["latitude"] for tower in towers])
+
+    def within(self, bbox: BoundingBox) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(names, lon, lat) of the towers inside the bounding box."""
+        with self._lock:
+            self._merge()
+            n = 1 << GRID_ZOOM
+            candidates = []
+            for x_min, x_max, y_min, y_max in tile_ranges(bbox, GRID_ZOOM):
+                columns = np.arange(x_min, x_max + 1, dtype=np.int64) * n
+                starts = np.searchsorted(self._cells, columns + y_min, side="left")
+                ends = np.searchsorted(self._cells, columns + y_max, side="right")
+                candidates.extend(np.arange(start, end) for start, end in zip(starts.tolist(), ends.tolist()) if end > start)
+            positions = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+            names, lon, lat = self.names[positions], self.lon[positions], self.lat[positions]
+        west, south, east, north = bbox
+        in_longitude = (lon >= west) & (lon <= east) if west <= east else (lon >= west) | (lon <= east)
+        inside = in_longitude & (lat >= south) & (lat <= north)
+        return names[inside], lon[inside], lat[inside]
+
+    def clear(self):
+        # Resetting under the same lock keeps concurrent add()/within() calls serialized.
+        with self._lock:
+            self._reset()
+
+
+# Create a single instance for the entire application.
+tower_index = TowerGridIndex()
@@ -0,0 +1,184 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.graph_snapshot import ContactGraphSnapshot
+
+# ---
+# Vectorized graph analytics over ContactGraphSnapshot CSR arrays. Every
+# traversal works a whole BFS level (or the whole edge list) at a time with
+# NumPy instead of visiting nodes one by one in Python.
+# Results are memoized on the snapshot itself, so they live exactly as long as
+# the snapshot of that ListingSet version stays cached.
+# ---
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITERATIONS = 100
+LABEL_PROPAGATION_MAX_ITERATIONS = 50
+# Above this many nodes, betweenness is estimated from sampled BFS sources.
+BETWEENNESS_EXACT_MAX_NODES = 2000
+BETWEENNESS_DEFAULT_SAMPLES = 256
+
+
+def memoized(snapshot: ContactGraphSnapshot, key: tuple, compute):
+    """Returns snapshot.results[key], computing and storing it on first use."""
+    results = snapshot.results
+    if key not in results:
+        results[key] = compute()
+    return results[key]
+
+
+def _expand(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (source, position) for every edge leaving `nodes`, positions indexing the CSR edge arrays."""
+    starts = indptr[nodes].astype(np.int64)
+    counts = indptr[nodes + 1].astype(np.int64) - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    sources = np.repeat(nodes, counts)
+    # Position of each edge = its row start + its rank inside the row.
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    return sources, offsets + np.arange(total)
+
+
+def degree_centrality(snapshot: ContactGraphSnapshot) -> Dict[str, np.ndarray]:
+    """Distinct contacts (undirected degree) and communications (weighted degree) of every subscriber."""
+    graph = snapshot.undirected()
+    degree = np.diff(graph.indptr).astype(np.float64)
+    strength = np.bincount(graph.sources(), weights=graph.weights, minlength=graph.node_count)
+    return {"degree": degree, "strength": strength}
+
+
+def pagerank(snapshot: ContactGraphSnapshot, damping: float = PAGERANK_DAMPING) -> np.ndarray:
+    """Weighted PageRank over the directed contacts (caller -> recipient), by power iteration."""
+    n = snapshot.node_count
+    if n == 0:
+        return np.zeros(0)
+    sources, targets = snapshot.sources(), snapshot.indices
+    weights = snapshot.weights.astype(np.float64)
+    out_strength = np.bincount(sources, weights=weights, minlength=n)
+    dangling = out_strength == 0
+    transition = np.divide(weights, out_strength[sources], out=np.zeros_like(weights), where=out_strength[sources] > 0)
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        spread = np.bincount(targets, weights=rank[sources] * transition, minlength=n)
+        updated = (1.0 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        converged = np.abs(updated - rank).sum() < PAGERANK_TOLERANCE * n
+        rank = updated
+        if converged:
+            break
+    return rank
+
+
+def _accumulate_betweenness(graph: ContactGraphSnapshot, source: int, centrality: np.ndarray):
+    """One Brandes pass from `source`, with level-synchronous BFS and dependency accumulation."""
+    n = graph.node_count
+    distance = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    distance[source], sigma[source] = 0, 1.0
+    levels = [np.array([source], dtype=np.int64)]
+    while True:
+        frontier = levels[-1]
+        sources, positions = _expand(graph.indptr, graph.indices, frontier)
+        neighbors = graph.indices[positions].astype(np.int64)
+        depth = distance[frontier[0]] + 1
+        fresh = np.unique(neighbors[distance[neighbors] == -1])
+        if len(fresh) == 0:
+            break
+        distance[fresh] = depth
+        on_shortest = distance[neighbors] == depth
+        sigma += np.bincount(neighbors[on_shortest], weights=sigma[sources[on_shortest]], minlength=n)
+        levels.append(fresh)
+
+    delta = np.zeros(n)
+    for level in reversed(levels[1:]):
+        sources, positions = _expand(graph.indptr, graph.indices, level)
+        predecessors = graph.indices[positions].astype(np.int64)
+        back = distance[predecessors] == distance[sources] - 1
+        sources, predecessors = sources[back], predecessors[back]
+        delta += np.bincount(predecessors, weights=sigma[predecessors] / sigma[sources] * (1.0 + delta[sources]), minlength=n)
+    delta[source] = 0.0
+    centrality += delta
+
+
+def betweenness_centrality(snapshot: ContactGraphSnapshot, samples: Optional[int] = None, seed: int = 0) -> Tuple[np.ndarray, bool]:
+    """
+    Normalized betweenness over the undirected contact graph (unweighted shortest
+    paths). Exact for small graphs; otherwise estimated from `samples` random BFS
+    sources and scaled up. Returns (scores, approximate).
+    """
+    graph = snapshot.undirected()
+    n = graph.node_count
+    centrality = np.zeros(n)
+    if n < 3:
+        return centrality, False
+
+    if samples is None and n <= BETWEENNESS_EXACT_MAX_NODES:
+        sources, approximate = np.arange(n), False
+    else:
+        count = min(samples or BETWEENNESS_DEFAULT_SAMPLES, n)
+        sources = np.random.default_rng(seed).choice(n, size=count, replace=False)
+        approximate = count < n
+
+    for source in sources:
+        _accumulate_betweenness(graph, int(source), centrality)
+    centrality *= n / len(sources)
+    # Each undirected path was counted from both of its ends.
+    centrality /= 2.0
+    centrality /= (n - 1) * (n - 2) / 2.0
+    return centrality, approximate
+
+
+def label_propagation(snapshot: ContactGraphSnapshot, seed: int = 0) -> np.ndarray:
+    """
+    Weighted label propagation communities. Every round, a random half of the
+    nodes adopt the label carrying the most communication weight among their
+    contacts; updating only half of them stops two-colour oscillations.
+    Returns one community label per node, numbered by decreasing size.
+    """
+    graph = snapshot.undirected()
+    n = graph.node_count
+    labels = np.arange(n, dtype=np.int64)
+    if graph.edge_count == 0:
+        return labels
+    rng = np.random.default_rng(seed)
+    sources, targets = graph.sources().astype(np.int64), graph.indices.astype(np.int64)
+    weights = graph.weights.astype(np.float64)
+    # A tiny random jitter breaks ties between equally heavy labels.
+    jitter = rng.random(n) * 1e-6
+
+    for _ in range(LABEL_PROPAGATION_MAX_ITERATIONS):
+        neighbor_labels = labels[targets]
+        keys, inverse = np.unique(sources * n + neighbor_labels, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights, minlength=len(keys)) + jitter[keys % n]
+        nodes_of_key = keys // n
+        # Best label per node: sort by (node, total) and keep the last entry of each node.
+        order = np.lexsort((totals, nodes_of_key))
+        last = np.r_[nodes_of_key[order][1:] != nodes_of_key[order][:-1], True]
+        best_nodes = nodes_of_key[order][last]
+        best_labels = (keys % n)[order][last]
+
+        if np.array_equal(labels[best_nodes], best_labels):
+            break
+        update = rng.random(len(best_nodes)) < 0.5
+        labels[best_nodes[update]] = best_labels[update]
+
+    _, relabeled, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(sizes), dtype=np.int64)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[relabeled]
+
+
+def modularity(snapshot: ContactGraphSnapshot, labels: np.ndarray) -> float:
+    """Weighted modularity of a partition of the undirected contact graph."""
+    graph = snapshot.undirected()
+    weights = graph.weights.astype(np.float64)
+    total = weights.sum()
+    if total == 0:
+        return 0.0
+    sources = graph.sources()
+    inside = weights[labels[sources] == labels[graph.indices]].sum()
+    strength_per_community = np.bincount(labels[sources], weights=weights)
+    return float(inside / total - ((strength_per_community / total) ** 2).sum())
@@ -0,0 +1,90 @@
+import json
+from typing import Any, Dict, Iterable
+
+from fastapi.responses import Response
+from neo4j import time as neo4j_time
+
+# ---
+# Direct JSON encoding of graph responses. Nodes and relationships are collected
+# once per element id and written as plain dicts, skipping the per-element
+# pydantic Node/Edge models and the response_model validation pass. The bytes
+# match what FastAPI renders for the Graph model (same key order, compact
+# separators, non-ASCII kept as is).
+# ---
+
+# Renders Neo4j temporal values the same way convert_properties did for DateTime.
+_TEMPORAL_ENCODERS = {
+    neo4j_time.DateTime: lambda value: value.to_native().isoformat(),
+    neo4j_time.Date: lambda value: value.to_native().isoformat(),
+    neo4j_time.Time: lambda value: value.to_native().isoformat(),
+    neo4j_time.Duration: lambda value: value.iso_format(),
+}
+
+
+def encode_properties(props) -> Dict[str, Any]:
+    """Copies an entity's properties, converting Neo4j temporal values in a single pass."""
+    converted = {}
+    for key, value in props.items():
+        encoder = _TEMPORAL_ENCODERS.get(type(value))
+        converted[key] = encoder(value) if encoder else value
+    return converted
+
+
+class GraphEncoder:
+    """Accumulates nodes and relationships, deduplicated by element id, and renders them as Graph JSON."""
+
+    def __init__(self):
+        self._nodes: Dict[str, dict] = {}
+        self._edges: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes) + len(self._edges)
+
+    def add_node(self, node):
+        if node.element_id not in self._nodes:
+            self._nodes[node.element_id] = {
+                "id": node.element_id,
+                "label": next(iter(node.labels)),
+                "properties": encode_properties(node),
+            }
+
+    def add_relationship(self, relationship):
+        if relationship.element_id not in self._edges:
+            self._edges[relationship.element_id] = {
+                "id": relationship.element_id,
+                "source": relationship.start_node.element_id,
+                "target": relationship.end_node.element_id,
+                "label": relationship.type,
+                "properties": encode_properties(relationship),
+            }
+
+    def add_path(self, path):
+        for node in path.nodes:
+            self.add_node(node)
+        for relationship in path.relationships:
+            self.add_relationship(relationship)
+
+    def add_records(self, records: Iterable, key: str = "p"):
+        """Adds the path stored under `key` in every record (records without one are ignored)."""
+        for record in records:
+            path = record.get(key)
+            if path is not None:
+                self.add_path(path)
+
+    def to_dict(self) -> dict:
+        return {"nodes": list(self._nodes.values()), "edges": list(self._edges.values())}
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            self.to_dict(), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+
+    def to_response(self) -> Response:
+        return Response(content=self.to_bytes(), media_type="application/json")
+
+
+def encode_graph_records(records: Iterable, key: str = "p") -> Response:
+    """Encodes the paths of query records straight into a Graph JSON response."""
+    encoder = GraphEncoder()
+    encoder.add_records(records, key)
+    return encoder.to_response()
@@ -0,0 +1,246 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from neo4j import Session
+
+from app.core.config import ANALYTICS_SNAPSHOT_CACHE_MB
+from app.core.path_engine import Contact
+from app.crud import graph_crud, listings_crud
+
+# ---
+# In-memory snapshots of a ListingSet's subscriber contact graph in CSR form:
+# node i's contacts are indices[indptr[i]:indptr[i + 1]], with the matching call
+# and SMS counts in calls/sms. Phone numbers are kept sorted, so a phone number
+# is mapped to its node index with a binary search instead of a dict.
+# Snapshots are cached per set of ListingSets under a memory budget and are
+# reloaded whenever the version of one of the sets changes.
+# ---
+
+
+class ContactGraphSnapshot:
+    """Directed contact graph in CSR form (int32 indices, int32 counters)."""
+
+    def __init__(self, nodes: np.ndarray, indptr: np.ndarray, indices: np.ndarray, calls: np.ndarray, sms: np.ndarray):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.calls = calls
+        self.sms = sms
+        self._undirected: Optional["ContactGraphSnapshot"] = None
+        # Analytics computed on this snapshot (see app.core.graph_analytics).
+        self.results: Dict[tuple, object] = {}
+
+    @classmethod
+    def from_arrays(cls, nodes: np.ndarray, sources: np.ndarray, targets: np.ndarray, calls: np.ndarray, sms: np.ndarray) -> "ContactGraphSnapshot":
+        """Builds the CSR arrays from parallel edge arrays over node indices (sorted by source, then target)."""
+        order = np.lexsort((targets, sources))
+        counts = np.bincount(sources, minlength=len(nodes)) if len(sources) else np.zeros(len(nodes), dtype=np.int64)
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        index_dtype = np.int32 if len(nodes) < np.iinfo(np.int32).max else np.int64
+        return cls(
+            nodes=nodes,
+            indptr=indptr.astype(np.int32) if indptr[-1] < np.iinfo(np.int32).max else indptr,
+            indices=targets[order].astype(index_dtype),
+            calls=calls[order].astype(np.int32),
+            sms=sms[order].astype(np.int32),
+        )
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[dict]) -> "ContactGraphSnapshot":
+        """Builds a snapshot from {source, target, calls, sms} dicts (one per directed pair)."""
+        edges = [edge for edge in edges if edge["source"] != edge["target"]]
+        sources = np.array([edge["source"] for edge in edges], dtype=str)
+        targets = np.array([edge["target"] for edge in edges], dtype=str)
+        nodes, inverse = np.unique(np.concatenate([sources, targets]), return_inverse=True)
+        return cls.from_arrays(
+            nodes,
+            inverse[:len(edges)],
+            inverse[len(edges):],
+            np.array([edge["calls"] or 0 for edge in edges], dtype=np.int64),
+            np.array([edge["sms"] or 0 for edge in edges], dtype=np.int64),
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Number of communications per edge."""
+        return self.calls + self.sms
+
+    @property
+    def nbytes(self) -> int:
+        own = sum(array.nbytes for array in (self.nodes, self.indptr, self.indices, self.calls, self.sms))
+        # The undirected view shares `nodes`.
+        if self._undirected is not None and self._undirected is not self:
+            own += sum(array.nbytes for array in (self._undirected.indptr, self._undirected.indices, self._undirected.calls, self._undirected.sms))
+        for result in self.results.values():
+            values = result.values() if isinstance(result, dict) else result if isinstance(result, tuple) else (result,)
+            own += sum(value.nbytes for value in values if isinstance(value, np.ndarray))
+        return own
+
+    def index_of(self, phone_number: str) -> Optional[int]:
+        position = int(np.searchsorted(self.nodes, phone_number))
+        if position < len(self.nodes) and self.nodes[position] == phone_number:
+            return position
+        return None
+
+    def sources(self) -> np.ndarray:
+        """The source node of every edge, expanded from indptr."""
+        return np.repeat(np.arange(self.node_count, dtype=self.indices.dtype), np.diff(self.indptr))
+
+    def undirected(self) -> "ContactGraphSnapshot":
+        """Symmetric view where both directions of a pair are merged into one edge each way (cached)."""
+        if self._undirected is None:
+            sources, targets = self.sources(), self.indices
+            n = np.int64(self.node_count)
+            pair_keys = np.concatenate([sources.astype(np.int64) * n + targets, targets.astype(np.int64) * n + sources])
+            keys, inverse = np.unique(pair_keys, return_inverse=True)
+            calls = np.bincount(inverse, weights=np.concatenate([self.calls, self.calls]), minlength=len(keys))
+            sms = np.bincount(inverse, weights=np.concatenate([self.sms, self.sms]), minlength=len(keys))
+            self._undirected = ContactGraphSnapshot.from_arrays(
+                self.nodes, (keys // n).astype(np.int64), (keys % n).astype(np.int64), calls.astype(np.int64), sms.astype(np.int64)
+            )
+            self._undirected._undirected = self._undirected
+        return self._undirected
+
+    def edge_dicts(self) -> List[dict]:
+        """The edges as {source, target, calls, sms} dicts, as returned by graph_crud.get_contact_edges."""
+        sources = self.nodes[self.sources()]
+        targets = self.nodes[self.indices]
+        return [
+            {"source": source, "target": target, "calls": calls, "sms": sms}
+            for source, target, calls, sms in zip(sources.tolist(), targets.tolist(), self.calls.tolist(), self.sms.tolist())
+        ]
+
+
+class SnapshotAdjacency:
+    """AdjacencyProvider (see app.core.path_engine) reading contacts from a snapshot."""
+
+    def __init__(self, snapshot: ContactGraphSnapshot, types: Iterable[str] = ("CALL", "SMS")):
+        self.graph = snapshot.undirected()
+        types = set(types)
+        self.calls = self.graph.calls if "CALL" in types else np.zeros(self.graph.edge_count, dtype=np.int32)
+        self.sms = self.graph.sms if "SMS" in types else np.zeros(self.graph.edge_count, dtype=np.int32)
+        self.allowed = (self.calls.astype(np.int64) + self.sms) > 0
+
+    def neighbors(self, frontier: Sequence[str], timeout: float) -> Dict[str, List[str]]:
+        adjacency = {}
+        for phone_number in frontier:
+            i = self.graph.index_of(phone_number)
+            if i is None:
+                continue
+            start, end = self.graph.indptr[i], self.graph.indptr[i + 1]
+            targets = self.graph.indices[start:end][self.allowed[start:end]]
+            adjacency[phone_number] = self.graph.nodes[targets].tolist()
+        return adjacency
+
+    def missing(self, phone_numbers: Sequence[str]) -> List[str]:
+        return [phone_number for phone_number in phone_numbers if self.graph.index_of(phone_number) is None]
+
+    def weighted_neighbors(self, frontier: Sequence[str], fan_out: Optional[int]) -> Dict[str, Tuple[int, List[Contact]]]:
+        adjacency = {}
+        for phone_number in frontier:
+            i = self.graph.index_of(phone_number)
+            if i is None:
+                continue
+            positions = np.arange(self.graph.indptr[i], self.graph.indptr[i + 1])[self.allowed[self.graph.indptr[i]:self.graph.indptr[i + 1]]]
+            weights = self.calls[positions].astype(np.int64) + self.sms[positions]
+            # Heaviest first; the CSR order (sorted phone numbers) breaks ties.
+            positions = positions[np.argsort(-weights, kind="stable")][:fan_out]
+            adjacency[phone_number] = (int(len(weights)), list(zip(
+                self.graph.nodes[self.graph.indices[positions]].tolist(),
+                self.calls[positions].tolist(),
+                self.sms[positions].tolist(),
+            )))
+        return adjacency
+
+
+SnapshotKey = Tuple[str, ...]
+
+
+class SnapshotCache:
+    """
+    LRU cache of snapshots keyed by the sorted ListingSet ids, evicting the least
+    recently used snapshots once their total size exceeds `max_bytes`. Every entry
+    carries a stamp of the sets' state; a different stamp means the entry is stale.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[SnapshotKey, Tuple[tuple, ContactGraphSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(snapshot.nbytes for _, snapshot in self._entries.values())
+
+    def get_or_load(self, key: SnapshotKey, stamp: tuple, loader: Callable[[], ContactGraphSnapshot]) -> ContactGraphSnapshot:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # Lazily built views (undirected) can grow an entry after it was stored.
+                self._evict()
+                return entry[1]
+            self.misses += 1
+
+        # Loading runs outside the lock; two concurrent misses may both load.
+        snapshot = loader()
+        with self._lock:
+            self._entries[key] = (stamp, snapshot)
+            self._entries.move_to_end(key)
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        size = self.size_bytes
+        while self._entries and size > self.max_bytes:
+            _, (_, snapshot) = self._entries.popitem(last=False)
+            size -= snapshot.nbytes
+
+    def invalidate(self, listing_set_id: str):
+        """Drops every snapshot that includes the ListingSet."""
+        with self._lock:
+            for key in [key for key in self._entries if listing_set_id in key]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "size_bytes": self.size_bytes}
+
+
+# Create a single instance for the entire application.
+snapshot_cache = SnapshotCache(ANALYTICS_SNAPSHOT_CACHE_MB * 1024 * 1024)
+
+
+def get_contact_snapshot(db: Session, listing_set_ids: List[str], owner_username: str) -> Optional[ContactGraphSnapshot]:
+    """
+    Returns the contact graph snapshot of the user's ListingSets, loading it from
+    Neo4j on a cache miss. Returns None if one of the sets is not owned by the user.
+    """
+    listing_set_ids = sorted(set(listing_set_ids))
+    versions = listings_crud.get_listing_set_versions(db, owner_username, listing_set_ids)
+    if len(versions) < len(listing_set_ids):
+        return None
+
+    key = tuple(listing_set_ids)
+    return snapshot_cache.get_or_load(
+        key, tuple(sorted(versions.items())),
+        lambda: ContactGraphSnapshot.from_edges(graph_crud.get_contact_edges(db, owner_username, list(key)))
+    )
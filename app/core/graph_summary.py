@@ -0,0 +1,159 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---
+# Level-of-detail summarization of a contact network. Communications arrive
+# already collapsed into weighted Subscriber pairs (weight = calls + SMS).
+# Low-degree leaves hanging off the same hub are grouped into one cluster node,
+# then the heaviest edges are kept until the node budget is reached.
+# Node ids are stable strings, so a client can drill into a cluster later:
+#   "subscriber:<phone number>" and "cluster:<hub phone number>".
+# ---
+
+SUBSCRIBER_PREFIX = "subscriber:"
+CLUSTER_PREFIX = "cluster:"
+# A hub needs at least this many leaves for them to be grouped.
+MIN_CLUSTER_SIZE = 2
+
+
+def subscriber_node_id(phone_number: str) -> str:
+    return f"{SUBSCRIBER_PREFIX}{phone_number}"
+
+
+def cluster_node_id(hub: str) -> str:
+    return f"{CLUSTER_PREFIX}{hub}"
+
+
+def cluster_hub(cluster_id: str) -> Optional[str]:
+    """Returns the hub phone number of a cluster id, or None if it is not a cluster id."""
+    if not cluster_id.startswith(CLUSTER_PREFIX):
+        return None
+    return cluster_id[len(CLUSTER_PREFIX):] or None
+
+
+def merge_contact_edges(edges: Iterable[dict]) -> Dict[Tuple[str, str], dict]:
+    """Merges both directions of every Subscriber pair into one undirected weighted edge."""
+    merged = {}
+    for edge in edges:
+        if edge["source"] == edge["target"]:
+            continue
+        key = tuple(sorted((edge["source"], edge["target"])))
+        pair = merged.setdefault(key, {"calls": 0, "sms": 0})
+        pair["calls"] += edge["calls"] or 0
+        pair["sms"] += edge["sms"] or 0
+    for pair in merged.values():
+        pair["weight"] = pair["calls"] + pair["sms"]
+    return merged
+
+
+class ContactSummary:
+    """Adjacency of a merged contact network, with its leaf clusters resolved."""
+
+    def __init__(self, edges: Iterable[dict], leaf_degree: int = 1):
+        self.pairs = merge_contact_edges(edges)
+        self.neighbors: Dict[str, Dict[str, dict]] = defaultdict(dict)
+        for (a, b), pair in self.pairs.items():
+            self.neighbors[a][b] = pair
+            self.neighbors[b][a] = pair
+        self.leaf_degree = leaf_degree
+        self.clusters = self._find_clusters()
+
+    def _is_leaf(self, node: str) -> bool:
+        return len(self.neighbors[node]) <= self.leaf_degree
+
+    def _find_clusters(self) -> Dict[str, List[str]]:
+        """Groups every leaf under its heaviest neighbour, when that neighbour is not a leaf itself."""
+        members = defaultdict(list)
+        for node, adjacent in self.neighbors.items():
+            if not self._is_leaf(node):
+                continue
+            hub = max(adjacent, key=lambda other: (adjacent[other]["weight"], other))
+            if not self._is_leaf(hub):
+                members[hub].append(node)
+        return {hub: sorted(leaves) for hub, leaves in members.items() if len(leaves) >= MIN_CLUSTER_SIZE}
+
+    def summarize(self, node_budget: int) -> dict:
+        """
+        Returns the summarized graph as Graph-shaped nodes and edges, plus how much
+        was left out to respect `node_budget`.
+        """
+        clustered = {leaf: hub for hub, leaves in self.clusters.items() for leaf in leaves}
+        nodes: Dict[str, dict] = {}
+        edges: Dict[Tuple[str, str], dict] = {}
+
+        for (a, b), pair in self.pairs.items():
+            if a in clustered or b in clustered:
+                continue
+            edges[(subscriber_node_id(a), subscriber_node_id(b))] = dict(pair)
+        for hub, leaves in self.clusters.items():
+            cluster_id = cluster_node_id(hub)
+            calls = sum(self.neighbors[leaf][hub]["calls"] for leaf in leaves)
+            sms = sum(self.neighbors[leaf][hub]["sms"] for leaf in leaves)
+            nodes[cluster_id] = {
+                "id": cluster_id,
+                "label": "Cluster",
+                "properties": {"hub": hub, "size": len(leaves), "weight": calls + sms},
+            }
+            edges[(subscriber_node_id(hub), cluster_id)] = {"calls": calls, "sms": sms, "weight": calls + sms}
+
+        # Keep the heaviest edges first, as long as their endpoints fit in the budget.
+        kept_nodes, kept_edges = set(), []
+        for (source, target), pair in sorted(edges.items(), key=lambda item: (-item[1]["weight"], item[0])):
+            new_nodes = {source, target} - kept_nodes
+            if len(kept_nodes) + len(new_nodes) > node_budget:
+                continue
+            kept_nodes |= new_nodes
+            kept_edges.append((source, target, pair))
+
+        all_nodes = {node for pair in edges for node in pair}
+        return {
+            "nodes": [self._node(node_id, nodes) for node_id in sorted(kept_nodes)],
+            "edges": [
+                {
+                    "id": f"{source}|{target}",
+                    "source": source,
+                    "target": target,
+                    "label": "CONTACTED",
+                    "properties": pair,
+                }
+                for source, target, pair in kept_edges
+            ],
+            "truncated": len(kept_nodes) < len(all_nodes),
+            "hidden_nodes": len(all_nodes) - len(kept_nodes),
+            "hidden_edges": len(edges) - len(kept_edges),
+        }
+
+    def _node(self, node_id: str, cluster_nodes: Dict[str, dict]) -> dict:
+        if node_id in cluster_nodes:
+            return cluster_nodes[node_id]
+        phone_number = node_id[len(SUBSCRIBER_PREFIX):]
+        adjacent = self.neighbors[phone_number]
+        return {
+            "id": node_id,
+            "label": "Subscriber",
+            "properties": {
+                "phoneNumber": phone_number,
+                "degree": len(adjacent),
+                "weight": sum(pair["weight"] for pair in adjacent.values()),
+            },
+        }
+
+    def expand_cluster(self, hub: str) -> Optional[dict]:
+        """Returns the hub and every member of its cluster with their weighted edges, or None."""
+        leaves = self.clusters.get(hub)
+        if leaves is None:
+            return None
+        hub_id = subscriber_node_id(hub)
+        return {
+            "nodes": [self._node(hub_id, {})] + [self._node(subscriber_node_id(leaf), {}) for leaf in leaves],
+            "edges": [
+                {
+                    "id": f"{hub_id}|{subscriber_node_id(leaf)}",
+                    "source": hub_id,
+                    "target": subscriber_node_id(leaf),
+                    "label": "CONTACTED",
+                    "properties": dict(self.neighbors[leaf][hub]),
+                }
+                for leaf in leaves
+            ],
+        }
@@ -0,0 +1,327 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+from app.core.config import (
+    INGEST_BATCH_SIZE,
+    INGEST_JOB_DB,
+    INGEST_JOB_STALE_SECONDS,
+    INGEST_MAX_JOBS_PER_USER,
+    INGEST_WORKERS,
+)
+from app.core.file_readers import iter_listing_file
+from app.crud import listings_crud
+from app.db.graph_db import db_manager
+from scripts.ingest_data import DEDUP_SCOPE_OWNER, get_ingest_checkpoint, ingest_listings_data
+
+# ---
+# Ingestion jobs are persisted in a local SQLite file so that an API restart or crash
+# never drops an import: jobs left "running" by a dead process go back to "queued"
+# and resume after the last chunk committed to Neo4j.
+# In a multi-host deployment every host needs its own spool directory and job store.
+# ---
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id TEXT PRIMARY KEY,
+    listing_set_id TEXT NOT NULL,
+    owner_username TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    source_format TEXT NOT NULL,
+    batch_size INTEGER NOT NULL,
+    dedup_scope TEXT,
+    status TEXT NOT NULL,
+    claimed_by TEXT,
+    chunks_committed INTEGER NOT NULL DEFAULT 0,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ingest_jobs_status ON ingest_jobs (status, created_at);
+"""
+
+
+class JobInterrupted(Exception):
+    """Raised between chunks when the worker pool is shutting down."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _worker_identity() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """SQLite-backed queue of ingestion jobs. Every call uses its own connection, so it is thread-safe."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Job stores created before deduplication existed lack this column.
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(ingest_jobs)")}
+            if "dedup_scope" not in columns:
+                conn.execute("ALTER TABLE ingest_jobs ADD COLUMN dedup_scope TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, listing_set_id: str, owner_username: str, source_path: str, source_format: str, dedup_scope: str = None) -> dict:
+        job_id = str(uuid.uuid4())
+        now = _now()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO ingest_jobs (id, listing_set_id, owner_username, source_path, source_format,
+                                         batch_size, dedup_scope, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, listing_set_id, owner_username, source_path, source_format,
+                 INGEST_BATCH_SIZE, dedup_scope, JOB_STATUS_QUEUED, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_for_listing_set(self, listing_set_id: str) -> Optional[dict]:
+        """Returns the most recent job of a ListingSet."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM ingest_jobs WHERE listing_set_id = ? ORDER BY created_at DESC LIMIT 1",
+                (listing_set_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def claim_next(self, max_running_per_user: int) -> Optional[dict]:
+        """
+        Atomically moves the oldest queued job whose owner is under the concurrency
+        limit to "running" and returns it.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    """
+                    SELECT j.* FROM ingest_jobs j
+                    WHERE j.status = ?
+                      AND (SELECT COUNT(*) FROM ingest_jobs r
+                           WHERE r.owner_username = j.owner_username AND r.status = ?) < ?
+                    ORDER BY j.created_at
+                    LIMIT 1
+                    """,
+                    (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING, max_running_per_user)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE ingest_jobs SET status = ?, claimed_by = ?, updated_at = ? WHERE id = ?",
+                    (JOB_STATUS_RUNNING, _worker_identity(), _now(), row["id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def record_progress(self, job_id: str, chunks_committed: int, rows_written: int):
+        """Stores the last committed chunk; doubles as the running job's heartbeat."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_jobs SET chunks_committed = ?, rows_written = ?, updated_at = ? WHERE id = ?",
+                (chunks_committed, rows_written, _now(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str, error: str = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingest_jobs SET status = ?, claimed_by = NULL, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, _now(), job_id)
+            )
+
+    def requeue_abandoned(self, stale_seconds: int, at_startup: bool = False) -> List[str]:
+        """
+        Returns "running" jobs to the queue when their worker process on this host is
+        gone. Jobs claimed on another host (e.g. a container restarted under a new
+        hostname), whose process cannot be checked, are abandoned once their heartbeat
+        is older than `stale_seconds`. A live process on this host keeps its jobs however
+        long a chunk takes, except for our own identity at startup (a reused PID).
+        """
+        hostname = socket.gethostname()
+        cutoff = datetime.now(timezone.utc).timestamp() - stale_seconds
+        requeued = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, claimed_by, updated_at FROM ingest_jobs WHERE status = ?", (JOB_STATUS_RUNNING,)
+            ).fetchall()
+            for row in rows:
+                host, _, pid = (row["claimed_by"] or "").rpartition(":")
+                if host == hostname and pid.isdigit():
+                    abandoned = not _process_alive(int(pid)) or (at_startup and int(pid) == os.getpid())
+                else:
+                    abandoned = datetime.fromisoformat(row["updated_at"]).timestamp() < cutoff
+                if abandoned:
+                    conn.execute(
+                        "UPDATE ingest_jobs SET status = ?, claimed_by = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                        (JOB_STATUS_QUEUED, _now(), row["id"], JOB_STATUS_RUNNING)
+                    )
+                    requeued.append(row["id"])
+        return requeued
+
+
+class IngestWorkerPool:
+    """
+    A fixed pool of background threads that claim jobs from the JobStore and run
+    them outside of the request handling path.
+    """
+
+    def __init__(self, store: JobStore, workers: int, max_running_per_user: int, poll_interval: float = 1.0):
+        self.store = store
+        self.workers = workers
+        self.max_running_per_user = max_running_per_user
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self):
+        requeued = self.store.requeue_abandoned(INGEST_JOB_STALE_SECONDS, at_startup=True)
+        if requeued:
+            print(f"Recovered {len(requeued)} interrupted ingestion job(s): {requeued}")
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"ingest-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Started {self.workers} ingestion worker(s).")
+
+    def stop(self, timeout: float = 10.0):
+        """Asks workers to stop after their current chunk; unfinished jobs stay resumable."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wakes idle workers up when a new job has been queued."""
+        self._wakeup.set()
+
+    def _run(self):
+        last_recovery = time.monotonic()
+        while not self._stop.is_set():
+            # The job store is shared by every API process, so "database is
+            # locked" is expected now and then; it must not end the worker.
+            try:
+                if time.monotonic() - last_recovery > INGEST_JOB_STALE_SECONDS:
+                    last_recovery = time.monotonic()
+                    self.store.requeue_abandoned(INGEST_JOB_STALE_SECONDS)
+
+                job = self.store.claim_next(self.max_running_per_user)
+                if job is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                self._run_job(job)
+            except Exception as e:
+                print(f"Ingestion worker {threading.current_thread().name} error, retrying in {self.poll_interval}s: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def _run_job(self, job: dict):
+        def on_chunk(chunk_index: int, stats: dict):
+            self.store.record_progress(job["id"], chunk_index + 1, job["rows_written"] + stats["rows_written"])
+            if self._stop.is_set():
+                raise JobInterrupted()
+
+        listing_set_id = job["listing_set_id"]
+        try:
+            with db_manager.get_session() as db_session:
+                listings_crud.set_ingestion_status(db_session, listing_set_id, JOB_STATUS_RUNNING)
+                start_chunk = get_ingest_checkpoint(db_session, listing_set_id)
+                rows = iter_listing_file(job["source_path"], job["source_format"])
+                ingest_listings_data(
+                    db_session, rows, listing_set_id,
+                    batch_size=job["batch_size"], start_chunk=start_chunk, on_chunk=on_chunk,
+                    dedup_scope=job["dedup_scope"]
+                )
+                listings_crud.set_ingestion_status(db_session, listing_set_id, JOB_STATUS_COMPLETED)
+        except JobInterrupted:
+            self._record_outcome(job, JOB_STATUS_QUEUED)
+            print(f"Ingestion job {job['id']} paused for shutdown; it will resume on restart.")
+            return
+        except Exception as e:
+            print(f"A critical error occurred during ingestion job {job['id']} for {listing_set_id}: {e}")
+            self._record_outcome(job, JOB_STATUS_FAILED, error=str(e))
+        else:
+            self.store.finish(job["id"], JOB_STATUS_COMPLETED)
+
+        if os.path.exists(job["source_path"]):
+            os.remove(job["source_path"])
+
+    def _record_outcome(self, job: dict, status: str, error: str = None):
+        """Stores a job's final state in the job store and on its ListingSet."""
+        try:
+            self.store.finish(job["id"], status, error=error)
+        except Exception as e:
+            print(f"Could not record status '{status}' for ingestion job {job['id']}: {e}")
+        try:
+            with db_manager.get_session() as db_session:
+                listings_crud.set_ingestion_status(db_session, job["listing_set_id"], status, error)
+        except Exception as e:
+            print(f"Could not record status '{status}' on ListingSet {job['listing_set_id']}: {e}")
+
+
+# Create single instances for the entire application.
+job_store = JobStore(INGEST_JOB_DB)
+ingest_worker_pool = IngestWorkerPool(job_store, INGEST_WORKERS, INGEST_MAX_JOBS_PER_USER)
+
+
+def submit_ingest_job(
+    listing_set_id: str,
+    owner_username: str,
+    source_path: str,
+    source_format: str,
+    dedupe_across_sets: bool = False
+) -> dict:
+    """
+    Persists a new ingestion job and wakes the worker pool up. With `dedupe_across_sets`,
+    communications already imported in another ListingSet of the same owner are linked
+    to the new set instead of being duplicated.
+    """
+    dedup_scope = f"{DEDUP_SCOPE_OWNER}:{owner_username}" if dedupe_across_sets else None
+    job = job_store.enqueue(listing_set_id, owner_username, source_path, source_format, dedup_scope)
+    ingest_worker_pool.notify()
+    return job
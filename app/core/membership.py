@@ -0,0 +1,187 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Literal, Optional
+
+import numpy as np
+from neo4j import Session
+
+from app.core.bitmaps import CompressedBitmap
+from app.core.config import MEMBERSHIP_INDEX_MB
+from app.crud import graph_crud, listings_crud
+
+# ---
+# Which subscribers, devices and cell towers every ListingSet contains, kept in
+# memory as compressed bitmaps over one global dense id dictionary per kind, so
+# intersections, unions and differences between sets never touch Neo4j.
+# A set's bitmaps are read from its communications once per ListingSet version
+# and rebuilt whenever the version changes. Every API process keeps its own index
+# and id dictionaries; since the version is read from Neo4j on every request, an
+# import run by another process is picked up on the next request, and ids never
+# leave the process that assigned them.
+# The bitmaps are bounded by a byte budget, least recently used sets evicted
+# first. Ids of evicted or deleted sets stay in the dictionaries until these
+# hold DICTIONARY_REBUILD_FACTOR times more ids than the cached sets can use;
+# they are then rebuilt with the live ids only, keeping their relative order.
+# ---
+
+MemberKind = Literal["subscriber", "device", "tower"]
+MEMBER_KINDS = ("subscriber", "device", "tower")
+DICTIONARY_REBUILD_FACTOR = 4
+# Dictionaries smaller than this are never rebuilt.
+DICTIONARY_REBUILD_MIN_IDS = 100_000
+
+
+class IdDictionary:
+    """Assigns dense uint32 ids to values in order of first appearance; ids are never reused."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._values: List[str] = list(values)
+        self._ids: Dict[str, int] = {value: value_id for value_id, value in enumerate(self._values)}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        with self._lock:
+            ids = []
+            for value in values:
+                value_id = self._ids.get(value)
+                if value_id is None:
+                    value_id = self._ids[value] = len(self._values)
+                    self._values.append(value)
+                ids.append(value_id)
+        return np.array(ids, dtype=np.uint32)
+
+    def decode(self, ids: np.ndarray) -> List[str]:
+        values = self._values
+        return [values[value_id] for value_id in ids.tolist()]
+
+
+@dataclass
+class ListingSetMembers:
+    version: int
+    bitmaps: Dict[str, CompressedBitmap]
+    # The id dictionaries the bitmaps were encoded with.
+    dictionaries: Dict[str, IdDictionary]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bitmap.nbytes for bitmap in self.bitmaps.values())
+
+    def decode(self, kind: MemberKind, ids: np.ndarray) -> List[str]:
+        return self.dictionaries[kind].decode(ids)
+
+
+class MembershipIndex:
+    """
+    Member bitmaps of the most recently used ListingSets, stamped with the set's
+    version, evicting the least recently used sets once they exceed `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.dictionaries = {kind: IdDictionary() for kind in MEMBER_KINDS}
+        self._entries: "OrderedDict[str, ListingSetMembers]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dictionary_rebuilds = 0
+
+    def _load(self, db: Session, listing_set_id: str, version: int, dictionaries: Dict[str, IdDictionary]) -> ListingSetMembers:
+        members = graph_crud.get_listing_set_members(db, listing_set_id)
+        return ListingSetMembers(version, {
+            kind: CompressedBitmap.from_ids(dictionaries[kind].encode(values))
+            for kind, values in members.items()
+        }, dictionaries)
+
+    def get(self, db: Session, listing_set_ids: List[str], owner_username: str) -> Optional[Dict[str, ListingSetMembers]]:
+        """
+        Returns the members of the user's ListingSets, by id, loading the sets that
+        changed since they were last read. Returns None if one is not owned by the user.
+        All the returned sets share the same id dictionaries.
+        """
+        versions = listings_crud.get_listing_set_versions(db, owner_username, listing_set_ids)
+        if len(versions) < len(set(listing_set_ids)):
+            return None
+        with self._lock:
+            dictionaries = self.dictionaries
+        result = {}
+        for listing_set_id, version in versions.items():
+            with self._lock:
+                entry = self._entries.get(listing_set_id)
+                if entry is not None and entry.version == version and entry.dictionaries is dictionaries:
+                    self._entries.move_to_end(listing_set_id)
+                    self.hits += 1
+                    result[listing_set_id] = entry
+                    continue
+                self.misses += 1
+            # Loading runs outside the lock; two concurrent misses may both load.
+            entry = self._load(db, listing_set_id, version, dictionaries)
+            with self._lock:
+                # Entries encoded with dictionaries rebuilt since are returned but not kept.
+                if dictionaries is self.dictionaries:
+                    self._drop(listing_set_id)
+                    self._entries[listing_set_id] = entry
+                    self._size_bytes += entry.nbytes
+            result[listing_set_id] = entry
+        with self._lock:
+            self._evict()
+        return result
+
+    def _drop(self, listing_set_id: str):
+        entry = self._entries.pop(listing_set_id, None)
+        if entry is not None:
+            self._size_bytes -= entry.nbytes
+
+    def _evict(self):
+        while self._entries and self._size_bytes > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._size_bytes -= entry.nbytes
+            self.evictions += 1
+        # The sizes of the cached bitmaps bound the number of live ids from above.
+        live = {kind: sum(len(entry.bitmaps[kind]) for entry in self._entries.values() if kind in entry.bitmaps) for kind in MEMBER_KINDS}
+        if any(
+            len(dictionary) > max(DICTIONARY_REBUILD_MIN_IDS, DICTIONARY_REBUILD_FACTOR * live[kind])
+            for kind, dictionary in self.dictionaries.items()
+        ):
+            self._rebuild_dictionaries()
+
+    def _rebuild_dictionaries(self):
+        """Renumbers the ids used by the cached sets densely, in their current order."""
+        kept = {}
+        for kind, dictionary in self.dictionaries.items():
+            ids = [entry.bitmaps[kind].to_array() for entry in self._entries.values() if kind in entry.bitmaps]
+            kept[kind] = np.unique(np.concatenate(ids)) if ids else np.empty(0, dtype=np.uint32)
+        dictionaries = {kind: IdDictionary(dictionary.decode(kept[kind])) for kind, dictionary in self.dictionaries.items()}
+        for listing_set_id, entry in self._entries.items():
+            # Requests still holding the old entry keep decoding with the old dictionaries.
+            self._entries[listing_set_id] = ListingSetMembers(entry.version, {
+                kind: CompressedBitmap.from_ids(np.searchsorted(kept[kind], bitmap.to_array()).astype(np.uint32))
+                for kind, bitmap in entry.bitmaps.items()
+            }, dictionaries)
+        self.dictionaries = dictionaries
+        self._size_bytes = sum(entry.nbytes for entry in self._entries.values())
+        self.dictionary_rebuilds += 1
+
+    def invalidate(self, listing_set_id: str):
+        with self._lock:
+            self._drop(listing_set_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "evictions": self.evictions,
+                "dictionary_rebuilds": self.dictionary_rebuilds,
+            }
+
+
+# Create a single instance for the entire application.
+membership_index = MembershipIndex(MEMBERSHIP_INDEX_MB * 1024 * 1024)
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.core.path_engine import AdjacencyProvider
+
+# ---
+# k-hop neighbourhood of a subscriber in the contact network. The search grows
+# one BFS level at a time (one provider call per hop) and keeps only the
+# `fan_out` heaviest contacts of every expanded subscriber, so a hub adds at most
+# `fan_out` nodes instead of everyone it ever called.
+# ---
+
+# Hard limit on the subscribers returned, whatever the depth and fan-out.
+NEIGHBORHOOD_MAX_NODES = 5000
+
+
+@dataclass
+class Neighborhood:
+    root: str
+    # Hop distance of every kept subscriber from the root.
+    hops: Dict[str, int] = field(default_factory=dict)
+    # One undirected (a, b) -> {calls, sms} entry per kept contact.
+    edges: Dict[Tuple[str, str], dict] = field(default_factory=dict)
+    # Contacts left out by the fan-out cap or the node limit.
+    hidden_contacts: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.hidden_contacts > 0
+
+
+def expand_neighborhood(
+    provider: AdjacencyProvider,
+    root: str,
+    depth: int = 1,
+    fan_out: Optional[int] = None,
+    max_nodes: int = NEIGHBORHOOD_MAX_NODES,
+) -> Neighborhood:
+    """
+    Returns the subscribers at most `depth` contacts away from `root`, expanding
+    only the `fan_out` heaviest contacts of every subscriber (all when None).
+    """
+    result = Neighborhood(root=root, hops={root: 0})
+    frontier = [root]
+    for hop in range(1, depth + 1):
+        if not frontier:
+            break
+        adjacency = provider.weighted_neighbors(frontier, fan_out)
+        next_frontier = []
+        for phone_number in frontier:
+            total, contacts = adjacency.get(phone_number, (0, []))
+            result.hidden_contacts += total - len(contacts)
+            for neighbor, calls, sms in contacts:
+                if neighbor not in result.hops:
+                    if len(result.hops) >= max_nodes:
+                        result.hidden_contacts += 1
+                        continue
+                    result.hops[neighbor] = hop
+                    next_frontier.append(neighbor)
+                result.edges.setdefault(tuple(sorted((phone_number, neighbor))), {"calls": calls, "sms": sms})
+        frontier = next_frontier
+    return result
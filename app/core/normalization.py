@@ -0,0 +1,445 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.geo import TILE_ZOOM_LEVELS, lonlat_to_tile
+from app.core.parsing_helpers import RowExtractor, compile_row_extractor
+
+# The date format from the Excel parser is Day/Month/Year.
+TIMESTAMP_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+# Scope of the hourly activity buckets that count every communication of a
+# ListingSet; the other buckets are scoped to one subscriber's phone number.
+ACTIVITY_SCOPE_LISTING_SET = "listing_set"
+
+_ZERO, _NINE = ord('0'), ord('9')
+# Layout of "dd/mm/YYYY HH:MM:SS": (field, first char, width)
+_TIMESTAMP_LAYOUT = (("day", 0, 2), ("month", 3, 2), ("year", 6, 4), ("hour", 11, 2), ("minute", 14, 2), ("second", 17, 2))
+_TIMESTAMP_SEPARATORS = ((2, '/'), (5, '/'), (10, ' '), (13, ':'), (16, ':'))
+
+
+@dataclass
+class ListingBatch:
+    """
+    A chunk of normalized CDR rows stored column by column. `skipped` and `rejected`
+    hold (row position, reason) for the input rows that did not make it into the batch.
+    """
+    caller: np.ndarray
+    recipient: np.ndarray
+    timestamp: np.ndarray  # datetime64[s]
+    duration_str: np.ndarray  # object, may contain None
+    is_sms: np.ndarray  # bool
+    imei: np.ndarray  # object
+    location: np.ndarray  # object
+    lon: np.ndarray  # float64, NaN when unknown
+    lat: np.ndarray  # float64, NaN when unknown
+    fingerprint: np.ndarray = None  # object, hex content hash per row
+    rows_seen: int = 0
+    skipped: List[Tuple[int, Optional[str]]] = field(default_factory=list)
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.fingerprint is None:
+            self.fingerprint = fingerprint_rows(self)
+
+    def __len__(self) -> int:
+        return len(self.caller)
+
+    @property
+    def communication_type(self) -> np.ndarray:
+        return np.where(self.is_sms, 'SMS', 'CALL')
+
+    def select(self, mask: np.ndarray) -> "ListingBatch":
+        """Returns the rows where `mask` is True as a new batch (without the skip/reject bookkeeping)."""
+        return ListingBatch(
+            caller=self.caller[mask],
+            recipient=self.recipient[mask],
+            timestamp=self.timestamp[mask],
+            duration_str=self.duration_str[mask],
+            is_sms=self.is_sms[mask],
+            imei=self.imei[mask],
+            location=self.location[mask],
+            lon=self.lon[mask],
+            lat=self.lat[mask],
+            fingerprint=self.fingerprint[mask],
+        )
+
+    def to_columns(self) -> Dict[str, list]:
+        """Plain Python columns, ready to be sent as query parameters."""
+        return {
+            "caller": self.caller.tolist(),
+            "recipient": self.recipient.tolist(),
+            "timestamp": np.datetime_as_string(self.timestamp, unit='s').tolist(),
+            "duration_str": self.duration_str.tolist(),
+            "is_sms": self.is_sms.tolist(),
+            "imei": self.imei.tolist(),
+            "location": self.location.tolist(),
+            "lon": [None if np.isnan(v) else v for v in self.lon.tolist()],
+            "lat": [None if np.isnan(v) else v for v in self.lat.tolist()],
+            "fingerprint": self.fingerprint.tolist(),
+        }
+
+
+    def contact_columns(self) -> Dict[str, list]:
+        """
+        Aggregates the rows per (caller, recipient) pair into the counters kept on
+        CONTACTED edges: calls, SMS, first and last timestamp.
+        """
+        if len(self) == 0:
+            return {"caller": [], "recipient": [], "calls": [], "sms": [], "first_seen": [], "last_seen": []}
+        pairs = np.array([f"{caller}\x1f{recipient}" for caller, recipient in zip(self.caller, self.recipient)])
+        _, first_row, pair_index = np.unique(pairs, return_index=True, return_inverse=True)
+        sms = np.bincount(pair_index, weights=self.is_sms, minlength=len(first_row)).astype(np.int64)
+        total = np.bincount(pair_index, minlength=len(first_row))
+
+        seconds = self.timestamp.astype(np.int64)
+        first_seen = np.full(len(first_row), np.iinfo(np.int64).max)
+        last_seen = np.full(len(first_row), np.iinfo(np.int64).min)
+        np.minimum.at(first_seen, pair_index, seconds)
+        np.maximum.at(last_seen, pair_index, seconds)
+        return {
+            "caller": self.caller[first_row].tolist(),
+            "recipient": self.recipient[first_row].tolist(),
+            "calls": (total - sms).tolist(),
+            "sms": sms.tolist(),
+            "first_seen": np.datetime_as_string(first_seen.astype('datetime64[s]'), unit='s').tolist(),
+            "last_seen": np.datetime_as_string(last_seen.astype('datetime64[s]'), unit='s').tolist(),
+        }
+
+    def device_columns(self) -> Dict[str, list]:
+        """
+        Aggregates the rows per (caller, IMEI) pair into the counters kept on USED
+        edges: communications, first and last timestamp.
+        """
+        if len(self) == 0:
+            return {"caller": [], "imei": [], "communications": [], "first_seen": [], "last_seen": []}
+        pairs = np.array([f"{caller}\x1f{imei}" for caller, imei in zip(self.caller, self.imei)])
+        _, first_row, pair_index = np.unique(pairs, return_index=True, return_inverse=True)
+        seconds = self.timestamp.astype(np.int64)
+        first_seen = np.full(len(first_row), np.iinfo(np.int64).max)
+        last_seen = np.full(len(first_row), np.iinfo(np.int64).min)
+        np.minimum.at(first_seen, pair_index, seconds)
+        np.maximum.at(last_seen, pair_index, seconds)
+        return {
+            "caller": self.caller[first_row].tolist(),
+            "imei": self.imei[first_row].tolist(),
+            "communications": np.bincount(pair_index, minlength=len(first_row)).tolist(),
+            "first_seen": np.datetime_as_string(first_seen.astype('datetime64[s]'), unit='s').tolist(),
+            "last_seen": np.datetime_as_string(last_seen.astype('datetime64[s]'), unit='s').tolist(),
+        }
+
+    def activity_columns(self) -> Dict[str, list]:
+        """
+        Aggregates the rows into hourly buckets of calls and SMS: one per hour for
+        the whole batch (ACTIVITY_SCOPE_LISTING_SET), and one per hour for every
+        subscriber taking part in a communication, as caller or recipient.
+        """
+        if len(self) == 0:
+            return {"scope": [], "hour": [], "calls": [], "sms": []}
+        hours = np.datetime_as_string(self.timestamp.astype('datetime64[h]').astype('datetime64[s]'), unit='s')
+        # A subscriber calling itself takes part once, not as caller and recipient.
+        other = self.recipient != self.caller
+        scopes = np.concatenate([
+            np.full(len(self), ACTIVITY_SCOPE_LISTING_SET), self.caller.astype(str), self.recipient[other].astype(str)
+        ])
+        scope_hours = np.concatenate([hours, hours, hours[other]])
+        keys = np.char.add(np.char.add(scopes, "\x1f"), scope_hours)
+        _, first_row, bucket_index = np.unique(keys, return_index=True, return_inverse=True)
+        is_sms = np.concatenate([self.is_sms, self.is_sms, self.is_sms[other]])
+        sms = np.bincount(bucket_index, weights=is_sms, minlength=len(first_row)).astype(np.int64)
+        total = np.bincount(bucket_index, minlength=len(first_row))
+        return {
+            "scope": scopes[first_row].tolist(),
+            "hour": scope_hours[first_row].tolist(),
+            "calls": (total - sms).tolist(),
+            "sms": sms.tolist(),
+        }
+
+    def tile_columns(self) -> Dict[str, list]:
+        """
+        Aggregates the rows with known coordinates into map tile counters of calls
+        and SMS, one per (zoom, x, y) tile at every zoom level of TILE_ZOOM_LEVELS.
+        """
+        located = ~np.isnan(self.lon) & ~np.isnan(self.lat)
+        if not located.any():
+            return {"zoom": [], "x": [], "y": [], "calls": [], "sms": []}
+        lon, lat, is_sms = self.lon[located], self.lat[located], self.is_sms[located]
+        # zoom <= 16, so x and y fit in 24 bits each of one int64 key.
+        keys = np.concatenate([
+            (np.int64(zoom) << 48) | (x << 24) | y
+            for zoom in TILE_ZOOM_LEVELS
+            for x, y in [lonlat_to_tile(lon, lat, zoom)]
+        ])
+        tiles, tile_index = np.unique(keys, return_inverse=True)
+        sms = np.bincount(tile_index, weights=np.tile(is_sms, len(TILE_ZOOM_LEVELS)), minlength=len(tiles)).astype(np.int64)
+        total = np.bincount(tile_index, minlength=len(tiles))
+        return {
+            "zoom": (tiles >> 48).tolist(),
+            "x": ((tiles >> 24) & 0xFFFFFF).tolist(),
+            "y": (tiles & 0xFFFFFF).tolist(),
+            "calls": (total - sms).tolist(),
+            "sms": sms.tolist(),
+        }
+
+
+def fingerprint_rows(batch: ListingBatch) -> np.ndarray:
+    """
+    Content hash of every row: caller, callee, timestamp, type, duration and IMEI.
+    Two CDRs with the same fingerprint describe the same communication.
+    """
+    timestamps = np.datetime_as_string(batch.timestamp, unit='s')
+    fingerprints = np.empty(len(batch.caller), dtype=object)
+    for i, parts in enumerate(zip(batch.caller, batch.recipient, timestamps, batch.communication_type, batch.duration_str, batch.imei)):
+        content = "\x1f".join("" if part is None else str(part) for part in parts)
+        fingerprints[i] = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+    return fingerprints
+
+
+def _codepoints(values: np.ndarray) -> np.ndarray:
+    """Views a unicode array as an (n, width) matrix of code points."""
+    width = max(values.dtype.itemsize // 4, 1)
+    return np.ascontiguousarray(values.astype(f'U{width}')).view(np.uint32).reshape(len(values), width)
+
+
+def _from_codepoints(codepoints: np.ndarray) -> np.ndarray:
+    """Inverse of _codepoints; trailing zeros become the end of the string."""
+    width = codepoints.shape[1]
+    return np.ascontiguousarray(codepoints).view(f'U{width}').reshape(len(codepoints))
+
+
+def clean_phone_numbers(values: np.ndarray, keep_text: np.ndarray) -> np.ndarray:
+    """
+    Keeps only the digits of each number and strips the 237 country prefix.
+    Entries flagged in `keep_text` (named SMS services) are only trimmed.
+    """
+    if len(values) == 0:
+        return values.astype(str)
+    cp = _codepoints(values)
+    is_digit = (cp >= _ZERO) & (cp <= _NINE)
+    # Stable sort on "not a digit" moves the digits to the front in their original order.
+    order = np.argsort(~is_digit, axis=1, kind='stable')
+    digits = np.take_along_axis(np.where(is_digit, cp, 0), order, axis=1)
+
+    # str.isdigit() also accepts non-ASCII digits; leave those rare rows to Python.
+    exotic = (cp > 127).any(axis=1)
+
+    if digits.shape[1] >= 3:
+        has_prefix = (digits[:, 0] == ord('2')) & (digits[:, 1] == ord('3')) & (digits[:, 2] == ord('7'))
+        shifted = np.zeros_like(digits)
+        shifted[:, :-3] = digits[:, 3:]
+        digits = np.where(has_prefix[:, None], shifted, digits)
+
+    cleaned = _from_codepoints(digits).astype(object)
+    text_rows = np.flatnonzero(keep_text | exotic)
+    for i in text_rows:
+        value = str(values[i])
+        value = value.strip() if keep_text[i] else "".join(filter(str.isdigit, value))
+        cleaned[i] = value[3:] if value.startswith('237') else value
+    return cleaned
+
+
+def parse_timestamps(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses Day/Month/Year timestamps. Strictly formatted values are decoded from their
+    code points in bulk; anything else goes through datetime.strptime.
+    Returns (datetime64[s] array, list of error messages or None per row).
+    """
+    n = len(values)
+    parsed = np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+    errors = np.full(n, None, dtype=object)
+    if n == 0:
+        return parsed, errors
+
+    strict = np.char.str_len(values.astype(str)) == 19
+    fallback = ~strict
+    if strict.any():
+        cp = _codepoints(values[strict].astype('U19'))
+        ok = np.ones(len(cp), dtype=bool)
+        for position, separator in _TIMESTAMP_SEPARATORS:
+            ok &= cp[:, position] == ord(separator)
+        parts = {}
+        for name, start, width in _TIMESTAMP_LAYOUT:
+            digits = cp[:, start:start + width].astype(np.int64) - _ZERO
+            ok &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+            parts[name] = (digits * (10 ** np.arange(width - 1, -1, -1))).sum(axis=1)
+
+        ok &= (parts["month"] >= 1) & (parts["month"] <= 12) & (parts["day"] >= 1) & (parts["year"] >= 1)
+        ok &= (parts["hour"] <= 23) & (parts["minute"] <= 59) & (parts["second"] <= 59)
+        months = ((parts["year"] - 1970) * 12 + parts["month"] - 1).astype('datetime64[M]')
+        days = months.astype('datetime64[D]') + (parts["day"] - 1)
+        # Day 31 of a 30-day month rolls into the next month: that is an invalid date.
+        ok &= days.astype('datetime64[M]') == months
+
+        seconds = parts["hour"] * 3600 + parts["minute"] * 60 + parts["second"]
+        strict_parsed = days.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+        strict_index = np.flatnonzero(strict)
+        parsed[strict_index[ok]] = strict_parsed[ok]
+        fallback[strict_index[~ok]] = True
+
+    for i in np.flatnonzero(fallback):
+        try:
+            parsed[i] = np.datetime64(datetime.strptime(str(values[i]), TIMESTAMP_FORMAT), 's')
+        except ValueError as e:
+            errors[i] = str(e)
+    return parsed, errors
+
+
+def parse_coordinates(locations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Extracts longitude/latitude from "Long: x Lat: y Azimut: z" strings (NaN when absent)."""
+    n = len(locations)
+    lon = np.full(n, np.nan)
+    lat = np.full(n, np.nan)
+    if n == 0:
+        return lon, lat
+    text = locations.astype(str)
+    has_coords = (np.char.find(text, "Long:") >= 0) & (np.char.find(text, "Lat:") >= 0)
+    if not has_coords.any():
+        return lon, lat
+
+    text = text[has_coords]
+    # Mirrors split("Long:")[1].split("Lat:")[0] and split("Lat:")[1].split("Azimut:")[0]
+    after_long = np.char.partition(np.char.partition(text, "Long:")[:, 2], "Long:")[:, 0]
+    lon_text = np.char.strip(np.char.partition(after_long, "Lat:")[:, 0])
+    after_lat = np.char.partition(np.char.partition(text, "Lat:")[:, 2], "Lat:")[:, 0]
+    lat_text = np.char.strip(np.char.partition(after_lat, "Azimut:")[:, 0])
+
+    index = np.flatnonzero(has_coords)
+    try:
+        lon_values = lon_text.astype(np.float64)
+        lat_values = lat_text.astype(np.float64)
+        lon[index] = lon_values
+        lat[index] = lat_values
+    except ValueError:
+        # A malformed value anywhere in the chunk: parse row by row, like the original.
+        for i, lon_str, lat_str in zip(index, lon_text, lat_text):
+            try:
+                lon[i] = float(lon_str)
+                lat[i] = float(lat_str)
+            except ValueError:
+                pass
+    return lon, lat
+
+
+def _column(values: list) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def normalize_listing_batch(rows: List[dict], extractor: RowExtractor = None, field_map: Dict[str, list] = None) -> ListingBatch:
+    """
+    Normalizes a chunk of raw listing rows column by column.
+    Produces the same values as normalizing each row on its own, plus the positions
+    of skipped (missing core data / unusable number) and rejected (invalid) rows.
+    """
+    if extractor is None:
+        first = next((row for row in rows if row), {})
+        extractor = compile_row_extractor(first.keys(), field_map)
+
+    positions, extracted = [], []
+    skipped: List[Tuple[int, Optional[str]]] = []
+    for position, row in enumerate(rows):
+        if row:
+            positions.append(position)
+            extracted.append(extractor.extract(row))
+        else:
+            skipped.append((position, None))
+
+    columns = {name: _column([values[name] for values in extracted]) for name in extractor.field_map}
+    positions = np.asarray(positions, dtype=np.int64)
+    rejected: List[Tuple[int, str]] = []
+
+    # 1. Rows without caller, recipient or timestamp are skipped.
+    core = (columns["caller"] != None) & (columns["recipient"] != None) & (columns["timestamp"] != None)  # noqa: E711
+    for position in positions[~core]:
+        skipped.append((int(position), "missing core data (caller, recipient, or timestamp)"))
+    keep = core
+
+    # 2. Timestamps that do not parse reject the row.
+    timestamps, timestamp_errors = parse_timestamps(np.where(core, columns["timestamp"], '').astype(str))
+    bad_timestamp = core & (timestamp_errors != None)  # noqa: E711
+    for position, error in zip(positions[bad_timestamp], timestamp_errors[bad_timestamp]):
+        rejected.append((int(position), error))
+    keep = keep & ~bad_timestamp
+
+    # 3. Phone cleaning and SMS detection.
+    duration_text = np.char.lower(np.array([str(v) for v in columns["duration"]], dtype=str))
+    sms_duration = np.char.find(duration_text, "sms") >= 0
+    recipient_text = np.where(core, columns["recipient"], '').astype(str)
+    recipient_codepoints = _codepoints(recipient_text)
+    recipient_has_digit = ((recipient_codepoints >= _ZERO) & (recipient_codepoints <= _NINE)).any(axis=1)
+    recipient_is_service = sms_duration & ~recipient_has_digit
+    # Non-ASCII recipients may hold digits str.isdigit() accepts; decide those in Python.
+    for i in np.flatnonzero(sms_duration & (recipient_codepoints > 127).any(axis=1)):
+        recipient_is_service[i] = not any(char.isdigit() for char in recipient_text[i])
+
+    caller = clean_phone_numbers(np.where(core, columns["caller"], '').astype(str), np.zeros(len(positions), dtype=bool))
+    recipient = clean_phone_numbers(recipient_text, recipient_is_service)
+    usable = (np.char.str_len(caller.astype(str)) >= 8) & (np.char.str_len(recipient.astype(str)) > 0)
+    for position in positions[keep & ~usable]:
+        skipped.append((int(position), None))
+    keep = keep & usable
+
+    # 4. Device and tower are MERGE keys and cannot be null.
+    missing_keys = keep & ((columns["imei"] == None) | (columns["location"] == None))  # noqa: E711
+    for position in positions[missing_keys]:
+        rejected.append((int(position), "cannot merge Device/CellTower without an IMEI and a location"))
+    keep = keep & ~missing_keys
+
+    lon, lat = parse_coordinates(np.where(keep, columns["location"], '').astype(str))
+
+    skipped.sort()
+    rejected.sort()
+    return ListingBatch(
+        caller=caller[keep].astype(str),
+        recipient=recipient[keep].astype(str),
+        timestamp=timestamps[keep],
+        duration_str=columns["duration"][keep],
+        is_sms=(sms_duration | recipient_is_service)[keep],
+        imei=columns["imei"][keep],
+        location=columns["location"][keep],
+        lon=lon[keep],
+        lat=lat[keep],
+        rows_seen=len(rows),
+        skipped=skipped,
+        rejected=rejected,
+    )
+
+
+def _normalize_chunk(args) -> ListingBatch:
+    rows, field_map = args
+    return normalize_listing_batch(rows, field_map=field_map)
+
+
+def normalize_in_pool(
+    chunks: Iterable[List[dict]],
+    field_map: Dict[str, list],
+    workers: int,
+    fallback: Callable[[List[dict], Exception], ListingBatch] = None
+) -> Iterator[Tuple[List[dict], ListingBatch]]:
+    """
+    Normalizes chunks across a process pool, yielding (chunk, batch) in input order.
+    At most two chunks per worker are in flight, so memory stays bounded. A chunk
+    whose normalization raises is handed to `fallback(chunk, error)`, if given.
+    """
+    def result(chunk: List[dict], future) -> ListingBatch:
+        try:
+            return future.result()
+        except Exception as e:
+            if fallback is None:
+                raise
+            return fallback(chunk, e)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_normalize_chunk, (chunk, field_map))))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.pop(0)
+                yield chunk, result(chunk, future)
+        for chunk, future in pending:
+            yield chunk, result(chunk, future)
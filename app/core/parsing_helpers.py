@@ -1,4 +1,5 @@
 import re
+from typing import Dict, Iterable, List, Optional
 
 def normalize_key(key: str) -> str:
     """Normalizes a string for matching by lowercasing, removing accents, and simplifying."""
@@ -38,4 +39,75 @@ def find_field_value(row: dict, possible_fields: list, exclude_fields: list = []
             if key.startswith(normalized_field) and key not in normalized_exclude:
                 return str(normalized_row[key])
                     
-    return None
\ No newline at end of file
+    return None
+
+class RowExtractor:
+    """
+    A column-resolution plan compiled once per import. Every field is resolved to
+    the ordered list of source columns that `find_field_value` would try, so each
+    row only needs plain dict lookups instead of re-normalizing all of its keys.
+    """
+
+    def __init__(self, header: Iterable[str], field_map: Dict[str, list]):
+        self.field_map = field_map
+        self.header: List[str] = []
+        self.header_keys = frozenset()
+        self.columns: Dict[str, List[str]] = {}
+        self.recompiles = 0
+        self._compile(header)
+
+    def _compile(self, header: Iterable[str]):
+        # New columns are slotted in after the column that precedes them in this
+        # header, so the plan keeps the sheet's column order when it widens.
+        previous = None
+        for key in header:
+            if key not in self.header_keys:
+                position = self.header.index(previous) + 1 if previous is not None else 0
+                self.header.insert(position, key)
+                self.header_keys = self.header_keys | {key}
+            previous = key
+
+        normalized_header = {}
+        for key in self.header:
+            # Later duplicates win, like the value overwrite in find_field_value
+            normalized_header.setdefault(normalize_key(key), []).insert(0, key)
+
+        for name, possible_fields in self.field_map.items():
+            candidates = []
+            for field in possible_fields:
+                normalized_field = normalize_key(field)
+                # 1. Exact matches first, then 2. keys that START WITH the field name
+                candidates.extend(normalized_header.get(normalized_field, []))
+                for normalized, keys in normalized_header.items():
+                    if normalized.startswith(normalized_field):
+                        candidates.extend(keys)
+            self.columns[name] = list(dict.fromkeys(candidates))
+
+    def extract(self, row: dict) -> Dict[str, Optional[str]]:
+        """Returns the value of every planned field for a row (None when absent or empty)."""
+        if not row.keys() <= self.header_keys:
+            # Ragged row with columns the plan has not seen yet: widen the plan.
+            self._compile(row.keys())
+            self.recompiles += 1
+
+        values = {}
+        for name, columns in self.columns.items():
+            values[name] = None
+            for column in columns:
+                value = row.get(column)
+                if value is not None and str(value).strip() != '':
+                    values[name] = str(value)
+                    break
+        return values
+
+    def describe(self) -> Dict[str, Optional[str]]:
+        """Diagnostic view: the source column each field is read from (None if unmapped)."""
+        return {name: columns[0] if columns else None for name, columns in self.columns.items()}
+
+
+def compile_row_extractor(header: Iterable[str], field_map: Dict[str, list]) -> RowExtractor:
+    """
+    Builds a RowExtractor from a header (or the keys of the first row).
+    `field_map` maps an output field name to its list of possible source keys.
+    """
+    return RowExtractor(header, field_map)
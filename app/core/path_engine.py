@@ -0,0 +1,273 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from neo4j import Query, Session
+from neo4j.exceptions import Neo4jError
+
+# ---
+# Bounded bidirectional BFS over the subscriber contact network. The search
+# grows one BFS level at a time from whichever side has the smaller frontier and
+# asks an AdjacencyProvider for the neighbours of the whole frontier at once, so
+# a level costs one database round trip. Devices and cell towers are never
+# traversed: only Subscriber-to-Subscriber contacts are edges here.
+# ---
+
+COMMUNICATION_TYPES = ("CALL", "SMS")
+
+# (phone number, calls, sms) of one contact.
+Contact = Tuple[str, int, int]
+
+STATUS_FOUND = "found"
+STATUS_NOT_FOUND = "not_found"  # the whole reachable component was explored
+STATUS_MAX_DEPTH = "max_depth"
+STATUS_TIMEOUT = "timeout"
+
+
+class PathSearchTimeout(Exception):
+    """Raised by an AdjacencyProvider when its query runs out of time."""
+
+
+class AdjacencyProvider(Protocol):
+    def neighbors(self, frontier: Sequence[str], timeout: float) -> Dict[str, List[str]]:
+        """Returns the contacts of every phone number in `frontier`, within `timeout` seconds."""
+
+    def missing(self, phone_numbers: Sequence[str]) -> List[str]:
+        """Returns the phone numbers that are not known subscribers."""
+
+    def weighted_neighbors(self, frontier: Sequence[str], fan_out: Optional[int]) -> Dict[str, Tuple[int, List[Contact]]]:
+        """
+        Returns, for every phone number in `frontier`, its number of contacts and its
+        `fan_out` heaviest contacts (all of them when None), heaviest first.
+        """
+
+
+class CypherContactAdjacency:
+    """
+    Reads contacts from Neo4j. Unscoped searches walk the pre-aggregated CONTACTED
+    edges. ListingSet-scoped searches walk CONTACTED edges tagged with one of the
+    sets, or the communications themselves when only some types are allowed,
+    because CONTACTED counters are not kept per set. Searches limited to a time
+    window (ISO 8601 `start`/`end`, end excluded) always walk the communications.
+    """
+
+    CONTACTS_QUERY = """
+    UNWIND $frontier AS phone
+    MATCH (s:Subscriber {phoneNumber: phone})-[r:CONTACTED]-(n:Subscriber)
+    WHERE n <> s
+      AND ((r.calls > 0 AND 'CALL' IN $types) OR (r.sms > 0 AND 'SMS' IN $types))
+      AND ($listing_set_ids IS NULL OR any(id IN r.listing_sets WHERE id IN $listing_set_ids))
+    RETURN phone, collect(DISTINCT n.phoneNumber) AS neighbors
+    """
+
+    SCOPED_COMMUNICATIONS_QUERY = """
+    UNWIND $frontier AS phone
+    MATCH (s:Subscriber {phoneNumber: phone})-[:INITIATED|IS_DIRECTED_TO]-(c:Communication)-[:INITIATED|IS_DIRECTED_TO]-(n:Subscriber)
+    WHERE n <> s AND c.type IN $types
+      AND ($start IS NULL OR c.timestamp >= datetime($start))
+      AND ($end IS NULL OR c.timestamp < datetime($end))
+      AND ($listing_set_ids IS NULL OR EXISTS { MATCH (c)-[:PART_OF]->(ls:ListingSet) WHERE ls.id IN $listing_set_ids })
+    RETURN phone, collect(DISTINCT n.phoneNumber) AS neighbors
+    """
+
+    # Both directions of a pair are summed; the heaviest contacts come first.
+    WEIGHTED_CONTACTS_QUERY = """
+    UNWIND $frontier AS phone
+    MATCH (s:Subscriber {phoneNumber: phone})-[r:CONTACTED]-(n:Subscriber)
+    WHERE n <> s
+    WITH phone, n.phoneNumber AS neighbor,
+         sum(CASE WHEN 'CALL' IN $types THEN r.calls ELSE 0 END) AS calls,
+         sum(CASE WHEN 'SMS' IN $types THEN r.sms ELSE 0 END) AS sms
+    WHERE calls + sms > 0
+    WITH phone, neighbor, calls, sms ORDER BY calls + sms DESC, neighbor
+    WITH phone, count(*) AS total, collect([neighbor, calls, sms]) AS contacts
+    RETURN phone, total, CASE WHEN $fan_out IS NULL THEN contacts ELSE contacts[..$fan_out] END AS contacts
+    """
+
+    WEIGHTED_COMMUNICATIONS_QUERY = """
+    UNWIND $frontier AS phone
+    MATCH (s:Subscriber {phoneNumber: phone})-[:INITIATED|IS_DIRECTED_TO]-(c:Communication)-[:INITIATED|IS_DIRECTED_TO]-(n:Subscriber)
+    WHERE n <> s AND c.type IN $types
+      AND ($start IS NULL OR c.timestamp >= datetime($start))
+      AND ($end IS NULL OR c.timestamp < datetime($end))
+      AND ($listing_set_ids IS NULL OR EXISTS { MATCH (c)-[:PART_OF]->(ls:ListingSet) WHERE ls.id IN $listing_set_ids })
+    WITH phone, n.phoneNumber AS neighbor,
+         count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+         count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+    WITH phone, neighbor, calls, sms ORDER BY calls + sms DESC, neighbor
+    WITH phone, count(*) AS total, collect([neighbor, calls, sms]) AS contacts
+    RETURN phone, total, CASE WHEN $fan_out IS NULL THEN contacts ELSE contacts[..$fan_out] END AS contacts
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        listing_set_ids: Optional[List[str]] = None,
+        types: Iterable[str] = COMMUNICATION_TYPES,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ):
+        self.session = session
+        self.listing_set_ids = listing_set_ids or None
+        self.types = sorted(set(types))
+        self.start, self.end = start, end
+        windowed = start is not None or end is not None
+        if windowed or (self.listing_set_ids and len(self.types) < len(COMMUNICATION_TYPES)):
+            self.query = self.SCOPED_COMMUNICATIONS_QUERY
+        else:
+            self.query = self.CONTACTS_QUERY
+        # Weighted contacts need counts per set, which CONTACTED edges do not keep.
+        if windowed or self.listing_set_ids:
+            self.weighted_query = self.WEIGHTED_COMMUNICATIONS_QUERY
+        else:
+            self.weighted_query = self.WEIGHTED_CONTACTS_QUERY
+
+    def _parameters(self) -> dict:
+        return {"types": self.types, "listing_set_ids": self.listing_set_ids, "start": self.start, "end": self.end}
+
+    def neighbors(self, frontier: Sequence[str], timeout: float) -> Dict[str, List[str]]:
+        if timeout <= 0:
+            raise PathSearchTimeout()
+        try:
+            result = self.session.run(
+                Query(self.query, timeout=timeout),
+                frontier=list(frontier), **self._parameters()
+            )
+            return {record["phone"]: record["neighbors"] for record in result}
+        except Neo4jError as e:
+            # The server aborts transactions that exceed their timeout.
+            if "TransactionTimedOut" in (e.code or ""):
+                raise PathSearchTimeout() from e
+            raise
+
+    def missing(self, phone_numbers: Sequence[str]) -> List[str]:
+        result = self.session.run(
+            "UNWIND $phones AS phone OPTIONAL MATCH (s:Subscriber {phoneNumber: phone}) "
+            "WITH phone, s WHERE s IS NULL RETURN phone",
+            phones=list(phone_numbers)
+        )
+        return [record["phone"] for record in result]
+
+    def weighted_neighbors(self, frontier: Sequence[str], fan_out: Optional[int]) -> Dict[str, Tuple[int, List[Contact]]]:
+        result = self.session.run(self.weighted_query, frontier=list(frontier), fan_out=fan_out, **self._parameters())
+        return {
+            record["phone"]: (record["total"], [tuple(contact) for contact in record["contacts"]])
+            for record in result
+        }
+
+
+@dataclass
+class PathSearchResult:
+    paths: List[List[str]] = field(default_factory=list)
+    status: str = STATUS_NOT_FOUND
+    depth_reached: int = 0
+    visited: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        """False when the search stopped early (timeout) and a path may still exist."""
+        return self.status != STATUS_TIMEOUT
+
+
+class _Side:
+    """One direction of the search: BFS distances and every shortest-path parent."""
+
+    def __init__(self, root: str):
+        self.depth = 0
+        self.frontier = [root]
+        self.parents: Dict[str, List[str]] = {root: []}
+
+    def chains(self, node: str) -> Iterator[List[str]]:
+        """Yields every shortest chain from `node` back to this side's root."""
+        if not self.parents[node]:
+            yield [node]
+            return
+        for parent in self.parents[node]:
+            for chain in self.chains(parent):
+                yield [node] + chain
+
+
+def bidirectional_shortest_paths(
+    provider: AdjacencyProvider,
+    source: str,
+    target: str,
+    max_depth: int = 6,
+    k: int = 1,
+    timeout: float = 10.0,
+) -> PathSearchResult:
+    """
+    Finds up to `k` shortest paths (all of the minimal length) between two phone
+    numbers, at most `max_depth` contacts long. Stops after `timeout` seconds and
+    reports what it reached instead of running on.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    result = PathSearchResult()
+    if source == target:
+        result.paths, result.status = [[source]], STATUS_FOUND
+        return result
+
+    forward, backward = _Side(source), _Side(target)
+    meeting: List[str] = []
+    while forward.frontier and backward.frontier:
+        if forward.depth + backward.depth >= max_depth:
+            result.status = STATUS_MAX_DEPTH
+            break
+        # Growing the smaller frontier keeps both searches balanced.
+        side, other = (forward, backward) if len(forward.frontier) <= len(backward.frontier) else (backward, forward)
+        try:
+            adjacency = provider.neighbors(side.frontier, deadline - time.monotonic())
+        except PathSearchTimeout:
+            result.status = STATUS_TIMEOUT
+            break
+
+        next_frontier, next_level = [], set()
+        for node in side.frontier:
+            for neighbor in adjacency.get(node, ()):
+                if neighbor not in side.parents:
+                    side.parents[neighbor] = [node]
+                    next_frontier.append(neighbor)
+                    next_level.add(neighbor)
+                elif neighbor in next_level:
+                    # Another shortest way into a node of the same level.
+                    side.parents[neighbor].append(node)
+        side.frontier = next_frontier
+        side.depth += 1
+
+        meeting = [node for node in next_frontier if node in other.parents]
+        if meeting:
+            result.status = STATUS_FOUND
+            break
+        if time.monotonic() > deadline:
+            result.status = STATUS_TIMEOUT
+            break
+
+    if meeting:
+        # Nodes met on the other side's older levels can give shorter totals; keep the best.
+        best = min(_distance(forward, node) + _distance(backward, node) for node in meeting)
+        for node in meeting:
+            if _distance(forward, node) + _distance(backward, node) != best:
+                continue
+            for head in forward.chains(node):
+                for tail in backward.chains(node):
+                    result.paths.append(list(reversed(head)) + tail[1:])
+                    if len(result.paths) >= k:
+                        break
+                if len(result.paths) >= k:
+                    break
+            if len(result.paths) >= k:
+                break
+
+    result.depth_reached = forward.depth + backward.depth
+    result.visited = len(forward.parents) + len(backward.parents)
+    result.elapsed_seconds = round(time.monotonic() - started, 4)
+    return result
+
+
+def _distance(side: _Side, node: str) -> int:
+    distance = 0
+    while side.parents[node]:
+        node = side.parents[node][0]
+        distance += 1
+    return distance
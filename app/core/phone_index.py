@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Iterable, List, Literal, Optional, Tuple
+
+import numpy as np
+from neo4j import Session
+
+from app.core.config import INDEX_REFRESH_SECONDS
+from app.crud import graph_crud, listings_crud
+
+# ---
+# In-memory lookup of subscribers by a few digits of their phone number. The
+# numbers are kept in a sorted array, and reversed in a second sorted array, so
+# both a prefix and a suffix lookup are two binary searches instead of a scan of
+# every Subscriber node.
+# Ingestion adds the numbers of every committed chunk; the numbers already in
+# the database are loaded on the first lookup of the process, and reloaded when
+# the ListingSets' data version shows another process changed them.
+# ---
+
+LookupMode = Literal["prefix", "suffix"]
+
+# Sorts after every character a phone number can hold.
+_HIGHEST_CHARACTER = "\U0010ffff"
+
+
+def _reverse(numbers: np.ndarray) -> np.ndarray:
+    return np.array([number[::-1] for number in numbers.tolist()], dtype=str)
+
+
+def _matching_range(values: np.ndarray, prefix: str) -> Tuple[int, int]:
+    """Returns the [start, end) positions of the sorted values starting with `prefix`."""
+    start = int(np.searchsorted(values, prefix, side="left"))
+    end = int(np.searchsorted(values, prefix + _HIGHEST_CHARACTER, side="left"))
+    return start, end
+
+
+class PhoneNumberIndex:
+    """Sorted arrays of the known phone numbers, forwards and reversed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._numbers = np.empty(0, dtype=str)
+        self._reversed = np.empty(0, dtype=str)
+        # Numbers added since the last lookup; merged into the arrays lazily.
+        self._pending: List[np.ndarray] = []
+        self.loaded = False
+        # listings_crud.get_data_version() at the last load, and when it was last checked.
+        self._data_version: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._merge()
+            return len(self._numbers)
+
+    def add(self, *phone_numbers: Iterable[str]):
+        """Adds phone numbers (any number of arrays or lists); known numbers are ignored."""
+        with self._lock:
+            for numbers in phone_numbers:
+                numbers = np.asarray(numbers, dtype=str)
+                if len(numbers):
+                    self._pending.append(numbers)
+
+    def _merge(self):
+        if not self._pending:
+            return
+        fresh = np.setdiff1d(np.concatenate(self._pending), self._numbers)
+        self._pending.clear()
+        if len(fresh):
+            self._numbers = np.union1d(self._numbers, fresh)
+            self._reversed = np.union1d(self._reversed, _reverse(fresh))
+
+    def ensure_loaded(self, db: Session):
+        """
+        Loads every Subscriber phone number from Neo4j on first use, and again when
+        the data version changed since (checked at most every INDEX_REFRESH_SECONDS).
+        """
+        if self.loaded and time.monotonic() - self._checked_at < INDEX_REFRESH_SECONDS:
+            return
+        data_version = listings_crud.get_data_version(db)
+        self._checked_at = time.monotonic()
+        if self.loaded and data_version == self._data_version:
+            return
+        numbers = graph_crud.get_subscriber_phone_numbers(db)
+        with self._lock:
+            # Numbers added but not merged yet are kept; the load covers the rest.
+            self._numbers = np.empty(0, dtype=str)
+            self._reversed = np.empty(0, dtype=str)
+            self._pending.append(np.asarray(numbers, dtype=str))
+            self._data_version = data_version
+            self.loaded = True
+
+    def lookup(self, digits: str, mode: LookupMode = "prefix", limit: int = 20) -> Tuple[List[str], int]:
+        """
+        Returns up to `limit` phone numbers starting (or ending) with `digits`, and
+        how many numbers match in total.
+        """
+        with self._lock:
+            self._merge()
+            if mode == "suffix":
+                start, end = _matching_range(self._reversed, digits[::-1])
+                matches = sorted(number[::-1] for number in self._reversed[start:min(end, start + limit)].tolist())
+            else:
+                start, end = _matching_range(self._numbers, digits)
+                matches = self._numbers[start:min(end, start + limit)].tolist()
+        return matches, end - start
+
+    def clear(self):
+        with self._lock:
+            self._numbers = np.empty(0, dtype=str)
+            self._reversed = np.empty(0, dtype=str)
+            self._pending.clear()
+            self.loaded = False
+            self._data_version = None
+
+
+# Create a single instance for the entire application.
+phone_index = PhoneNumberIndex()
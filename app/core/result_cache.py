@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+
+from app.core.config import RESULT_CACHE_DIR, RESULT_CACHE_DISK_MB, RESULT_CACHE_MB
+
+# ---
+# Cache of serialized endpoint results, keyed by (endpoint, parameters, versions
+# of the ListingSets the result was read from). Ingestion, updates and deletions
+# bump a set's version, so a result computed from older data is never served:
+# its key simply stops matching, and invalidate() drops it right away.
+# Results evicted from memory can spill to a local directory, which is itself
+# bounded and evicted least recently used first. Every API process spills to its
+# own <RESULT_CACHE_DIR>/<pid> subdirectory, so processes never read or delete
+# each other's files; the disk budget is therefore per process.
+# ---
+
+SPILL_SUFFIX = ".result"
+
+
+@dataclass(frozen=True)
+class ResultKey:
+    endpoint: str
+    parameters: str
+    versions: Tuple[Tuple[str, int], ...]
+    # Results read from the whole graph depend on every ListingSet.
+    whole_graph: bool = False
+
+    def depends_on(self, listing_set_id: str) -> bool:
+        return self.whole_graph or any(version_id == listing_set_id for version_id, _ in self.versions)
+
+    @property
+    def file_name(self) -> str:
+        return hashlib.blake2b(repr(self).encode("utf-8"), digest_size=16).hexdigest() + SPILL_SUFFIX
+
+
+def result_key(endpoint: str, parameters: dict, versions: Dict[str, int], whole_graph: bool = False) -> ResultKey:
+    return ResultKey(
+        endpoint=endpoint,
+        parameters=json.dumps(parameters, sort_keys=True, default=str),
+        versions=tuple(sorted(versions.items())),
+        whole_graph=whole_graph,
+    )
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ResultCache:
+    """
+    LRU cache of result bytes bounded by `max_bytes`, with an optional spill
+    directory bounded by `max_disk_bytes`. The process's spill subdirectory, and
+    those of processes that are gone, are emptied on startup, since their keys
+    are not known anymore.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: Optional[str] = None, max_disk_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid())) if spill_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[ResultKey, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[ResultKey, int]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            for name in os.listdir(spill_dir):
+                if name.isdigit() and (int(name) == os.getpid() or not _process_alive(int(name))):
+                    shutil.rmtree(os.path.join(spill_dir, name), ignore_errors=True)
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    def get(self, key: ResultKey) -> Optional[bytes]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            if key in self._disk:
+                value = self._read_spilled(key)
+                if value is not None:
+                    self.disk_hits += 1
+                    self._store(key, value)
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: ResultKey, value: bytes):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: ResultKey, value: bytes):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory and self._memory_bytes > self.max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: ResultKey, value: bytes):
+        if not self.spill_dir or len(value) > self.max_disk_bytes:
+            return
+        # Written aside and renamed into place, so a reader never sees a partial file.
+        with tempfile.NamedTemporaryFile(dir=self.spill_dir, suffix=".tmp", delete=False) as f:
+            f.write(value)
+        os.replace(f.name, os.path.join(self.spill_dir, key.file_name))
+        self._disk[key] = len(value)
+        self._disk_bytes += len(value)
+        while self._disk_bytes > self.max_disk_bytes:
+            self._drop_spilled(next(iter(self._disk)))
+
+    def _read_spilled(self, key: ResultKey) -> Optional[bytes]:
+        """Reads a spilled result and removes it from disk (it moves back to memory)."""
+        try:
+            with open(os.path.join(self.spill_dir, key.file_name), "rb") as f:
+                value = f.read()
+        except OSError:
+            value = None
+        self._drop_spilled(key)
+        return value
+
+    def _drop_spilled(self, key: ResultKey):
+        self._disk_bytes -= self._disk.pop(key)
+        try:
+            os.remove(os.path.join(self.spill_dir, key.file_name))
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, listing_set_id: str):
+        """Drops every result that depends on the ListingSet."""
+        with self._lock:
+            for key in [key for key in self._memory if key.depends_on(listing_set_id)]:
+                self._memory_bytes -= len(self._memory.pop(key))
+            for key in [key for key in self._disk if key.depends_on(listing_set_id)]:
+                self._drop_spilled(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk):
+                self._drop_spilled(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "size_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+# Create a single instance for the entire application.
+result_cache = ResultCache(RESULT_CACHE_MB * 1024 * 1024, RESULT_CACHE_DIR, RESULT_CACHE_DISK_MB * 1024 * 1024)
+
+
+def cached_response(key: ResultKey, compute: Callable[[], bytes], media_type: str = "application/json") -> Response:
+    """
+    Returns the cached result for `key`, or computes, caches and returns it. The
+    X-Cache header tells whether the result came from the cache. Errors raised by
+    `compute` (e.g. a 404) are not cached.
+    """
+    body = result_cache.get(key)
+    status = "hit"
+    if body is None:
+        body = compute()
+        result_cache.put(key, body)
+        status = "miss"
+    return Response(content=body, media_type=media_type, headers={"X-Cache": status})
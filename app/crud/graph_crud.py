@@ -0,0 +1,131 @@
+from neo4j import Session
+from typing import List, Optional
+
+# Subscriber pairs with their communication counts, aggregated by the database so
+# that only one row per pair crosses the wire.
+SCOPED_CONTACT_EDGES_QUERY = """
+MATCH (:User {username: $username})-[:OWNS]->(ls:ListingSet)
+WHERE ls.id IN $listing_set_ids
+MATCH (c:Communication)-[:PART_OF]->(ls)
+WHERE ($start IS NULL OR c.timestamp >= datetime($start))
+  AND ($end IS NULL OR c.timestamp < datetime($end))
+WITH DISTINCT c
+MATCH (a:Subscriber)-[:INITIATED]->(c)-[:IS_DIRECTED_TO]->(b:Subscriber)
+RETURN a.phoneNumber AS source, b.phoneNumber AS target,
+       count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+       count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+"""
+
+# Without a scope, the pre-aggregated CONTACTED edges already hold the counts.
+ALL_CONTACT_EDGES_QUERY = """
+MATCH (a:Subscriber)-[r:CONTACTED]->(b:Subscriber)
+RETURN a.phoneNumber AS source, b.phoneNumber AS target, r.calls AS calls, r.sms AS sms
+"""
+
+# A time window over the whole graph walks the communication_timestamp index. The
+# predicate is a plain range (open bounds are widened) so that the index is used.
+WINDOWED_CONTACT_EDGES_QUERY = """
+MATCH (c:Communication)
+WHERE c.timestamp >= datetime($start) AND c.timestamp < datetime($end)
+MATCH (a:Subscriber)-[:INITIATED]->(c)-[:IS_DIRECTED_TO]->(b:Subscriber)
+RETURN a.phoneNumber AS source, b.phoneNumber AS target,
+       count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+       count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+"""
+EARLIEST_TIMESTAMP = "0001-01-01T00:00:00"
+LATEST_TIMESTAMP = "9999-12-31T23:59:59"
+
+def get_contact_edges(
+    db: Session,
+    username: str,
+    listing_set_ids: Optional[List[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> List[dict]:
+    """
+    Returns one {source, target, calls, sms} dict per directed Subscriber pair, for the
+    given ListingSets of the user or, without ListingSets, for the whole graph.
+    `start`/`end` (ISO 8601, end excluded) only count the communications in that window.
+    """
+    if listing_set_ids:
+        result = db.run(SCOPED_CONTACT_EDGES_QUERY, username=username, listing_set_ids=listing_set_ids, start=start, end=end)
+    elif start is not None or end is not None:
+        result = db.run(WINDOWED_CONTACT_EDGES_QUERY, start=start or EARLIEST_TIMESTAMP, end=end or LATEST_TIMESTAMP)
+    else:
+        result = db.run(ALL_CONTACT_EDGES_QUERY)
+    return [record.data() for record in result]
+
+def get_subscriber_phone_numbers(db: Session) -> List[str]:
+    """Returns the phone number of every Subscriber, read from the phoneNumber uniqueness index."""
+    result = db.run("MATCH (s:Subscriber) WHERE s.phoneNumber IS NOT NULL RETURN s.phoneNumber AS phone")
+    return [record["phone"] for record in result]
+
+def get_cell_towers(db: Session) -> List[dict]:
+    """Returns the {name, longitude, latitude} of every CellTower with known coordinates."""
+    result = db.run(
+        """
+        MATCH (t:CellTower)
+        WHERE t.longitude IS NOT NULL AND t.latitude IS NOT NULL
+        RETURN t.name AS name, t.longitude AS longitude, t.latitude AS latitude
+        """
+    )
+    return [record.data() for record in result]
+
+# USED edges of some subscribers and/or devices: an index seek on the phone number
+# or IMEI, then the node's own USED relationships.
+DEVICE_USAGE_QUERY = """
+UNWIND $phone_numbers AS phone_number
+MATCH (s:Subscriber {phoneNumber: phone_number})-[u:USED]->(d:Device)
+RETURN s.phoneNumber AS phone_number, d.imei AS imei, u.communications AS communications,
+       u.first_seen AS first_seen, u.last_seen AS last_seen
+UNION
+UNWIND $imeis AS imei
+MATCH (s:Subscriber)-[u:USED]->(d:Device {imei: imei})
+RETURN s.phoneNumber AS phone_number, d.imei AS imei, u.communications AS communications,
+       u.first_seen AS first_seen, u.last_seen AS last_seen
+"""
+
+def get_device_usages(db: Session, phone_numbers: List[str] = (), imeis: List[str] = ()) -> List[dict]:
+    """
+    Returns the {phone_number, imei, communications, first_seen, last_seen} usages of
+    the given subscribers and devices, times as ISO strings.
+    """
+    result = db.run(DEVICE_USAGE_QUERY, phone_numbers=list(phone_numbers), imeis=list(imeis))
+    return [
+        {**record.data(), "first_seen": record["first_seen"].iso_format(), "last_seen": record["last_seen"].iso_format()}
+        for record in result
+    ]
+
+# The tower and caller are read from the properties copied onto every
+# Communication, and the three columns come back as one row.
+TOWER_EVENTS_QUERY = """
+MATCH (c:Communication)-[:PART_OF]->(:ListingSet {id: $listing_set_id})
+WHERE c.location IS NOT NULL
+RETURN collect(c.location) AS towers,
+       collect(c.caller_num) AS subscribers,
+       collect(c.timestamp.epochSeconds) AS seconds
+"""
+
+def get_tower_events(db: Session, listing_set_id: str) -> dict:
+    """Returns a ListingSet's communications as parallel columns: tower name, caller phone number, Unix time."""
+    record = db.run(TOWER_EVENTS_QUERY, listing_set_id=listing_set_id).single()
+    return {"towers": record["towers"], "subscribers": record["subscribers"], "seconds": record["seconds"]}
+
+# Members are read from the properties copied onto every Communication, so no
+# relationship is traversed besides PART_OF.
+LISTING_SET_MEMBERS_QUERY = """
+MATCH (c:Communication)-[:PART_OF]->(:ListingSet {id: $listing_set_id})
+RETURN collect(DISTINCT c.caller_num) AS callers,
+       collect(DISTINCT c.callee_num) AS recipients,
+       collect(DISTINCT c.imei) AS devices,
+       collect(DISTINCT c.location) AS towers
+"""
+
+def get_listing_set_members(db: Session, listing_set_id: str) -> dict:
+    """Returns the distinct subscriber phone numbers, device IMEIs and cell tower names of a ListingSet."""
+    record = db.run(LISTING_SET_MEMBERS_QUERY, listing_set_id=listing_set_id).single()
+    return {
+        "subscriber": sorted(set(record["callers"]) | set(record["recipients"])),
+        "device": record["devices"],
+        "tower": record["towers"],
+    }
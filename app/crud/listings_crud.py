@@ -1,8 +1,8 @@
-from neo4j import Session
+from neo4j import Session, ManagedTransaction
 from typing import List
 import uuid
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Dict, Iterator, Optional, List, Tuple
 
 
 from app.models.listings import ListingSet, ListingSetCreate
@@ -22,7 +22,9 @@ def create_listing_set(db: Session, listing_set: ListingSetCreate, owner_usernam
         name: $name,
         description: $description,
         owner_username: $owner_username,
-        createdAt: $created_at
+        createdAt: $created_at,
+        ingest_status: 'queued',
+        version: 0
     })
     CREATE (u)-[:OWNS]->(ls)
     RETURN ls
@@ -97,7 +99,153 @@ def get_user_dashboard_stats(db: Session, owner_username: str) -> dict:
     }
     
 # ... (keep existing imports and the create_listing_set, get_user_listing_sets functions)
-from app.models.listings import ListingSetUpdate
+from app.models.listings import ListingSetUpdate, IngestionStatus
+from app.crud.graph_crud import EARLIEST_TIMESTAMP, LATEST_TIMESTAMP
+
+def get_listing_set(db: Session, listing_set_id: str, owner_username: str) -> Optional[ListingSet]:
+    """
+    Retrieves a single ListingSet, only if it is owned by the given user.
+    """
+    result = db.run(
+        "MATCH (:User {username: $owner_username})-[:OWNS]->(ls:ListingSet {id: $id}) RETURN ls",
+        id=listing_set_id, owner_username=owner_username
+    )
+    record = result.single()
+    if record and record["ls"]:
+        data = dict(record["ls"])
+        data['createdAt'] = data['createdAt'].to_native()
+        return ListingSet.model_validate(data)
+    return None
+
+def get_listing_set_versions(db: Session, owner_username: Optional[str] = None, listing_set_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Returns {id: version} for the given ListingSets owned by the user (sets the user
+    does not own are left out), or for every ListingSet when no user is given.
+    """
+    if owner_username is None:
+        result = db.run("MATCH (ls:ListingSet) RETURN ls.id AS id, coalesce(ls.version, 0) AS version")
+    else:
+        result = db.run(
+            """
+            MATCH (:User {username: $owner_username})-[:OWNS]->(ls:ListingSet)
+            WHERE ls.id IN $listing_set_ids
+            RETURN ls.id AS id, coalesce(ls.version, 0) AS version
+            """,
+            owner_username=owner_username, listing_set_ids=list(listing_set_ids or [])
+        )
+    return {record["id"]: record["version"] for record in result}
+
+def get_data_version(db: Session) -> Tuple[int, int]:
+    """
+    Returns (number of ListingSets, sum of their versions): it changes whenever a
+    ListingSet is created, written to or deleted, by any process.
+    """
+    record = db.run("MATCH (ls:ListingSet) RETURN count(ls) AS sets, sum(coalesce(ls.version, 0)) AS versions").single()
+    return record["sets"], record["versions"]
+
+# Hourly counters written at ingest; the (listing_set_id, scope, hour) index serves
+# both the lookup and the range, so open window bounds are widened rather than skipped.
+ACTIVITY_BUCKETS_QUERY = """
+MATCH (b:ActivityBucket {listing_set_id: $listing_set_id, scope: $scope})
+WHERE b.hour >= datetime.truncate('hour', datetime($start)) AND b.hour < datetime($end)
+RETURN b.hour AS hour, b.calls AS calls, b.sms AS sms
+"""
+
+def get_activity_buckets(db: Session, listing_set_id: str, scope: str, start: Optional[str] = None, end: Optional[str] = None) -> List[dict]:
+    """
+    Returns the hourly {hour, calls, sms} activity buckets of a ListingSet, for the whole
+    set (ACTIVITY_SCOPE_LISTING_SET) or one subscriber's phone number, within a window.
+    """
+    result = db.run(
+        ACTIVITY_BUCKETS_QUERY,
+        listing_set_id=listing_set_id,
+        scope=scope,
+        start=start or EARLIEST_TIMESTAMP,
+        end=end or LATEST_TIMESTAMP,
+    )
+    return [record.data() for record in result]
+
+# Map tile counters written at ingest, summed over the requested ListingSets. The
+# busiest tiles come first, so a truncated answer keeps the hot spots.
+ACTIVITY_TILES_QUERY = """
+UNWIND $listing_set_ids AS listing_set_id
+MATCH (t:ActivityTile {listing_set_id: listing_set_id, zoom: $zoom})
+WHERE t.x >= $x_min AND t.x <= $x_max AND t.y >= $y_min AND t.y <= $y_max
+WITH t.x AS x, t.y AS y, sum(t.calls) AS calls, sum(t.sms) AS sms
+RETURN x, y, calls, sms
+ORDER BY calls + sms DESC
+LIMIT $limit
+"""
+
+def get_activity_tiles(db: Session, listing_set_ids: List[str], zoom: int, x_min: int, x_max: int, y_min: int, y_max: int, limit: int) -> List[dict]:
+    """
+    Returns the {x, y, calls, sms} map tiles of some ListingSets at one zoom level
+    within a tile range, summed over the sets, busiest first.
+    """
+    result = db.run(
+        ACTIVITY_TILES_QUERY,
+        listing_set_ids=listing_set_ids,
+        zoom=zoom,
+        x_min=x_min,
+        x_max=x_max,
+        y_min=y_min,
+        y_max=y_max,
+        limit=limit,
+    )
+    return [record.data() for record in result]
+
+# One typed row per communication, in app.core.export.EXPORT_COLUMNS order; the
+# coordinates are the ones of the tower the communication went through.
+LISTING_COMMUNICATIONS_QUERY = """
+MATCH (c:Communication)-[:PART_OF]->(:ListingSet {id: $listing_set_id})
+WHERE c.timestamp >= datetime($start) AND c.timestamp < datetime($end)
+OPTIONAL MATCH (c)-[:ROUTED_THROUGH]->(t:CellTower)
+RETURN c.caller_num, c.callee_num, c.timestamp.epochMillis, c.type, c.duration_str,
+       c.imei, c.location, t.longitude, t.latitude
+"""
+
+def iter_listing_communications(db: Session, listing_set_id: str, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Yields a ListingSet's communications as tuples, within a window. Records are
+    pulled from the driver as they are consumed, so the set is never held in memory.
+    """
+    result = db.run(
+        LISTING_COMMUNICATIONS_QUERY,
+        listing_set_id=listing_set_id,
+        start=start or EARLIEST_TIMESTAMP,
+        end=end or LATEST_TIMESTAMP,
+    )
+    for record in result:
+        yield tuple(record.values())
+
+def get_ingestion_status(db: Session, listing_set_id: str, owner_username: str) -> Optional[IngestionStatus]:
+    """
+    Reads the ingestion progress recorded on a ListingSet owned by the given user.
+    """
+    query = """
+    MATCH (:User {username: $owner_username})-[:OWNS]->(ls:ListingSet {id: $id})
+    RETURN ls.ingest_status AS status,
+           coalesce(ls.rows_seen, 0) AS rows_seen,
+           coalesce(ls.rows_written, 0) AS rows_written,
+           coalesce(ls.rows_rejected, 0) AS rows_rejected,
+           coalesce(ls.rows_duplicate, 0) AS rows_duplicate,
+           coalesce(ls.rows_per_second, 0.0) AS rows_per_second,
+           ls.ingest_error AS error
+    """
+    record = db.run(query, id=listing_set_id, owner_username=owner_username).single()
+    if not record:
+        return None
+    return IngestionStatus(listing_set_id=listing_set_id, **record.data())
+
+def set_ingestion_status(db: Session, listing_set_id: str, status: str, error: Optional[str] = None):
+    """
+    Records the ingestion state of a ListingSet ("queued", "running", "completed" or "failed").
+    """
+    query = """
+    MATCH (ls:ListingSet {id: $id})
+    SET ls.ingest_status = $status, ls.ingest_error = $error
+    """
+    db.run(query, id=listing_set_id, status=status, error=error).consume()
 
 def update_listing_set(
     db: Session,
@@ -117,21 +265,12 @@ def update_listing_set(
     # If the user sent an empty request body, there's nothing to update.
     if not data_to_update:
         # We can just fetch the existing set and return it.
-        result = db.run(
-            "MATCH (:User {username: $owner_username})-[:OWNS]->(ls:ListingSet {id: $id}) RETURN ls",
-            id=listing_set_id, owner_username=owner_username
-        )
-        record = result.single()
-        if record and record["ls"]:
-            data = dict(record["ls"])
-            data['createdAt'] = data['createdAt'].to_native()
-            return ListingSet.model_validate(data)
-        return None
+        return get_listing_set(db, listing_set_id, owner_username)
 
     # The SET clause dynamically updates the node's properties.
     query = """
     MATCH (u:User {username: $owner_username})-[:OWNS]->(ls:ListingSet {id: $id})
-    SET ls += $data_to_update
+    SET ls += $data_to_update, ls.version = coalesce(ls.version, 0) + 1
     RETURN ls
     """
     result = db.run(
@@ -147,20 +286,84 @@ def update_listing_set(
         return ListingSet.model_validate(data)
     return None # Will return None if the user doesn't own the set or the set doesn't exist
 
-def delete_listing_set(db: Session, listing_set_id: str, owner_username: str) -> bool:
-    """
-    Deletes a ListingSet and all its associated Communication nodes.
-    The initial MATCH ensures a user can only delete analyses they own.
-    """
+# CONTACTED edges aggregate communications per Subscriber pair. When a ListingSet goes
+# away, the pairs it touched are recounted from the communications that remain;
+# first_seen/last_seen cannot be decremented, so they are recomputed as well.
+CONTACT_PAIRS_QUERY = """
+MATCH (ls:ListingSet {id: $id})<-[:PART_OF]-(c:Communication)
+MATCH (caller:Subscriber)-[:INITIATED]->(c)-[:IS_DIRECTED_TO]->(callee:Subscriber)
+RETURN DISTINCT [caller.phoneNumber, callee.phoneNumber] AS pair
+"""
+
+REBUILD_CONTACTS_QUERY = """
+UNWIND $pairs AS pair
+MATCH (caller:Subscriber {phoneNumber: pair[0]})-[r:CONTACTED]->(callee:Subscriber {phoneNumber: pair[1]})
+CALL {
+    WITH caller, callee
+    OPTIONAL MATCH (caller)-[:INITIATED]->(c:Communication)-[:IS_DIRECTED_TO]->(callee)
+    OPTIONAL MATCH (c)-[:PART_OF]->(ls:ListingSet)
+    RETURN count(DISTINCT CASE WHEN c.type = 'CALL' THEN c END) AS calls,
+           count(DISTINCT CASE WHEN c.type = 'SMS' THEN c END) AS sms,
+           min(c.timestamp) AS first_seen,
+           max(c.timestamp) AS last_seen,
+           collect(DISTINCT ls.id) AS listing_sets
+}
+SET r.calls = calls, r.sms = sms, r.first_seen = first_seen, r.last_seen = last_seen, r.listing_sets = listing_sets
+WITH r WHERE r.calls + r.sms = 0
+DELETE r
+"""
+
+# USED edges aggregate communications per (Subscriber, Device) and are recounted
+# the same way.
+DEVICE_USAGE_PAIRS_QUERY = """
+MATCH (ls:ListingSet {id: $id})<-[:PART_OF]-(c:Communication)
+MATCH (subscriber:Subscriber)-[:INITIATED]->(c)-[:USED_DEVICE]->(device:Device)
+RETURN DISTINCT [subscriber.phoneNumber, device.imei] AS pair
+"""
+
+REBUILD_DEVICE_USAGE_QUERY = """
+UNWIND $pairs AS pair
+MATCH (subscriber:Subscriber {phoneNumber: pair[0]})-[u:USED]->(device:Device {imei: pair[1]})
+CALL {
+    WITH subscriber, device
+    OPTIONAL MATCH (subscriber)-[:INITIATED]->(c:Communication)-[:USED_DEVICE]->(device)
+    RETURN count(c) AS communications, min(c.timestamp) AS first_seen, max(c.timestamp) AS last_seen
+}
+SET u.communications = communications, u.first_seen = first_seen, u.last_seen = last_seen
+WITH u WHERE u.communications = 0
+DELETE u
+"""
+
+def _delete_listing_set_tx(tx: ManagedTransaction, listing_set_id: str, owner_username: str) -> bool:
     # This is a powerful, transactional query. It finds the ListingSet owned by the user,
     # finds all Communication nodes linked to it, and then deletes both the
-    # communications and the parent ListingSet.
+    # communications and the parent ListingSet. Communications deduplicated across
+    # sets are shared, so those still PART_OF another set are kept.
     query = """
     MATCH (u:User {username: $owner_username})-[:OWNS]->(ls:ListingSet {id: $id})
     OPTIONAL MATCH (c:Communication)-[:PART_OF]->(ls)
+    WHERE NOT EXISTS { MATCH (c)-[:PART_OF]->(other:ListingSet) WHERE other <> ls }
     DETACH DELETE c, ls
     """
-    result = db.run(query, id=listing_set_id, owner_username=owner_username)
+    pairs = [record["pair"] for record in tx.run(CONTACT_PAIRS_QUERY, id=listing_set_id)]
+    device_pairs = [record["pair"] for record in tx.run(DEVICE_USAGE_PAIRS_QUERY, id=listing_set_id)]
+    result = tx.run(query, id=listing_set_id, owner_username=owner_username)
     # The result summary tells us how many nodes were actually deleted.
     # If > 0, the deletion was successful.
-    return result.summary().counters.nodes_deleted > 0
\ No newline at end of file
+    deleted = result.consume().counters.nodes_deleted > 0
+    if deleted and pairs:
+        tx.run(REBUILD_CONTACTS_QUERY, pairs=pairs).consume()
+    if deleted and device_pairs:
+        tx.run(REBUILD_DEVICE_USAGE_QUERY, pairs=device_pairs).consume()
+    if deleted:
+        tx.run("MATCH (b:ActivityBucket {listing_set_id: $id}) DELETE b", id=listing_set_id).consume()
+        tx.run("MATCH (t:ActivityTile {listing_set_id: $id}) DELETE t", id=listing_set_id).consume()
+    return deleted
+
+def delete_listing_set(db: Session, listing_set_id: str, owner_username: str) -> bool:
+    """
+    Deletes a ListingSet, all its associated Communication nodes, activity buckets and map tiles,
+    and updates the CONTACTED and USED edges they contributed to. The initial MATCH ensures a user can only
+    delete analyses they own.
+    """
+    return db.execute_write(_delete_listing_set_tx, listing_set_id, owner_username)
@@ -0,0 +1,205 @@
+import argparse
+from dataclasses import dataclass
+from typing import List
+
+from neo4j import Session
+
+# ---
+# Versioned schema migrations. Every migration is a list of idempotent statements
+# (IF NOT EXISTS, or data backfills that SET absolute values), so re-running one
+# after a partial failure is safe.
+# The highest applied version is stored on a single :SchemaVersion node.
+# Add new migrations at the end of MIGRATIONS with the next version number;
+# never edit a migration that has already shipped.
+# ---
+
+SCHEMA_VERSION_ID = "synapse"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: List[str]
+
+
+MIGRATIONS = [
+    Migration(1, "Uniqueness constraints on the keys matched by ingestion and CRUD queries", [
+        "CREATE CONSTRAINT subscriber_phone_number IF NOT EXISTS FOR (s:Subscriber) REQUIRE s.phoneNumber IS UNIQUE",
+        "CREATE CONSTRAINT device_imei IF NOT EXISTS FOR (d:Device) REQUIRE d.imei IS UNIQUE",
+        "CREATE CONSTRAINT cell_tower_name IF NOT EXISTS FOR (t:CellTower) REQUIRE t.name IS UNIQUE",
+        "CREATE CONSTRAINT listing_set_id IF NOT EXISTS FOR (ls:ListingSet) REQUIRE ls.id IS UNIQUE",
+        "CREATE CONSTRAINT user_username IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE",
+    ]),
+    Migration(2, "Uniqueness constraint backing Communication deduplication", [
+        "CREATE CONSTRAINT communication_dedup_key IF NOT EXISTS FOR (c:Communication) REQUIRE c.dedup_key IS UNIQUE",
+    ]),
+    Migration(3, "Range index for audit history ordering", [
+        "CREATE INDEX audit_event_timestamp IF NOT EXISTS FOR (a:AuditEvent) ON (a.timestamp)",
+    ]),
+    Migration(4, "Backfill CONTACTED edges for communications imported before they existed", [
+        """
+        MATCH (caller:Subscriber)
+        CALL {
+            WITH caller
+            MATCH (caller)-[:INITIATED]->(c:Communication)-[:IS_DIRECTED_TO]->(callee:Subscriber)
+            OPTIONAL MATCH (c)-[:PART_OF]->(ls:ListingSet)
+            WITH caller, callee,
+                 count(DISTINCT CASE WHEN c.type = 'CALL' THEN c END) AS calls,
+                 count(DISTINCT CASE WHEN c.type = 'SMS' THEN c END) AS sms,
+                 min(c.timestamp) AS first_seen,
+                 max(c.timestamp) AS last_seen,
+                 collect(DISTINCT ls.id) AS listing_sets
+            MERGE (caller)-[r:CONTACTED]->(callee)
+            SET r.calls = calls, r.sms = sms, r.first_seen = first_seen,
+                r.last_seen = last_seen, r.listing_sets = listing_sets
+        } IN TRANSACTIONS OF 500 ROWS
+        """,
+    ]),
+    Migration(5, "Data version counter on ListingSets, keying cached query results", [
+        "MATCH (ls:ListingSet) WHERE ls.version IS NULL SET ls.version = 0",
+    ]),
+    Migration(6, "Timestamp index and hourly activity buckets for time-window queries", [
+        "CREATE INDEX communication_timestamp IF NOT EXISTS FOR (c:Communication) ON (c.timestamp)",
+        "CREATE CONSTRAINT activity_bucket_key IF NOT EXISTS FOR (b:ActivityBucket) REQUIRE b.key IS UNIQUE",
+        "CREATE INDEX activity_bucket_scope IF NOT EXISTS FOR (b:ActivityBucket) ON (b.listing_set_id, b.scope, b.hour)",
+        """
+        MATCH (ls:ListingSet)
+        CALL {
+            WITH ls
+            MATCH (c:Communication)-[:PART_OF]->(ls)
+            WITH ls, c, datetime.truncate('hour', c.timestamp) AS hour
+            UNWIND ['listing_set', c.caller_num, c.callee_num] AS scope
+            WITH ls, scope, hour,
+                 count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+                 count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+            MERGE (b:ActivityBucket {key: ls.id + '|' + scope + '|' + toString(hour)})
+            SET b.listing_set_id = ls.id, b.scope = scope, b.hour = hour, b.calls = calls, b.sms = sms
+        } IN TRANSACTIONS OF 10 ROWS
+        """,
+    ]),
+    Migration(7, "Map activity tiles for the geospatial heatmaps", [
+        "CREATE CONSTRAINT activity_tile_key IF NOT EXISTS FOR (t:ActivityTile) REQUIRE t.key IS UNIQUE",
+        "CREATE INDEX activity_tile_zoom IF NOT EXISTS FOR (t:ActivityTile) ON (t.listing_set_id, t.zoom, t.x, t.y)",
+        # Same Web Mercator tile math as app.core.geo.lonlat_to_tile, at every
+        # zoom level of TILE_ZOOM_LEVELS, from the coordinates of the towers.
+        """
+        MATCH (ls:ListingSet)
+        CALL {
+            WITH ls
+            MATCH (c:Communication)-[:PART_OF]->(ls)
+            MATCH (c)-[:ROUTED_THROUGH]->(t:CellTower)
+            WHERE t.longitude IS NOT NULL AND t.latitude IS NOT NULL
+            UNWIND [2, 4, 6, 8, 10, 12, 14, 16] AS zoom
+            WITH ls, c, t, zoom, 2 ^ zoom AS n,
+                 radians(CASE WHEN t.latitude > 85.05112878 THEN 85.05112878
+                              WHEN t.latitude < -85.05112878 THEN -85.05112878
+                              ELSE t.latitude END) AS lat
+            WITH ls, c, zoom, n,
+                 toInteger(floor((t.longitude + 180.0) / 360.0 * n)) AS x,
+                 toInteger(floor((1.0 - log(tan(lat) + 1.0 / cos(lat)) / pi()) / 2.0 * n)) AS y
+            WITH ls, c, zoom,
+                 CASE WHEN x < 0 THEN 0 WHEN x >= n THEN toInteger(n) - 1 ELSE x END AS x,
+                 CASE WHEN y < 0 THEN 0 WHEN y >= n THEN toInteger(n) - 1 ELSE y END AS y
+            WITH ls, zoom, x, y,
+                 count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+                 count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+            MERGE (tile:ActivityTile {key: ls.id + '|' + toString(zoom) + '|' + toString(x) + '|' + toString(y)})
+            SET tile.listing_set_id = ls.id, tile.zoom = zoom, tile.x = x, tile.y = y, tile.calls = calls, tile.sms = sms
+        } IN TRANSACTIONS OF 10 ROWS
+        """,
+    ]),
+    Migration(8, "Backfill USED edges aggregating Subscriber-Device usage", [
+        """
+        MATCH (subscriber:Subscriber)
+        CALL {
+            WITH subscriber
+            MATCH (subscriber)-[:INITIATED]->(c:Communication)-[:USED_DEVICE]->(device:Device)
+            WITH subscriber, device, count(c) AS communications,
+                 min(c.timestamp) AS first_seen, max(c.timestamp) AS last_seen
+            MERGE (subscriber)-[u:USED]->(device)
+            SET u.communications = communications, u.first_seen = first_seen, u.last_seen = last_seen
+        } IN TRANSACTIONS OF 500 ROWS
+        """,
+    ]),
+    Migration(9, "Fingerprint index for deduplication across an owner's ListingSets", [
+        "CREATE INDEX communication_fingerprint IF NOT EXISTS FOR (c:Communication) ON (c.fingerprint)",
+    ]),
+    Migration(10, "Recount hourly activity buckets, counting self-calls once per subscriber", [
+        """
+        MATCH (ls:ListingSet)
+        CALL {
+            WITH ls
+            MATCH (c:Communication)-[:PART_OF]->(ls)
+            WITH ls, c, datetime.truncate('hour', c.timestamp) AS hour
+            UNWIND CASE WHEN c.callee_num = c.caller_num THEN ['listing_set', c.caller_num]
+                        ELSE ['listing_set', c.caller_num, c.callee_num] END AS scope
+            WITH ls, scope, hour,
+                 count(CASE WHEN c.type = 'CALL' THEN 1 END) AS calls,
+                 count(CASE WHEN c.type = 'SMS' THEN 1 END) AS sms
+            MERGE (b:ActivityBucket {key: ls.id + '|' + scope + '|' + toString(hour)})
+            SET b.listing_set_id = ls.id, b.scope = scope, b.hour = hour, b.calls = calls, b.sms = sms
+        } IN TRANSACTIONS OF 10 ROWS
+        """,
+    ]),
+]
+
+
+def get_schema_version(db: Session) -> int:
+    """Returns the highest applied migration version (0 on a fresh database)."""
+    record = db.run(
+        "MATCH (v:SchemaVersion {id: $id}) RETURN v.version AS version", id=SCHEMA_VERSION_ID
+    ).single()
+    return (record["version"] or 0) if record else 0
+
+
+def pending_migrations(db: Session) -> List[Migration]:
+    current = get_schema_version(db)
+    return [migration for migration in MIGRATIONS if migration.version > current]
+
+
+def _record_schema_version(db: Session, migration: Migration):
+    # Several API processes may start at once; the stored version only moves forward.
+    query = """
+    MERGE (v:SchemaVersion {id: $id})
+    SET v.version = CASE WHEN coalesce(v.version, 0) < $version THEN $version ELSE v.version END,
+        v.description = CASE WHEN coalesce(v.version, 0) <= $version THEN $description ELSE v.description END,
+        v.applied_at = datetime()
+    """
+    db.run(query, id=SCHEMA_VERSION_ID, version=migration.version, description=migration.description).consume()
+
+
+def apply_migrations(db: Session, dry_run: bool = False) -> List[Migration]:
+    """
+    Applies every pending migration in order and returns them. With `dry_run`,
+    only lists what would be applied.
+    """
+    pending = pending_migrations(db)
+    if not pending:
+        print(f"Database schema is up to date (version {get_schema_version(db)}).")
+        return []
+
+    for migration in pending:
+        print(f"{'[dry-run] ' if dry_run else ''}Schema migration {migration.version}: {migration.description}")
+        for statement in migration.statements:
+            print(f"  -> {' '.join(statement.split())}")
+            if not dry_run:
+                # Neo4j does not allow schema changes and data writes in one transaction,
+                # so each statement runs in its own auto-commit transaction.
+                db.run(statement).consume()
+        if not dry_run:
+            _record_schema_version(db, migration)
+    return pending
+
+
+if __name__ == "__main__":
+    from app.db.graph_db import db_manager
+
+    parser = argparse.ArgumentParser(description="Apply the SYNAPSE Neo4j schema migrations.")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them.")
+    args = parser.parse_args()
+    try:
+        with db_manager.get_session() as session:
+            apply_migrations(session, dry_run=args.dry_run)
+    finally:
+        db_manager.close()
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from typing import Annotated
+from typing import Annotated, Optional
 
 from app.core.config import SECRET_KEY, ALGORITHM
 from app.core.blocklist import BLOCKLIST
@@ -9,6 +9,8 @@ from app.models.user import TokenData
 from app.models.user import User
 # This tells FastAPI where to look for the token ("tokenUrl" is relative to the root)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+# Same scheme, for routes that also serve anonymous requests
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
 
 def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     """
@@ -51,6 +53,16 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     return payload
 
 
+def get_optional_user(token: Annotated[Optional[str], Depends(optional_oauth2_scheme)]) -> Optional[dict]:
+    """
+    Like get_current_user, but returns None when the request carries no token.
+    An invalid or revoked token is still rejected.
+    """
+    if token is None:
+        return None
+    return get_current_user(token)
+
+
 def get_current_admin_user(
     current_user: Annotated[dict, Depends(get_current_user)]
 ) -> dict:
@@ -1,14 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.routers import graph as graph_router
 from app.routers import auth as auth_router # <-- IMPORT NEW ROUTER
 from app.routers import profile as profile_router 
 from app.db.graph_db import db_manager
+from app.core.ingest_jobs import ingest_worker_pool
+from app.db.schema import apply_migrations
 from app.routers import users as users_router
 from app.routers import workbench as workbench_router
 from app.routers import dashboard as dashboard_router
 from app.routers import analyses as analyses_router
 from app.routers import history as history_router 
+from app.routers import graph_analytics as graph_analytics_router
+from app.routers import overlaps as overlaps_router
+from app.routers import geo as geo_router
+from app.routers import devices as devices_router
 from app.crud import user_crud 
 from app.models.user import UserCreate 
 
@@ -26,6 +33,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compresses JSON and NDJSON responses, streamed ones chunk by chunk. Server-Sent
+# Events and responses that set their own Content-Encoding are left alone.
+# Responses are gzip only: Starlette has no Brotli middleware, and a Brotli
+# encoder would add a compiled dependency for a modest gain on JSON.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # --- INCLUDE THE NEW ROUTERS ---
 app.include_router(auth_router.router, prefix="/api/v1/auth", tags=["Authentication"])
@@ -36,12 +48,17 @@ app.include_router(history_router.router, prefix="/api/v1/history", tags=["Histo
 app.include_router(users_router.router, prefix="/api/v1/users", tags=["Users"]) 
 app.include_router(workbench_router.router, prefix="/api/v1/workbench", tags=["Workbench"])
 app.include_router(graph_router.router, prefix="/api/v1/graph", tags=["Graph"])
+app.include_router(graph_analytics_router.router, prefix="/api/v1/graph/analytics", tags=["Graph Analytics"])
+app.include_router(overlaps_router.router, prefix="/api/v1/overlaps", tags=["Overlaps"])
+app.include_router(geo_router.router, prefix="/api/v1/geo", tags=["Geo"])
+app.include_router(devices_router.router, prefix="/api/v1/devices", tags=["Devices"])
 
 # -------------------------------
 @app.on_event("startup")
 def on_startup():
-    """Create initial admin user on startup if they don't exist."""
+    """Bring the database schema up to date and create the initial admin user if they don't exist."""
     with db_manager.get_session() as session:
+        apply_migrations(session)
         admin_user = user_crud.get_user(session, "admin")
         if not admin_user:
             print("Creating initial admin user...")
@@ -53,9 +70,12 @@ def on_startup():
             )
             user_crud.create_user(session, initial_admin)
             print("Initial admin user created.")
-            
+    # Resume interrupted imports and start consuming the ingestion job queue.
+    ingest_worker_pool.start()
+
 @app.on_event("shutdown")
 def shutdown_event():
+    ingest_worker_pool.stop()
     db_manager.close()
     print("Database connection closed.")
 
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List
+
+class NodeScore(BaseModel):
+    phoneNumber: str
+    score: float
+    rank: int
+
+class CentralityResponse(BaseModel):
+    """
+    The top-k subscribers of a ListingSet's contact network for one centrality metric.
+    `approximate` is True when the scores were estimated from a sample.
+    """
+    metric: str
+    approximate: bool = False
+    node_count: int
+    edge_count: int
+    scores: List[NodeScore]
+
+class Community(BaseModel):
+    id: int
+    size: int
+    weight: float  # communications between members
+    members: List[str]  # the most active members first
+
+class CommunitiesResponse(BaseModel):
+    algorithm: str
+    community_count: int
+    modularity: float
+    node_count: int
+    communities: List[Community]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List
+
+class ColocationPair(BaseModel):
+    """
+    Two subscribers seen at the same cell tower within the window: `count` event
+    pairs over `towers` distinct towers, between `first_seen` and `last_seen`.
+    """
+    subscriber_a: str
+    subscriber_b: str
+    count: int
+    towers: int
+    first_seen: str
+    last_seen: str
+
+class ColocationResponse(BaseModel):
+    """
+    Co-located subscriber pairs of a ListingSet, most co-located first. `total_pairs`
+    counts every pair reaching `min_count`; `truncated` tells whether the sweep
+    stopped at its candidate budget before covering every event.
+    """
+    listing_set_id: str
+    window_minutes: int
+    min_count: int
+    events: int
+    total_pairs: int
+    truncated: bool
+    pairs: List[ColocationPair]
@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+class DeviceUsage(BaseModel):
+    """A subscriber's use of a handset, aggregated over its communications."""
+    phone_number: str
+    imei: str
+    communications: int
+    first_seen: str
+    last_seen: str
+
+class SwapEvent(BaseModel):
+    """At `timestamp`, `current` was used for the first time after `previous`."""
+    timestamp: str
+    previous: str
+    current: str
+
+class SimSwapTimeline(BaseModel):
+    """
+    The handsets a subscriber used (subject_type "subscriber"), or the subscribers
+    a handset carried (subject_type "device"), in order of first use.
+    """
+    subject: str
+    subject_type: Literal["subscriber", "device"]
+    usages: List[DeviceUsage]
+    swaps: List[SwapEvent]
+
+class DeviceClusterResponse(BaseModel):
+    """Subscribers and handsets connected through shared handsets."""
+    subscribers: List[str]
+    devices: List[str]
+    usages: List[DeviceUsage]
+    truncated: bool
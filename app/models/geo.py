@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List
+
+class TowerLocation(BaseModel):
+    name: str
+    longitude: float
+    latitude: float
+
+class TowersInBox(BaseModel):
+    """Cell towers inside a bounding box. `total` counts them all; `towers` holds at most `limit`."""
+    total: int
+    truncated: bool
+    towers: List[TowerLocation]
+
+class MapTile(BaseModel):
+    """Activity of one Web Mercator tile, with its bounds in degrees."""
+    x: int
+    y: int
+    west: float
+    south: float
+    east: float
+    north: float
+    calls: int
+    sms: int
+    total: int
+
+class TileMap(BaseModel):
+    """
+    Pre-aggregated activity tiles inside a bounding box, at `zoom`: the deepest
+    stored zoom level not deeper than the requested one. Empty tiles are omitted.
+    """
+    zoom: int
+    requested_zoom: int
+    listing_set_ids: List[str]
+    truncated: bool
+    tiles: List[MapTile]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Pydantic model for a graph node
 class Node(BaseModel):
@@ -18,4 +18,57 @@ class Edge(BaseModel):
 # Pydantic model for the entire graph structure
 class Graph(BaseModel):
     nodes: List[Node]
-    edges: List[Edge]
\ No newline at end of file
+    edges: List[Edge]
+
+# A level-of-detail view of the graph: what was left out to fit the node budget
+class SummaryGraph(Graph):
+    truncated: bool = False
+    hidden_nodes: int = 0
+    hidden_edges: int = 0
+
+# A capped k-hop neighborhood: how many contacts the fan-out caps left out
+class NeighborhoodGraph(Graph):
+    truncated: bool = False
+    hidden_contacts: int = 0
+
+# Subscribers matching a partial phone number
+class SubscriberLookup(BaseModel):
+    digits: str
+    mode: str
+    total: int
+    phone_numbers: List[str]
+
+
+# Result of the bounded shortest-path engine; `network` holds the paths as a graph
+class PathSearchResponse(BaseModel):
+    paths: List[List[str]]
+    length: Optional[int] = None
+    status: str
+    complete: bool
+    depth_reached: int
+    visited: int
+    elapsed_seconds: float
+    network: Graph
+
+
+# Counters of the in-process caches
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+class ResultCacheStats(CacheStats):
+    disk_hits: int = 0
+    evictions: int = 0
+    disk_entries: int = 0
+    disk_bytes: int = 0
+
+class MembershipIndexStats(CacheStats):
+    evictions: int = 0
+    dictionary_rebuilds: int = 0
+
+class CacheMetrics(BaseModel):
+    results: ResultCacheStats
+    snapshots: CacheStats
+    memberships: MembershipIndexStats
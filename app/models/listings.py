@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 import uuid
 
@@ -14,6 +14,15 @@ class ListingSet(ListingSetBase):
     id: str
     owner_username: str
     createdAt: datetime
+    # Ingestion progress, maintained by the ingestion workers as chunks are committed.
+    ingest_status: Optional[str] = None
+    rows_seen: int = 0
+    rows_written: int = 0
+    rows_rejected: int = 0
+    rows_duplicate: int = 0
+    rows_per_second: float = 0.0
+    # Bumped whenever the set's data or properties change; cached results are keyed on it.
+    version: int = 0
 
     class Config:
         from_attributes = True # Allows creating model from ORM objects
@@ -23,4 +32,42 @@ class ListingSetUpdate(BaseModel):
     All fields are optional to allow for partial updates (e.g., changing only the name).
     """
     name: Optional[str] = None
-    description: Optional[str] = None
\ No newline at end of file
+    description: Optional[str] = None
+
+class IngestionStatus(BaseModel):
+    """
+    Progress of a ListingSet's ingestion, as returned by the status endpoints.
+    `status` is one of "queued", "running", "completed" or "failed".
+    """
+    listing_set_id: str
+    status: Optional[str] = None
+    rows_seen: int = 0
+    rows_written: int = 0
+    rows_rejected: int = 0
+    rows_duplicate: int = 0
+    rows_per_second: float = 0.0
+    error: Optional[str] = None
+
+class ActivityBin(BaseModel):
+    bucket: str  # ISO start of the hour or day, or the weekday name
+    calls: int = 0
+    sms: int = 0
+    total: int = 0
+
+class ActivityHistogram(BaseModel):
+    """
+    Communications of a ListingSet, or of one subscriber in it, binned by hour,
+    day or weekday (UTC). The window applies at whole-hour resolution.
+    """
+    listing_set_id: str
+    phone_number: Optional[str] = None
+    granularity: str
+    total_calls: int = 0
+    total_sms: int = 0
+    bins: List[ActivityBin]
+
+class VisualizePage(BaseModel):
+    """One page of listing data; pass next_cursor back to get the next one (null on the last page)."""
+    listings: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    limit: int
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+
+class OverlapResult(BaseModel):
+    """
+    Members of a set operation over ListingSets. `count` is the size of the whole
+    result; `members` holds the page selected by offset/limit.
+    """
+    operation: str
+    kind: str
+    listing_set_ids: List[str]
+    count: int
+    members: List[str]
+
+class OverlapMatrix(BaseModel):
+    """
+    Pairwise overlaps of N ListingSets, in the order of `listing_set_ids`:
+    intersections[i][j] members in common, jaccard[i][j] = intersection / union.
+    The diagonal holds the size of each set.
+    """
+    kind: str
+    listing_set_ids: List[str]
+    intersections: List[List[int]]
+    jaccard: List[List[float]]
@@ -7,6 +7,10 @@ from app.db.graph_db import get_db_session
 from app.crud import listings_crud
 from app.models.listings import ListingSet, ListingSetUpdate
 from app.crud import history_crud
+from app.core.graph_snapshot import snapshot_cache
+from app.core.result_cache import result_cache
+from app.core.membership import membership_index
+from app.core.colocation import colocation_engine
 from app.models.history import ActionType
 
 
@@ -35,6 +39,8 @@ def update_user_analysis(
     """
     username = current_user_payload.get("sub")
     updated_set = listings_crud.update_listing_set(db, analysis_id, username, update_data)
+    snapshot_cache.invalidate(analysis_id)
+    result_cache.invalidate(analysis_id)
     
     if not updated_set:
         raise HTTPException(
@@ -60,6 +66,10 @@ def delete_user_analysis(
     """
     username = current_user_payload.get("sub")
     was_deleted = listings_crud.delete_listing_set(db, analysis_id, username)
+    snapshot_cache.invalidate(analysis_id)
+    result_cache.invalidate(analysis_id)
+    membership_index.invalidate(analysis_id)
+    colocation_engine.invalidate(analysis_id)
     
     if not was_deleted:
         raise HTTPException(
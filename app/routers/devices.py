@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from neo4j import Session
+from typing import List, Optional
+
+from app.dependencies import get_current_user
+from app.db.graph_db import get_db_session
+from app.crud import graph_crud
+from app.core.device_usage import expand_device_cluster, swap_events
+from app.models.devices import DeviceClusterResponse, DeviceUsage, SimSwapTimeline, SwapEvent
+
+router = APIRouter()
+
+# Handset analysis read from the USED edges maintained at ingest
+# (app.core.device_usage): every lookup is an index seek on the phone number or
+# IMEI followed by that node's own USED relationships.
+MAX_CLUSTER_NODES = 5000
+
+def _timeline(subject: str, subject_type: str, usages: List[dict]) -> SimSwapTimeline:
+    if not usages:
+        raise HTTPException(status_code=404, detail=f"No device usage found for {subject_type} {subject}")
+    swaps = swap_events(usages, "imei" if subject_type == "subscriber" else "phone_number")
+    return SimSwapTimeline(
+        subject=subject,
+        subject_type=subject_type,
+        usages=[DeviceUsage(**usage) for usage in usages],
+        swaps=[SwapEvent(**swap) for swap in swaps],
+    )
+
+@router.get("/subscribers/{phone_number}/timeline", response_model=SimSwapTimeline)
+def get_subscriber_device_timeline(
+    phone_number: str,
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Returns the handsets a subscriber used, in order of first use, with every change of handset."""
+    return _timeline(phone_number, "subscriber", graph_crud.get_device_usages(session, phone_numbers=[phone_number]))
+
+@router.get("/{imei}/timeline", response_model=SimSwapTimeline)
+def get_device_subscriber_timeline(
+    imei: str,
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Returns the subscribers whose SIM was in a handset, in order of first use, with every SIM swap."""
+    return _timeline(imei, "device", graph_crud.get_device_usages(session, imeis=[imei]))
+
+@router.get("/clusters", response_model=DeviceClusterResponse)
+def get_shared_device_cluster(
+    phone_number: Optional[List[str]] = Query(None, description="Subscribers to start from."),
+    imei: Optional[List[str]] = Query(None, description="Handsets to start from."),
+    max_nodes: int = Query(500, ge=1, le=MAX_CLUSTER_NODES, description="Maximum number of subscribers and handsets in the cluster."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Returns the subscribers and handsets connected to the starting ones through
+    shared handsets, with every usage between them. `truncated` tells whether the
+    cluster was cut at `max_nodes`.
+    """
+    if not phone_number and not imei:
+        raise HTTPException(status_code=422, detail="At least one phone_number or imei is required")
+    cluster = expand_device_cluster(
+        lambda phone_numbers, imeis: graph_crud.get_device_usages(session, phone_numbers, imeis),
+        list(dict.fromkeys(phone_number or [])),
+        list(dict.fromkeys(imei or [])),
+        max_nodes,
+    )
+    return DeviceClusterResponse(
+        subscribers=sorted(cluster.subscribers),
+        devices=sorted(cluster.devices),
+        usages=[DeviceUsage(**usage) for _, usage in sorted(cluster.usages.items())],
+        truncated=cluster.truncated,
+    )
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from neo4j import Session
+from typing import List, Optional
+
+import numpy as np
+
+from app.dependencies import get_current_user
+from app.db.graph_db import get_db_session
+from app.crud import listings_crud
+from app.core.geo import BoundingBox, stored_zoom, tile_bounds, tile_ranges, tower_index
+from app.core.membership import membership_index
+from app.core.result_cache import cached_response, result_key
+from app.models.geo import MapTile, TileMap, TowerLocation, TowersInBox
+
+router = APIRouter()
+
+# Map endpoints: towers inside a bounding box, answered from the in-memory tower
+# grid index, and heatmap tiles read from the ActivityTile counters written at
+# ingest, so a map view never ships raw communication points.
+MAX_TOWERS = 10000
+MAX_TILES = 20000
+
+def _bounding_box(west: float, south: float, east: float, north: float) -> BoundingBox:
+    # west > east is allowed: the box crosses the antimeridian.
+    if south >= north:
+        raise HTTPException(status_code=422, detail="south must be lower than north")
+    return west, south, east, north
+
+@router.get("/towers", response_model=TowersInBox)
+def get_towers_in_box(
+    west: float = Query(..., ge=-180, le=180, description="Western longitude; greater than east when the box crosses the antimeridian."),
+    south: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    listing_set_id: Optional[List[str]] = Query(None, description="Only the towers used by these ListingSets."),
+    limit: int = Query(1000, ge=1, le=MAX_TOWERS),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Returns the cell towers with known coordinates inside a bounding box, sorted by name."""
+    bbox = _bounding_box(west, south, east, north)
+    tower_index.ensure_loaded(session)
+    names, lon, lat = tower_index.within(bbox)
+    if listing_set_id:
+        members = membership_index.get(session, list(dict.fromkeys(listing_set_id)), current_user["sub"])
+        if members is None:
+            raise HTTPException(status_code=404, detail="ListingSet not found")
+        used = None
+        for entry in members.values():
+            used = entry.bitmaps["tower"] if used is None else used | entry.bitmaps["tower"]
+        # The sets returned by one get() share their id dictionaries.
+        used_names = entry.decode("tower", used.to_array())
+        keep = np.isin(names.astype(str), np.array(used_names, dtype=str))
+        names, lon, lat = names[keep], lon[keep], lat[keep]
+
+    order = np.argsort(names.astype(str), kind="stable")[:limit]
+    return TowersInBox(
+        total=len(names),
+        truncated=len(names) > limit,
+        towers=[
+            TowerLocation(name=name, longitude=longitude, latitude=latitude)
+            for name, longitude, latitude in zip(names[order].tolist(), lon[order].tolist(), lat[order].tolist())
+        ],
+    )
+
+@router.get("/tiles", response_model=TileMap)
+def get_activity_tiles(
+    listing_set_id: List[str] = Query(..., description="The ListingSets whose activity is summed."),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level; served from the deepest stored level not deeper than it."),
+    west: float = Query(..., ge=-180, le=180, description="Western longitude; greater than east when the box crosses the antimeridian."),
+    south: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    limit: int = Query(5000, ge=1, le=MAX_TILES, description="Maximum number of tiles returned, busiest first."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Returns the calls and SMS per map tile of the user's ListingSets inside a
+    bounding box. Communications shared by several of the sets count once per set.
+    """
+    bbox = _bounding_box(west, south, east, north)
+    listing_set_ids = list(dict.fromkeys(listing_set_id))
+    versions = listings_crud.get_listing_set_versions(session, current_user["sub"], listing_set_ids)
+    if len(versions) < len(listing_set_ids):
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    level = stored_zoom(zoom)
+
+    def compute() -> bytes:
+        tiles = []
+        for x_min, x_max, y_min, y_max in tile_ranges(bbox, level):
+            tiles.extend(listings_crud.get_activity_tiles(session, listing_set_ids, level, x_min, x_max, y_min, y_max, limit + 1))
+        tiles.sort(key=lambda tile: tile["calls"] + tile["sms"], reverse=True)
+        tile_map = TileMap(
+            zoom=level,
+            requested_zoom=zoom,
+            listing_set_ids=listing_set_ids,
+            truncated=len(tiles) > limit,
+            tiles=[
+                MapTile(
+                    x=tile["x"], y=tile["y"], calls=tile["calls"], sms=tile["sms"], total=tile["calls"] + tile["sms"],
+                    **dict(zip(("west", "south", "east", "north"), tile_bounds(level, tile["x"], tile["y"])))
+                )
+                for tile in tiles[:limit]
+            ],
+        )
+        return tile_map.model_dump_json().encode("utf-8")
+
+    key = result_key("geo.tiles", {"zoom": level, "bbox": bbox, "limit": limit, "listing_set_id": sorted(listing_set_ids)}, versions)
+    return cached_response(key, compute)
@@ -1,47 +1,53 @@
+import json
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query
-from neo4j import Session, time as neo4j_time
-from typing import List, Dict, Any
+from fastapi.responses import StreamingResponse
+from neo4j import Session
+from typing import List, Dict, Any, Iterator, Literal, Optional, Tuple
 
-from app.db.graph_db import get_db_session
-from app.models.graph import Graph, Node, Edge
+from app.dependencies import get_current_admin_user, get_current_user, get_optional_user
+from app.db.graph_db import get_db_session, db_manager
+from app.crud import graph_crud, listings_crud
+from app.core.graph_encoder import GraphEncoder, encode_graph_records, encode_properties
+from app.core.graph_summary import ContactSummary, cluster_hub, subscriber_node_id
+from app.core.path_engine import STATUS_TIMEOUT, CypherContactAdjacency, bidirectional_shortest_paths
+from app.core.graph_snapshot import SnapshotAdjacency, get_contact_snapshot, snapshot_cache
+from app.core.neighborhood import expand_neighborhood
+from app.core.phone_index import LookupMode, phone_index
+from app.core.result_cache import cached_response, result_cache, result_key
+from app.core.membership import membership_index
+from app.models.graph import CacheMetrics, Graph, NeighborhoodGraph, PathSearchResponse, SubscriberLookup, SummaryGraph
 
 router = APIRouter()
 
-# --- Helper Functions (Unchanged) ---
+# "events" walks the raw Subscriber -> Communication -> Subscriber graph;
+# "contacts" walks the aggregated (:Subscriber)-[:CONTACTED]->(:Subscriber) edges.
+GraphView = Literal["events", "contacts"]
+VIEW_DESCRIPTION = "'events' for the raw communication graph, 'contacts' for the aggregated contact network."
+
+# Time windows: `start` included, `end` excluded. Naive datetimes are read as UTC
+# by Cypher's datetime(), like the ingested timestamps.
+START_DESCRIPTION = "Only communications at or after this time (ISO 8601, UTC if no offset)."
+END_DESCRIPTION = "Only communications before this time (ISO 8601, UTC if no offset)."
+
+# --- Helper Functions ---
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+def time_window(start: Optional[datetime], end: Optional[datetime]) -> Tuple[Optional[str], Optional[str]]:
+    """Returns the window as ISO strings for Cypher's datetime(); raises a 422 if it is empty."""
+    if start is not None and end is not None and as_utc(start) >= as_utc(end):
+        raise HTTPException(status_code=422, detail="start must be before end")
+    return (start.isoformat() if start is not None else None, end.isoformat() if end is not None else None)
+
 def convert_properties(props: Dict[str, Any]) -> Dict[str, Any]:
-    converted = {}
-    for key, value in props.items():
-        if isinstance(value, neo4j_time.DateTime):
-            converted[key] = value.to_native().isoformat()
-        else:
-            converted[key] = value
-    return converted
+    return encode_properties(props)
 
 def format_graph_response(records: List) -> Graph:
-    nodes = []
-    edges = []
-    node_ids = set()
-    for record in records:
-        path = record.get("p")
-        if path is None:
-            continue
-        for node in path.nodes:
-            if node.element_id not in node_ids:
-                nodes.append(Node(
-                    id=node.element_id,
-                    label=list(node.labels)[0],
-                    properties=convert_properties(dict(node))
-                ))
-                node_ids.add(node.element_id)
-        for edge in path.relationships:
-            edges.append(Edge(
-                id=edge.element_id,
-                source=edge.start_node.element_id,
-                target=edge.end_node.element_id,
-                label=edge.type,
-                properties=convert_properties(dict(edge))
-            ))
-    return Graph(nodes=nodes, edges=edges)
+    """Builds a validated Graph model. Endpoints use GraphEncoder, which skips the models."""
+    encoder = GraphEncoder()
+    encoder.add_records(records)
+    return Graph.model_validate(encoder.to_dict())
 
 # --- API Endpoints ---
 
@@ -50,49 +56,414 @@ def get_full_graph(session: Session = Depends(get_db_session)):
     """Retrieves the entire graph from the database."""
     query = "MATCH p = ()-[r]->() RETURN p"
     result = session.run(query)
-    records = list(result)
-    if not records:
-        return Graph(nodes=[], edges=[])
-    return format_graph_response(records)
+    return encode_graph_records(result)
+
+# --- Streaming variant of /full ---
+# The graph is read by a single query whose records the driver pulls in batches
+# of its fetch size, and nodes and edges are written as NDJSON lines, flushed
+# every STREAM_FLUSH_RECORDS records, without building a Graph model. The query
+# has no ORDER BY, so the database streams rows as it finds them instead of
+# sorting every edge first, and a client never re-reads edges page after page.
+FULL_GRAPH_MAX_EDGES = 5_000_000
+STREAM_FLUSH_RECORDS = 1000
+
+FULL_GRAPH_STREAM_QUERY = """
+MATCH (a)-[r]->(b)
+WHERE ($rel_types IS NULL OR type(r) IN $rel_types)
+  AND ($labels IS NULL OR (any(l IN labels(a) WHERE l IN $labels) AND any(l IN labels(b) WHERE l IN $labels)))
+  AND (($start IS NULL AND $end IS NULL) OR any(n IN [a, b] WHERE n:Communication
+       AND ($start IS NULL OR n.timestamp >= datetime($start)) AND ($end IS NULL OR n.timestamp < datetime($end))))
+RETURN a, r, b
+"""
+
+# Every relationship that touches a Communication of the given ListingSets.
+SCOPED_GRAPH_STREAM_QUERY = """
+MATCH (:User {username: $username})-[:OWNS]->(ls:ListingSet)
+WHERE ls.id IN $listing_set_ids
+MATCH (c:Communication)-[:PART_OF]->(ls)
+WHERE ($start IS NULL OR c.timestamp >= datetime($start))
+  AND ($end IS NULL OR c.timestamp < datetime($end))
+MATCH (c)-[r]-()
+WITH DISTINCT r
+WITH r, startNode(r) AS a, endNode(r) AS b
+WHERE ($rel_types IS NULL OR type(r) IN $rel_types)
+  AND ($labels IS NULL OR (any(l IN labels(a) WHERE l IN $labels) AND any(l IN labels(b) WHERE l IN $labels)))
+RETURN a, r, b
+"""
+
+def _check_listing_sets(session: Session, listing_set_ids: List[str], username: str):
+    """Raises a 404 unless every ListingSet exists and is owned by the user."""
+    for requested_id in listing_set_ids:
+        if listings_crud.get_listing_set(session, requested_id, username) is None:
+            raise HTTPException(status_code=404, detail=f"ListingSet {requested_id} not found")
+
+def _scoped_contact_edges(
+    session: Session,
+    listing_set_ids: Optional[List[str]],
+    username: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> List[dict]:
+    """
+    Contact edges of the user's ListingSets from their cached snapshot, or of the
+    whole graph. Time-windowed edges are counted by the database.
+    """
+    if listing_set_ids and (start is not None or end is not None):
+        _check_listing_sets(session, listing_set_ids, username)
+    if not listing_set_ids or start is not None or end is not None:
+        return graph_crud.get_contact_edges(session, username, listing_set_ids, start, end)
+    snapshot = get_contact_snapshot(session, listing_set_ids, username)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return snapshot.edge_dicts()
+
+def _listing_set_versions(session: Session, listing_set_ids: Optional[List[str]], current_user: Optional[dict]) -> Dict[str, int]:
+    """
+    Versions of the user's ListingSets (404 unless the user owns them all), or of
+    every ListingSet when the query reads the whole graph. Used to key cached results.
+    """
+    if not listing_set_ids:
+        return listings_crud.get_listing_set_versions(session)
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    versions = listings_crud.get_listing_set_versions(session, current_user["sub"], listing_set_ids)
+    if len(versions) < len(set(listing_set_ids)):
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return versions
+
+def _json_bytes(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _ndjson_line(item: Dict[str, Any]) -> str:
+    # Neo4j temporal values other than DateTime (Date, Duration...) fall back to str().
+    return json.dumps(item, default=str, ensure_ascii=False) + "\n"
+
+def _stream_graph(query: str, params: Dict[str, Any], max_edges: int) -> Iterator[str]:
+    """
+    Yields NDJSON lines, one per node (once) and per edge, in chunks of
+    STREAM_FLUSH_RECORDS records, followed by an "end" line with the number of
+    edges and whether `max_edges` cut the graph short.
+    """
+    node_ids = set()
+    edges = 0
+    truncated = False
+    lines = []
+    with db_manager.get_session() as db_session:
+        for record in db_session.run(query, **params):
+            if edges == max_edges:
+                # Leaving the loop discards the records the database has not sent yet.
+                truncated = True
+                break
+            for node in (record["a"], record["b"]):
+                if node.element_id not in node_ids:
+                    node_ids.add(node.element_id)
+                    lines.append(_ndjson_line({
+                        "type": "node",
+                        "id": node.element_id,
+                        "label": list(node.labels)[0],
+                        "properties": convert_properties(dict(node)),
+                    }))
+            edge = record["r"]
+            lines.append(_ndjson_line({
+                "type": "edge",
+                "id": edge.element_id,
+                "source": edge.start_node.element_id,
+                "target": edge.end_node.element_id,
+                "label": edge.type,
+                "properties": convert_properties(dict(edge)),
+            }))
+            edges += 1
+            if edges % STREAM_FLUSH_RECORDS == 0:
+                yield "".join(lines)
+                lines = []
+    lines.append(_ndjson_line({"type": "end", "edges": edges, "truncated": truncated}))
+    yield "".join(lines)
+
+@router.get("/full/stream")
+def stream_full_graph(
+    max_edges: int = Query(FULL_GRAPH_MAX_EDGES, ge=1, le=FULL_GRAPH_MAX_EDGES, description="Stop after this many edges."),
+    listing_set_id: Optional[List[str]] = Query(None, description="Only the graph of these ListingSets."),
+    label: Optional[List[str]] = Query(None, description="Only edges whose both ends have one of these labels."),
+    rel_type: Optional[List[str]] = Query(None, description="Only edges of these relationship types."),
+    start: Optional[datetime] = Query(None, description="Only edges touching a communication at or after this time."),
+    end: Optional[datetime] = Query(None, description="Only edges touching a communication before this time."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Streams the graph as NDJSON in one response: "node" and "edge" lines as the
+    database returns them, then an "end" line.
+    """
+    window_start, window_end = time_window(start, end)
+    params = {"labels": label, "rel_types": rel_type, "start": window_start, "end": window_end}
+    query = FULL_GRAPH_STREAM_QUERY
+    if listing_set_id:
+        _check_listing_sets(session, listing_set_id, current_user["sub"])
+        query = SCOPED_GRAPH_STREAM_QUERY
+        params.update(username=current_user["sub"], listing_set_ids=listing_set_id)
+
+    return StreamingResponse(_stream_graph(query, params, max_edges), media_type="application/x-ndjson")
+
+# --- Level-of-detail summary ---
+SUMMARY_NODE_BUDGET = 500
+SUMMARY_MAX_NODE_BUDGET = 20000
+
+@router.get("/summary", response_model=SummaryGraph)
+def get_graph_summary(
+    listing_set_id: Optional[List[str]] = Query(None, description="Summarize these ListingSets (the whole graph if omitted)."),
+    node_budget: int = Query(SUMMARY_NODE_BUDGET, ge=2, le=SUMMARY_MAX_NODE_BUDGET, description="Maximum number of nodes returned."),
+    leaf_degree: int = Query(1, ge=1, le=10, description="Subscribers with at most this many contacts are grouped into clusters."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Returns the contact network with communications collapsed into weighted
+    subscriber-to-subscriber edges, leaves grouped into cluster nodes and the
+    heaviest structure kept within `node_budget` nodes.
+    """
+    edges = _scoped_contact_edges(session, listing_set_id, current_user["sub"], *time_window(start, end))
+    return ContactSummary(edges, leaf_degree).summarize(node_budget)
+
+@router.get("/summary/clusters/{cluster_id}", response_model=Graph)
+def expand_graph_cluster(
+    cluster_id: str,
+    listing_set_id: Optional[List[str]] = Query(None, description="The ListingSets the summary was built from."),
+    leaf_degree: int = Query(1, ge=1, le=10, description="The leaf_degree the summary was built with."),
+    start: Optional[datetime] = Query(None, description="The start the summary was built with."),
+    end: Optional[datetime] = Query(None, description="The end the summary was built with."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Expands a cluster node of /summary into its hub and member subscribers."""
+    hub = cluster_hub(cluster_id)
+    if hub is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    edges = _scoped_contact_edges(session, listing_set_id, current_user["sub"], *time_window(start, end))
+    expanded = ContactSummary(edges, leaf_degree).expand_cluster(hub)
+    if expanded is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return expanded
 
 # --- NEW ENDPOINT 1: Search for a Subscriber ---
-@router.get("/search", response_model=Graph)
+SEARCH_MAX_DEPTH = 3
+SEARCH_MAX_FAN_OUT = 500
+
+def _neighborhood_network(neighborhood) -> Dict[str, Any]:
+    nodes = [
+        {
+            "id": subscriber_node_id(phone_number),
+            "label": "Subscriber",
+            "properties": {"phoneNumber": phone_number, "hops": hops},
+        }
+        for phone_number, hops in neighborhood.hops.items()
+    ]
+    edges = []
+    for (a, b), pair in neighborhood.edges.items():
+        source, target = subscriber_node_id(a), subscriber_node_id(b)
+        edges.append({
+            "id": f"{source}|{target}",
+            "source": source,
+            "target": target,
+            "label": "CONTACTED",
+            "properties": {"calls": pair["calls"], "sms": pair["sms"], "weight": pair["calls"] + pair["sms"]},
+        })
+    return {"nodes": nodes, "edges": edges, "truncated": neighborhood.truncated, "hidden_contacts": neighborhood.hidden_contacts}
+
+@router.get("/search", response_model=NeighborhoodGraph)
 def search_subscriber(
     phone_number: str = Query(..., description="The phone number of the subscriber to search for."),
+    view: GraphView = Query("events", description=VIEW_DESCRIPTION),
+    depth: int = Query(1, ge=1, le=SEARCH_MAX_DEPTH, description="Number of contact hops to expand."),
+    fan_out: Optional[int] = Query(None, ge=1, le=SEARCH_MAX_FAN_OUT, description="Keep only this many heaviest contacts per subscriber and hop."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    listing_set_id: Optional[List[str]] = Query(None, description="Only communications from these ListingSets (requires authentication)."),
+    current_user: Optional[dict] = Depends(get_optional_user),
     session: Session = Depends(get_db_session)
 ):
     """
     Finds a subscriber by their phone number and returns their immediate network (1-hop neighborhood).
+    With a depth above 1, a fan-out cap, a time window or ListingSets, returns the
+    subscriber's contact network instead: subscribers up to `depth` hops away joined
+    by weighted CONTACTED edges, keeping the heaviest `fan_out` contacts at every hop.
     """
-    # This query finds the subscriber and any node connected to them by one relationship.
-    query = """
-    MATCH p = (s:Subscriber {phoneNumber: $phone_number})-[*0..1]-(neighbor)
-    RETURN p
-    """
-    result = session.run(query, phone_number=phone_number)
-    records = list(result)
-    if not records:
+    window_start, window_end = time_window(start, end)
+    versions = _listing_set_versions(session, listing_set_id, current_user)
+    key = result_key(
+        "graph.search",
+        {"phone_number": phone_number, "view": view, "depth": depth, "fan_out": fan_out,
+         "start": window_start, "end": window_end, "listing_set_id": sorted(set(listing_set_id or []))},
+        versions, whole_graph=not listing_set_id
+    )
+    if depth > 1 or fan_out is not None or start is not None or end is not None or listing_set_id:
+        return cached_response(key, lambda: _json_bytes(_search_neighborhood(
+            session, current_user, phone_number, depth, fan_out, window_start, window_end, listing_set_id
+        )))
+    return cached_response(key, lambda: _search_events(session, phone_number, view))
+
+def _search_events(session: Session, phone_number: str, view: str) -> bytes:
+    if view == "contacts":
+        # One CONTACTED edge per correspondent, whatever the number of communications.
+        query = """
+        MATCH p = (s:Subscriber {phoneNumber: $phone_number})-[:CONTACTED*0..1]-(neighbor:Subscriber)
+        RETURN p
+        """
+    else:
+        # This query finds the subscriber and any node connected to them by one relationship.
+        query = """
+        MATCH p = (s:Subscriber {phoneNumber: $phone_number})-[*0..1]-(neighbor)
+        RETURN p
+        """
+    encoder = GraphEncoder()
+    encoder.add_records(session.run(query, phone_number=phone_number))
+    if not len(encoder):
         raise HTTPException(status_code=404, detail="Subscriber not found")
-    return format_graph_response(records)
+    return encoder.to_bytes()
+
+def _search_neighborhood(
+    session: Session,
+    current_user: Optional[dict],
+    phone_number: str,
+    depth: int,
+    fan_out: Optional[int],
+    start: Optional[str],
+    end: Optional[str],
+    listing_set_id: Optional[List[str]],
+) -> Dict[str, Any]:
+    # The caller has checked that the user owns the ListingSets.
+    database = CypherContactAdjacency(session, listing_set_id, start=start, end=end)
+    provider = database
+    if listing_set_id and start is None and end is None:
+        # Without a time window, the ListingSets' in-memory snapshot holds the weights.
+        snapshot = get_contact_snapshot(session, listing_set_id, current_user["sub"])
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="ListingSet not found")
+        provider = SnapshotAdjacency(snapshot)
+    if database.missing([phone_number]):
+        raise HTTPException(status_code=404, detail="Subscriber not found")
+    return _neighborhood_network(expand_neighborhood(provider, phone_number, depth, fan_out))
+
+@router.get("/subscribers/lookup", response_model=SubscriberLookup)
+def lookup_subscribers(
+    digits: str = Query(..., min_length=2, max_length=32, description="The first (or last) digits of the phone number."),
+    mode: LookupMode = Query("prefix", description="'prefix' matches the start of the number, 'suffix' its end."),
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Finds subscribers from a few digits of their phone number, using the in-memory phone number index."""
+    phone_index.ensure_loaded(session)
+    digits = digits.strip()
+    phone_numbers, total = phone_index.lookup(digits, mode, limit)
+    return SubscriberLookup(digits=digits, mode=mode, total=total, phone_numbers=phone_numbers)
+
+# --- Bounded shortest-path engine ---
+# Bidirectional BFS over Subscriber contacts only (app.core.path_engine), with a
+# hop limit, type filter, ListingSet scope and a time budget.
+PATH_MAX_DEPTH = 12
+PATH_MAX_K = 50
+PATH_MAX_TIMEOUT_SECONDS = 30.0
+
+def _paths_network(paths: List[List[str]]) -> Graph:
+    nodes, edges = {}, {}
+    for path in paths:
+        for phone_number in path:
+            node_id = subscriber_node_id(phone_number)
+            nodes.setdefault(node_id, {"id": node_id, "label": "Subscriber", "properties": {"phoneNumber": phone_number}})
+        for a, b in zip(path, path[1:]):
+            source, target = subscriber_node_id(a), subscriber_node_id(b)
+            edges.setdefault(f"{source}|{target}", {"id": f"{source}|{target}", "source": source, "target": target, "label": "CONTACTED", "properties": {}})
+    return Graph(nodes=list(nodes.values()), edges=list(edges.values()))
 
 # --- NEW ENDPOINT 2: Find Shortest Path ---
+# Runs on the bounded engine with default limits, so it never walks Device or
+# CellTower hubs nor searches without a hop limit or time budget.
+SHORTEST_PATH_MAX_DEPTH = 6
+SHORTEST_PATH_TIMEOUT_SECONDS = 5.0
+
 @router.get("/shortest-path", response_model=Graph)
 def get_shortest_path(
     start_phone: str = Query(..., description="Phone number of the starting subscriber."),
     end_phone: str = Query(..., description="Phone number of the ending subscriber."),
+    view: GraphView = Query("events", description="Ignored: paths are always made of Subscriber contacts.", deprecated=True),
+    current_user: dict = Depends(get_current_user),
     session: Session = Depends(get_db_session)
 ):
     """
-    Calculates the shortest path between two subscribers in the communication network.
+    Calculates the shortest contact paths (at most SHORTEST_PATH_MAX_DEPTH
+    contacts) between two subscribers. /shortest-path/bounded exposes the limits.
     """
-    # This query uses a built-in Neo4j algorithm to find the shortest path.
-    query = """
-    MATCH (a:Subscriber {phoneNumber: $start_phone}), (b:Subscriber {phoneNumber: $end_phone})
-    MATCH p = allShortestPaths((a)-[*]-(b))
-    RETURN p
+    database = CypherContactAdjacency(session)
+    missing = database.missing([start_phone, end_phone])
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Subscriber not found: {', '.join(missing)}")
+
+    def compute() -> bytes:
+        result = bidirectional_shortest_paths(
+            database, start_phone, end_phone,
+            max_depth=SHORTEST_PATH_MAX_DEPTH, k=PATH_MAX_K, timeout=SHORTEST_PATH_TIMEOUT_SECONDS
+        )
+        if result.status == STATUS_TIMEOUT:
+            raise HTTPException(status_code=504, detail="The path search ran out of time; use /shortest-path/bounded with a larger timeout")
+        if not result.paths:
+            raise HTTPException(status_code=404, detail=f"No path of at most {SHORTEST_PATH_MAX_DEPTH} contacts found between the specified subscribers")
+        return _paths_network(result.paths).model_dump_json().encode("utf-8")
+
+    key = result_key(
+        "graph.shortest_path", {"start_phone": start_phone, "end_phone": end_phone},
+        listings_crud.get_listing_set_versions(session), whole_graph=True
+    )
+    return cached_response(key, compute)
+
+@router.get("/shortest-path/bounded", response_model=PathSearchResponse)
+def get_bounded_shortest_paths(
+    start_phone: str = Query(..., description="Phone number of the starting subscriber."),
+    end_phone: str = Query(..., description="Phone number of the ending subscriber."),
+    max_depth: int = Query(6, ge=1, le=PATH_MAX_DEPTH, description="Maximum number of contacts in a path."),
+    type: List[Literal["CALL", "SMS"]] = Query(["CALL", "SMS"], description="Communication types a contact must include."),
+    listing_set_id: Optional[List[str]] = Query(None, description="Only contacts from these ListingSets."),
+    k: int = Query(1, ge=1, le=PATH_MAX_K, description="Maximum number of shortest paths returned."),
+    timeout: float = Query(5.0, gt=0, le=PATH_MAX_TIMEOUT_SECONDS, description="Time budget in seconds."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
     """
-    result = session.run(query, start_phone=start_phone, end_phone=end_phone)
-    records = list(result)
-    if not records:
-        raise HTTPException(status_code=404, detail="No path found between the specified subscribers")
-    return format_graph_response(records)
\ No newline at end of file
+    Finds up to `k` shortest contact paths between two subscribers. When the time
+    budget runs out, the response has complete=false instead of the request hanging.
+    """
+    window_start, window_end = time_window(start, end)
+    database = CypherContactAdjacency(session, listing_set_id, type, start=window_start, end=window_end)
+    provider = database
+    if listing_set_id and (start is not None or end is not None):
+        _check_listing_sets(session, listing_set_id, current_user["sub"])
+    elif listing_set_id:
+        # Scoped searches run on the ListingSets' in-memory snapshot.
+        snapshot = get_contact_snapshot(session, listing_set_id, current_user["sub"])
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="ListingSet not found")
+        provider = SnapshotAdjacency(snapshot, type)
+    missing = database.missing([start_phone, end_phone])
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Subscriber not found: {', '.join(missing)}")
+
+    result = bidirectional_shortest_paths(provider, start_phone, end_phone, max_depth=max_depth, k=k, timeout=timeout)
+    return PathSearchResponse(
+        paths=result.paths,
+        length=len(result.paths[0]) - 1 if result.paths else None,
+        status=result.status,
+        complete=result.complete,
+        depth_reached=result.depth_reached,
+        visited=result.visited,
+        elapsed_seconds=result.elapsed_seconds,
+        network=_paths_network(result.paths),
+    )
+
+# --- Cache metrics ---
+@router.get("/cache/metrics", response_model=CacheMetrics)
+def get_cache_metrics(current_user: dict = Depends(get_current_admin_user)):
+    """Hit/miss counters and sizes of the query result, contact snapshot and ListingSet member caches."""
+    return CacheMetrics(results=result_cache.stats(), snapshots=snapshot_cache.stats(), memberships=membership_index.stats())
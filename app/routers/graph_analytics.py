@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from neo4j import Session
+from typing import List, Literal, Optional
+
+import numpy as np
+
+from app.dependencies import get_current_user
+from app.db.graph_db import get_db_session
+from app.core import graph_analytics
+from app.core.graph_snapshot import ContactGraphSnapshot, get_contact_snapshot
+from app.models.analytics import CentralityResponse, CommunitiesResponse, Community, NodeScore
+
+router = APIRouter()
+
+# Analytics run on the cached contact graph snapshot of the requested ListingSets
+# and are memoized on it, so repeated calls for the same data are free until the
+# sets change.
+CentralityMetric = Literal["degree", "strength", "pagerank", "betweenness"]
+MAX_TOP_K = 1000
+
+def _load_snapshot(session: Session, listing_set_ids: List[str], username: str) -> ContactGraphSnapshot:
+    snapshot = get_contact_snapshot(session, listing_set_ids, username)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return snapshot
+
+@router.get("/centrality", response_model=CentralityResponse)
+def get_centrality(
+    listing_set_id: List[str] = Query(..., description="The ListingSets whose contact network is analysed."),
+    metric: CentralityMetric = Query("pagerank", description="degree (distinct contacts), strength (communications), pagerank or betweenness."),
+    top_k: int = Query(50, ge=1, le=MAX_TOP_K),
+    samples: Optional[int] = Query(None, ge=1, le=10000, description="Betweenness only: estimate from this many sampled sources."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Returns the top-k subscribers for a centrality metric, with their scores.
+    Betweenness is exact on small networks and sampled on large ones (or when `samples` is set).
+    """
+    snapshot = _load_snapshot(session, listing_set_id, current_user["sub"])
+    approximate = False
+    if metric in ("degree", "strength"):
+        scores = graph_analytics.memoized(snapshot, ("degree",), lambda: graph_analytics.degree_centrality(snapshot))[metric]
+    elif metric == "pagerank":
+        scores = graph_analytics.memoized(snapshot, ("pagerank",), lambda: graph_analytics.pagerank(snapshot))
+    else:
+        scores, approximate = graph_analytics.memoized(
+            snapshot, ("betweenness", samples), lambda: graph_analytics.betweenness_centrality(snapshot, samples)
+        )
+
+    top = np.argsort(-scores, kind="stable")[:top_k]
+    return CentralityResponse(
+        metric=metric,
+        approximate=approximate,
+        node_count=snapshot.node_count,
+        edge_count=snapshot.edge_count,
+        scores=[
+            NodeScore(phoneNumber=phone_number, score=score, rank=rank)
+            for rank, (phone_number, score) in enumerate(zip(snapshot.nodes[top].tolist(), scores[top].tolist()), start=1)
+        ],
+    )
+
+@router.get("/communities", response_model=CommunitiesResponse)
+def get_communities(
+    listing_set_id: List[str] = Query(..., description="The ListingSets whose contact network is analysed."),
+    top_k: int = Query(20, ge=1, le=MAX_TOP_K, description="Number of communities returned, largest first."),
+    member_limit: int = Query(50, ge=1, le=MAX_TOP_K, description="Members listed per community, most active first."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Detects communities with weighted label propagation and returns the largest ones
+    with their most active members.
+    """
+    snapshot = _load_snapshot(session, listing_set_id, current_user["sub"])
+    labels = graph_analytics.memoized(snapshot, ("label_propagation",), lambda: graph_analytics.label_propagation(snapshot))
+    quality = graph_analytics.memoized(snapshot, ("modularity",), lambda: graph_analytics.modularity(snapshot, labels))
+    strength = graph_analytics.memoized(snapshot, ("degree",), lambda: graph_analytics.degree_centrality(snapshot))["strength"]
+
+    graph = snapshot.undirected()
+    sources = graph.sources()
+    internal = labels[sources] == labels[graph.indices]
+    # Every internal edge appears once in each direction.
+    weights = np.bincount(labels[sources][internal], weights=graph.weights[internal], minlength=len(labels)) / 2.0
+    sizes = np.bincount(labels, minlength=len(labels))
+
+    communities = []
+    # Labels are numbered by decreasing size.
+    for community_id in range(min(top_k, int(labels.max()) + 1 if len(labels) else 0)):
+        members = np.flatnonzero(labels == community_id)
+        members = members[np.argsort(-strength[members], kind="stable")][:member_limit]
+        communities.append(Community(
+            id=community_id,
+            size=int(sizes[community_id]),
+            weight=float(weights[community_id]),
+            members=snapshot.nodes[members].tolist(),
+        ))
+
+    return CommunitiesResponse(
+        algorithm="label_propagation",
+        community_count=int(labels.max()) + 1 if len(labels) else 0,
+        modularity=quality,
+        node_count=snapshot.node_count,
+        communities=communities,
+    )
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from neo4j import Session
+from typing import Dict, List, Literal
+
+from app.dependencies import get_current_user
+from app.db.graph_db import get_db_session
+from app.core.bitmaps import CompressedBitmap
+from app.core.membership import MemberKind, ListingSetMembers, membership_index
+from app.models.overlaps import OverlapMatrix, OverlapResult
+
+router = APIRouter()
+
+# Set operations over the subscribers, devices or cell towers of ListingSets,
+# answered from the in-memory member bitmaps (app.core.membership).
+OverlapOperation = Literal["intersection", "union", "difference"]
+MAX_MEMBERS_PAGE = 10000
+MAX_MATRIX_SETS = 100
+
+def _load_members(session: Session, listing_set_ids: List[str], username: str) -> Dict[str, ListingSetMembers]:
+    members = membership_index.get(session, listing_set_ids, username)
+    if members is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return members
+
+@router.get("/matrix", response_model=OverlapMatrix)
+def get_overlap_matrix(
+    listing_set_id: List[str] = Query(..., description="The ListingSets to compare (at least 2)."),
+    kind: MemberKind = Query("subscriber", description="Compare subscribers, devices or cell towers."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """Returns the pairwise intersection sizes and Jaccard similarities of N ListingSets."""
+    listing_set_ids = list(dict.fromkeys(listing_set_id))
+    if not 2 <= len(listing_set_ids) <= MAX_MATRIX_SETS:
+        raise HTTPException(status_code=422, detail=f"Between 2 and {MAX_MATRIX_SETS} distinct ListingSets are required")
+    members = _load_members(session, listing_set_ids, current_user["sub"])
+    bitmaps = [members[listing_set_id].bitmaps[kind] for listing_set_id in listing_set_ids]
+    sizes = [len(bitmap) for bitmap in bitmaps]
+
+    intersections = [[0] * len(bitmaps) for _ in bitmaps]
+    jaccard = [[0.0] * len(bitmaps) for _ in bitmaps]
+    for i, a in enumerate(bitmaps):
+        intersections[i][i] = sizes[i]
+        jaccard[i][i] = 1.0 if sizes[i] else 0.0
+        for j in range(i + 1, len(bitmaps)):
+            common = a.intersection_count(bitmaps[j])
+            union = sizes[i] + sizes[j] - common
+            intersections[i][j] = intersections[j][i] = common
+            jaccard[i][j] = jaccard[j][i] = common / union if union else 0.0
+    return OverlapMatrix(kind=kind, listing_set_ids=listing_set_ids, intersections=intersections, jaccard=jaccard)
+
+@router.get("/{operation}", response_model=OverlapResult)
+def get_overlap(
+    operation: OverlapOperation,
+    listing_set_id: List[str] = Query(..., description="The ListingSets; a difference keeps the members of the first set that none of the others has."),
+    kind: MemberKind = Query("subscriber", description="Compare subscribers, devices or cell towers."),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=MAX_MEMBERS_PAGE, description="Maximum number of members returned."),
+    current_user: dict = Depends(get_current_user),
+    session: Session = Depends(get_db_session)
+):
+    """
+    Returns the members in all (intersection), any (union) or only the first
+    (difference) of the ListingSets, with the total count. Members are paged in
+    a stable order: the order they were first seen by the server.
+    """
+    listing_set_ids = list(dict.fromkeys(listing_set_id))
+    if operation == "difference" and len(listing_set_ids) < 2:
+        raise HTTPException(status_code=422, detail="A difference needs at least 2 distinct ListingSets")
+    members = _load_members(session, listing_set_ids, current_user["sub"])
+    bitmaps = [members[listing_set_id].bitmaps[kind] for listing_set_id in listing_set_ids]
+
+    if operation == "intersection":
+        # Smallest first keeps every intermediate result small.
+        bitmaps.sort(key=len)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap
+    else:
+        rest = bitmaps[1:] if operation == "difference" else bitmaps
+        result = CompressedBitmap()
+        for bitmap in rest:
+            result = result | bitmap
+        if operation == "difference":
+            result = bitmaps[0] - result
+
+    ids = result.to_array()
+    return OverlapResult(
+        operation=operation,
+        kind=kind,
+        listing_set_ids=listing_set_ids,
+        count=len(ids),
+        members=members[listing_set_ids[0]].decode(kind, ids[offset:offset + limit]),
+    )
@@ -1,7 +1,16 @@
+import asyncio
+import base64
 import csv
 import io
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import Annotated, List, Dict, Any
+import json
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status, File, Form, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Annotated, List, Dict, Any, AsyncIterator, Iterator, Literal, Optional
 from neo4j import Session
 
 # Corrected imports
@@ -9,10 +18,18 @@ from app.dependencies import get_current_user
 from app.db.graph_db import  get_db_session
 from app.db.graph_db import db_manager # <-- Import the central DB manager
 from app.crud import listings_crud
-from app.models.listings import ListingSet, ListingSetCreate
+from app.crud.graph_crud import EARLIEST_TIMESTAMP, LATEST_TIMESTAMP
+from app.models.listings import ActivityHistogram, ListingSet, ListingSetCreate, IngestionStatus, VisualizePage
 from app.models.graph import Graph
-from app.routers.graph import format_graph_response
-from scripts.ingest_data import ingest_listings_data
+from app.models.colocation import ColocationPair, ColocationResponse
+from app.routers.graph import END_DESCRIPTION, START_DESCRIPTION, as_utc, format_graph_response, time_window
+from app.core.file_readers import get_listing_file_extension, spool_upload, spool_rows
+from app.core.ingest_jobs import submit_ingest_job
+from app.core.result_cache import cached_response, result_key
+from app.core.activity import Granularity, activity_histogram
+from app.core.colocation import colocation_engine, sweep_colocations
+from app.core.export import EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES, ExportFormat, arrow_available, default_export_format, stream_export
+from app.core.normalization import ACTIVITY_SCOPE_LISTING_SET
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -20,49 +37,81 @@ router = APIRouter()
 class ListingImportRequest(BaseModel):
     name: str
     listings: List[Dict[str, Any]]
+    # Also skip communications already imported in the user's other ListingSets.
+    dedupe_across_sets: bool = False
 
-# --- CORRECTED BACKGROUND TASK ---
-# It no longer accepts a `db` session. It creates its own.
-def process_and_ingest_data(listings_data: list, listing_set_id: str):
-    """
-    Background task to ingest data. It creates and manages its own DB session
-    to ensure it's independent of the request that spawned it.
-    """
-    # Create a new, fresh session specifically for this long-running task
-    with db_manager.get_session() as db_session:
-        try:
-            # Pass the new session to the ingestion function
-            ingest_listings_data(db_session, listings_data, listing_set_id)
-        except Exception as e:
-            print(f"A critical error occurred during background ingestion for {listing_set_id}: {e}")
-            # In a production app, you might want to update the ListingSet's status to 'failed' here.
-
-# --- CORRECTED IMPORT ENDPOINT ---
+# --- IMPORT ENDPOINTS ---
+# Ingestion runs on the persistent job queue (app.core.ingest_jobs), not inside the
+# request worker. Rows are spooled to disk first so a restart can resume the job.
 @router.post("/listings/import", status_code=status.HTTP_202_ACCEPTED)
 def import_new_listings(
     import_request: ListingImportRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db_session) # This session is ONLY for the fast part of the request
 ):
     """
-    Creates a ListingSet immediately and schedules the data ingestion to run in the background.
+    Creates a ListingSet immediately and queues the data ingestion as a background job.
     """
-    # This part is fast and uses the request's session
-    listing_set_create = ListingSetCreate(name=import_request.name)
-    new_listing_set = listings_crud.create_listing_set(
-        db, listing_set_create, owner_username=current_user["sub"]
+    file_path = spool_rows(import_request.listings)
+
+    try:
+        listing_set_create = ListingSetCreate(name=import_request.name)
+        new_listing_set = listings_crud.create_listing_set(
+            db, listing_set_create, owner_username=current_user["sub"]
+        )
+    except Exception:
+        os.remove(file_path)
+        raise
+
+    job = submit_ingest_job(
+        new_listing_set.id, current_user["sub"], file_path, ".jsonl",
+        dedupe_across_sets=import_request.dedupe_across_sets
     )
 
-    # Schedule the background task.
-    # CRITICAL: We do NOT pass the `db` session object from the dependency.
-    background_tasks.add_task(
-        process_and_ingest_data, import_request.listings, new_listing_set.id
+    return {
+        "message": "Import successful. Ingestion has been queued.",
+        "listing_set": new_listing_set,
+        "job_id": job["id"]
+    }
+
+@router.post("/listings/upload", status_code=status.HTTP_202_ACCEPTED)
+def upload_new_listings(
+    name: str = Form(...),
+    file: UploadFile = File(..., description="Raw operator export (.csv or .xlsx)."),
+    dedupe_across_sets: bool = Form(False),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Accepts a raw CSV/XLSX listing export as a multipart upload. The file is spooled
+    to disk and parsed incrementally by an ingestion worker, so rows reach ingestion
+    in bounded chunks whatever the file size.
+    """
+    try:
+        extension = get_listing_file_extension(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+
+    file_path = spool_upload(file.file, extension)
+
+    try:
+        listing_set_create = ListingSetCreate(name=name)
+        new_listing_set = listings_crud.create_listing_set(
+            db, listing_set_create, owner_username=current_user["sub"]
+        )
+    except Exception:
+        os.remove(file_path)
+        raise
+
+    job = submit_ingest_job(
+        new_listing_set.id, current_user["sub"], file_path, extension,
+        dedupe_across_sets=dedupe_across_sets
     )
-    
+
     return {
-        "message": "Import successful. Ingestion has started in the background.",
-        "listing_set": new_listing_set
+        "message": "Upload successful. Ingestion has been queued.",
+        "listing_set": new_listing_set,
+        "job_id": job["id"]
     }
 
 # --- GET Listings Endpoint (Unchanged) ---
@@ -73,6 +122,220 @@ def get_my_listing_sets(
 ):
     return listings_crud.get_user_listing_sets(db, owner_username=current_user["sub"])
 
+# --- Ingestion Progress Endpoints ---
+# Any other status, including none at all (sets created before ingestion status
+# was recorded), means ingestion is over.
+ACTIVE_INGEST_STATUSES = ("queued", "running")
+STATUS_STREAM_INTERVAL_SECONDS = 1.0
+STATUS_STREAM_KEEPALIVE_SECONDS = 15.0
+
+@router.get("/listings/{listing_set_id}/status", response_model=IngestionStatus)
+def get_listing_set_status(
+    listing_set_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Returns the ingestion status and row counters of a ListingSet owned by the current user.
+    """
+    progress = listings_crud.get_ingestion_status(db, listing_set_id, current_user["sub"])
+    if progress is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return progress
+
+def _read_ingestion_status(listing_set_id: str, username: str) -> Optional[IngestionStatus]:
+    with db_manager.get_session() as db_session:
+        return listings_crud.get_ingestion_status(db_session, listing_set_id, username)
+
+async def _ingestion_status_events(listing_set_id: str, username: str) -> AsyncIterator[str]:
+    """
+    Yields Server-Sent Events with the ListingSet's progress whenever it changes,
+    until ingestion is no longer queued or running. The generator sleeps on the
+    event loop and only borrows a threadpool thread for each database read.
+    """
+    last_payload = None
+    last_sent = time.monotonic()
+    while True:
+        progress = await run_in_threadpool(_read_ingestion_status, listing_set_id, username)
+        if progress is None:
+            yield "event: error\ndata: {\"detail\": \"ListingSet not found\"}\n\n"
+            return
+
+        payload = progress.model_dump_json()
+        if payload != last_payload:
+            yield f"event: progress\ndata: {payload}\n\n"
+            last_payload = payload
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= STATUS_STREAM_KEEPALIVE_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        if progress.status not in ACTIVE_INGEST_STATUSES:
+            return
+        await asyncio.sleep(STATUS_STREAM_INTERVAL_SECONDS)
+
+@router.get("/listings/{listing_set_id}/status/stream")
+def stream_listing_set_status(
+    listing_set_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Server-Sent Events stream of a ListingSet's ingestion progress, for live progress bars.
+    """
+    if listings_crud.get_ingestion_status(db, listing_set_id, current_user["sub"]) is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return StreamingResponse(
+        _ingestion_status_events(listing_set_id, current_user["sub"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --- Activity Histogram Endpoint ---
+@router.get("/listings/{listing_set_id}/activity", response_model=ActivityHistogram)
+def get_listing_set_activity(
+    listing_set_id: str,
+    granularity: Granularity = Query("day", description="Bin by 'hour', 'day' or 'weekday' (UTC)."),
+    phone_number: Optional[str] = Query(None, description="Only the communications of this subscriber (as caller or recipient)."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Returns a histogram of a ListingSet's communications, read from the hourly
+    activity buckets maintained at ingest.
+    """
+    if listings_crud.get_listing_set(db, listing_set_id, current_user["sub"]) is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    window_start, window_end = time_window(start, end)
+    buckets = listings_crud.get_activity_buckets(
+        db, listing_set_id, phone_number or ACTIVITY_SCOPE_LISTING_SET, window_start, window_end
+    )
+
+    hours = np.array(
+        [bucket["hour"].to_native().astimezone(timezone.utc).replace(tzinfo=None) for bucket in buckets],
+        dtype="datetime64[h]"
+    )
+    calls = np.array([bucket["calls"] for bucket in buckets], dtype=np.int64)
+    sms = np.array([bucket["sms"] for bucket in buckets], dtype=np.int64)
+    return ActivityHistogram(
+        listing_set_id=listing_set_id,
+        phone_number=phone_number,
+        granularity=granularity,
+        total_calls=int(calls.sum()),
+        total_sms=int(sms.sum()),
+        bins=activity_histogram(hours, calls, sms, granularity),
+    )
+
+# --- Co-location Endpoint ---
+MAX_COLOCATION_WINDOW_MINUTES = 24 * 60
+MAX_COLOCATION_PAIRS = 10000
+
+def _iso_seconds(seconds: np.ndarray) -> List[str]:
+    return np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s").tolist()
+
+@router.get("/listings/{listing_set_id}/colocations", response_model=ColocationResponse)
+def get_listing_set_colocations(
+    listing_set_id: str,
+    window_minutes: int = Query(15, ge=0, le=MAX_COLOCATION_WINDOW_MINUTES, description="Maximum time between two events at the same tower."),
+    min_count: int = Query(1, ge=1, description="Only pairs co-located at least this many times."),
+    phone_number: Optional[str] = Query(None, description="Only the pairs this subscriber is part of."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    limit: int = Query(100, ge=1, le=MAX_COLOCATION_PAIRS),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Returns the pairs of subscribers whose communications went through the same
+    cell tower within `window_minutes` of each other. The caller of a communication
+    is the subscriber placed at its tower.
+    """
+    window_start, window_end = time_window(start, end)
+    versions = listings_crud.get_listing_set_versions(db, current_user["sub"], [listing_set_id])
+    if listing_set_id not in versions:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+
+    def compute() -> bytes:
+        events = colocation_engine.events(db, listing_set_id, versions[listing_set_id])
+        colocations = sweep_colocations(
+            events,
+            window_minutes * 60,
+            int(as_utc(start).timestamp()) if start is not None else None,
+            int(as_utc(end).timestamp()) if end is not None else None,
+        )
+        keep = colocations.count >= min_count
+        if phone_number is not None:
+            matches = np.flatnonzero(events.subscriber_names == phone_number)
+            keep &= np.isin(colocations.a, matches) | np.isin(colocations.b, matches)
+        selected = np.flatnonzero(keep)
+        page = selected[:limit]
+        pairs = zip(
+            events.subscriber_names[colocations.a[page]].tolist(),
+            events.subscriber_names[colocations.b[page]].tolist(),
+            colocations.count[page].tolist(),
+            colocations.towers[page].tolist(),
+            _iso_seconds(colocations.first_seen[page]),
+            _iso_seconds(colocations.last_seen[page]),
+        )
+        response = ColocationResponse(
+            listing_set_id=listing_set_id,
+            window_minutes=window_minutes,
+            min_count=min_count,
+            events=colocations.events,
+            total_pairs=len(selected),
+            truncated=colocations.truncated,
+            pairs=[
+                ColocationPair(subscriber_a=a, subscriber_b=b, count=count, towers=towers, first_seen=first, last_seen=last)
+                for a, b, count, towers, first, last in pairs
+            ],
+        )
+        return response.model_dump_json().encode("utf-8")
+
+    key = result_key(
+        "workbench.colocations",
+        {"window_minutes": window_minutes, "min_count": min_count, "phone_number": phone_number,
+         "start": window_start, "end": window_end, "limit": limit},
+        versions
+    )
+    return cached_response(key, compute)
+
+# --- Export Endpoint ---
+def _export_chunks(listing_set_id: str, export_format: str, start: Optional[str], end: Optional[str]) -> Iterator[bytes]:
+    # The request's session is closed once the response starts, so the stream opens its own.
+    with db_manager.get_session() as db_session:
+        yield from stream_export(listings_crud.iter_listing_communications(db_session, listing_set_id, start, end), export_format)
+
+@router.get("/listings/{listing_set_id}/export")
+def export_listing_set(
+    listing_set_id: str,
+    format: Optional[ExportFormat] = Query(None, description="'parquet', 'arrow' (IPC stream) or 'csv'. Defaults to Parquet, or CSV when pyarrow is not installed."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db_session)
+):
+    """
+    Streams a ListingSet's communications as a file with typed columns: caller,
+    recipient, timestamp (UTC), type, duration, imei, location, longitude, latitude.
+    """
+    export_format = format or default_export_format()
+    if export_format != "csv" and not arrow_available():
+        raise HTTPException(status_code=422, detail=f"The {export_format} export requires pyarrow; use format=csv")
+    window_start, window_end = time_window(start, end)
+    if listings_crud.get_listing_set(db, listing_set_id, current_user["sub"]) is None:
+        raise HTTPException(status_code=404, detail="ListingSet not found")
+    return StreamingResponse(
+        _export_chunks(listing_set_id, export_format, window_start, window_end),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{listing_set_id}.{EXPORT_EXTENSIONS[export_format]}"',
+            # Parquet and Arrow are already zstd-compressed; this keeps GZipMiddleware off them.
+            **({"Content-Encoding": "identity"} if export_format != "csv" else {}),
+        },
+    )
+
 # --- Visualization Models and Endpoint (Unchanged) ---
 class LocationPoint(BaseModel):
     lat: float
@@ -86,30 +349,154 @@ class GraphResponse(BaseModel):
 # ... (imports remain the same)
 
 # --- CORRECTED Visualize Endpoint ---
+# Properties a visualization can project with `fields`; by default every property
+# except the deduplication internals is returned.
+VISUALIZE_FIELDS = ("caller_num", "callee_num", "timestamp", "duration_str", "type", "imei", "location")
+INTERNAL_COMMUNICATION_FIELDS = ["fingerprint", "dedup_key"]
+CommunicationType = Literal["CALL", "SMS"]
+VISUALIZE_PAGE_SIZE = 1000
+VISUALIZE_MAX_PAGE_SIZE = 10000
+
+# With `fields`, only the projected properties leave Neo4j. Open window bounds are
+# widened so that the communication_timestamp index serves the range. Communications
+# shared by several of the requested sets are returned once.
+VISUALIZE_QUERY = """
+MATCH (u:User {username: $username})-[:OWNS]->(ls:ListingSet)
+WHERE ls.id IN $listing_set_ids
+MATCH (c:Communication)-[:PART_OF]->(ls)
+WHERE c.timestamp >= datetime($start) AND c.timestamp < datetime($end)
+  AND ($types IS NULL OR c.type IN $types)
+WITH DISTINCT c
+RETURN [key IN coalesce($fields, [property IN keys(c) WHERE NOT property IN $internal_fields]) | [key, c[key]]] AS listing
+"""
+
+# Keyset pagination on (timestamp, elementId): a page starts right after the last
+# communication of the previous one, so deep pages cost no more than the first.
+VISUALIZE_PAGE_QUERY = """
+MATCH (u:User {username: $username})-[:OWNS]->(ls:ListingSet)
+WHERE ls.id IN $listing_set_ids
+MATCH (c:Communication)-[:PART_OF]->(ls)
+WHERE c.timestamp >= datetime($start) AND c.timestamp < datetime($end)
+  AND ($types IS NULL OR c.type IN $types)
+  AND ($cursor_timestamp IS NULL OR c.timestamp > datetime($cursor_timestamp)
+       OR (c.timestamp = datetime($cursor_timestamp) AND elementId(c) > $cursor_id))
+WITH DISTINCT c
+ORDER BY c.timestamp, elementId(c)
+LIMIT $limit
+RETURN elementId(c) AS id, c.timestamp AS timestamp,
+       [key IN coalesce($fields, [property IN keys(c) WHERE NOT property IN $internal_fields]) | [key, c[key]]] AS listing
+"""
+
+def _visualize_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    unknown = sorted(set(fields) - set(VISUALIZE_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(VISUALIZE_FIELDS)}")
+    return list(dict.fromkeys(fields))
+
+def _listing_item(record) -> Dict[str, Any]:
+    listing_props = dict(record["listing"])
+    # Ensure timestamp is a JSON-serializable ISO string
+    if 'timestamp' in listing_props and hasattr(listing_props['timestamp'], 'to_native'):
+        listing_props['timestamp'] = listing_props['timestamp'].to_native().isoformat()
+    return listing_props
+
+def _encode_cursor(timestamp: str, element_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, element_id]).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> List[str]:
+    try:
+        timestamp, element_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        # A malformed timestamp would otherwise fail in Cypher's datetime() with a 500.
+        datetime.fromisoformat(timestamp)
+        return [timestamp, str(element_id)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+def _visualize_chunks(username: str, listing_set_ids: List[str], fields: Optional[List[str]], types: Optional[List[str]], start: str, end: str) -> Iterator[bytes]:
+    """Yields the JSON array of listings, one chunk per VISUALIZE_PAGE_SIZE records read from the driver."""
+    # The request's session is closed once the response starts, so the stream opens its own.
+    with db_manager.get_session() as db_session:
+        result = db_session.run(
+            VISUALIZE_QUERY, username=username, listing_set_ids=listing_set_ids, fields=fields, types=types, start=start, end=end,
+            internal_fields=INTERNAL_COMMUNICATION_FIELDS
+        )
+        items = []
+        separator = "["
+        for record in result:
+            items.append(separator + json.dumps(_listing_item(record), ensure_ascii=False, separators=(",", ":"), default=str))
+            separator = ","
+            if len(items) == VISUALIZE_PAGE_SIZE:
+                yield "".join(items).encode("utf-8")
+                items = []
+    yield ("".join(items) + ("]" if separator == "," else "[]")).encode("utf-8")
+
 @router.post("/visualize", response_model=List[Dict[str, Any]])
 def visualize_data(
     listing_set_ids: List[str],
+    fields: Optional[List[str]] = Query(None, description="Only these Communication properties."),
+    type: Optional[List[CommunicationType]] = Query(None, description="Only communications of these types."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Streams the raw listing data (Communication node properties) of the given
+    ListingSets owned by the current user, optionally within a time window, as
+    one JSON array written while the records are read. Clients that load large
+    sets progressively should use /visualize/page instead.
+    """
+    fields = _visualize_fields(fields)
+    window_start, window_end = time_window(start, end)
+    return StreamingResponse(
+        _visualize_chunks(
+            current_user["sub"], listing_set_ids, fields, type, window_start or EARLIEST_TIMESTAMP, window_end or LATEST_TIMESTAMP
+        ),
+        media_type="application/json"
+    )
+
+@router.post("/visualize/page", response_model=VisualizePage)
+def visualize_data_page(
+    listing_set_ids: List[str],
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page."),
+    limit: int = Query(VISUALIZE_PAGE_SIZE, ge=1, le=VISUALIZE_MAX_PAGE_SIZE, description="Maximum number of communications in the page."),
+    fields: Optional[List[str]] = Query(None, description="Only these Communication properties."),
+    type: Optional[List[CommunicationType]] = Query(None, description="Only communications of these types."),
+    start: Optional[datetime] = Query(None, description=START_DESCRIPTION),
+    end: Optional[datetime] = Query(None, description=END_DESCRIPTION),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db_session)
 ):
     """
-    Fetches the raw listing data (Communication node properties) for a given
-    set of ListingSet IDs owned by the current user.
-    """
-    query = """
-    MATCH (u:User {username: $username})-[:OWNS]->(ls:ListingSet)
-    WHERE ls.id IN $listing_set_ids
-    MATCH (c:Communication)-[:PART_OF]->(ls)
-    RETURN properties(c) AS listing
-    """
-    result = db.run(query, username=current_user["sub"], listing_set_ids=listing_set_ids)
-    
-    listings = []
-    for record in result:
-        listing_props = dict(record["listing"])
-        # Ensure timestamp is a JSON-serializable ISO string
-        if 'timestamp' in listing_props and hasattr(listing_props['timestamp'], 'to_native'):
-            listing_props['timestamp'] = listing_props['timestamp'].to_native().isoformat()
-        listings.append(listing_props)
-        
-    return listings
\ No newline at end of file
+    Returns one page of the listing data of the user's ListingSets, in time order.
+    next_cursor fetches the following page and is null on the last one.
+    """
+    fields = _visualize_fields(fields)
+    window_start, window_end = time_window(start, end)
+    cursor_timestamp, cursor_id = _decode_cursor(cursor) if cursor else (None, None)
+
+    def compute() -> bytes:
+        result = db.run(
+            VISUALIZE_PAGE_QUERY, username=current_user["sub"], listing_set_ids=listing_set_ids, fields=fields, types=type,
+            start=window_start or EARLIEST_TIMESTAMP, end=window_end or LATEST_TIMESTAMP,
+            cursor_timestamp=cursor_timestamp, cursor_id=cursor_id, limit=limit, internal_fields=INTERNAL_COMMUNICATION_FIELDS
+        )
+        listings = []
+        last = None
+        for record in result:
+            listings.append(_listing_item(record))
+            last = record
+        # The cursor keeps the full (nanosecond) timestamp so no communication is skipped.
+        next_cursor = _encode_cursor(last["timestamp"].iso_format(), last["id"]) if len(listings) == limit else None
+        page = {"listings": listings, "next_cursor": next_cursor, "limit": limit}
+        return json.dumps(page, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+    versions = listings_crud.get_listing_set_versions(db, current_user["sub"], listing_set_ids)
+    key = result_key(
+        "workbench.visualize.page",
+        {"username": current_user["sub"], "listing_set_ids": sorted(set(listing_set_ids)), "start": window_start, "end": window_end,
+         "fields": fields, "types": sorted(set(type)) if type else None, "cursor": cursor, "limit": limit},
+        versions
+    )
+    return cached_response(key, compute)
@@ -0,0 +1,187 @@
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from scripts import ingest_data
+
+# ---
+# Backends the ingestion benchmark can write to. Both yield an object with the
+# subset of neo4j.Session used by ingest_listings_data, plus a ListingSet id.
+# ---
+
+
+class _Result:
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def consume(self):
+        return None
+
+
+class InMemorySession:
+    """
+    Stand-in for a Neo4j session that understands the ingestion queries. It keeps
+    just enough state (nodes, communications, contacts, device usage, activity,
+    tiles, checkpoints) for the ingestion path to behave as against a real database,
+    which isolates the cost of the Python side from the network and the database.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.devices = set()
+        self.towers = {}
+        self.communications = {}
+        self.contacts = {}
+        self.device_usage = {}
+        self.activity = {}
+        self.tiles = {}
+        self.listing_sets = {}
+        self.queries = 0
+
+    def execute_write(self, transaction_function, *args, **kwargs):
+        return transaction_function(self, *args, **kwargs)
+
+    def run(self, query: str, **params) -> _Result:
+        self.queries += 1
+        if query is ingest_data.BATCH_INGEST_QUERY:
+            self._create_communications(params)
+        elif query is ingest_data.CONTACTED_UPSERT_QUERY:
+            self._upsert_contacts(params)
+        elif query is ingest_data.DEVICE_USAGE_UPSERT_QUERY:
+            self._upsert_device_usage(params)
+        elif query is ingest_data.EXISTING_EVENTS_QUERY:
+            return _Result(
+                {"dedup_key": key, "existing_key": key, "linked": params["listing_set_id"] in self.communications[key]["listing_sets"]}
+                for key in params["dedup_keys"] if key in self.communications
+            )
+        elif query is ingest_data.EXISTING_OWNER_EVENTS_QUERY:
+            return _Result(self._find_owner_events(params))
+        elif query is ingest_data.LINK_EXISTING_EVENTS_QUERY:
+            for key in params["dedup_keys"]:
+                self.communications[key]["listing_sets"].add(params["listing_set_id"])
+        elif query is ingest_data.ACTIVITY_UPSERT_QUERY:
+            self._upsert_activity(params)
+        elif query is ingest_data.TILE_UPSERT_QUERY:
+            self._upsert_tiles(params)
+        elif query is ingest_data.CHECKPOINT_QUERY:
+            listing_set = self.listing_sets.setdefault(params["listing_set_id"], {})
+            listing_set["ingest_chunks_committed"] = params["chunks_committed"]
+            for counter in ("rows_seen", "rows_written", "rows_rejected", "rows_duplicate"):
+                listing_set[counter] = listing_set.get(counter, 0) + params[counter]
+        elif "ingest_chunks_committed AS chunks" in query:
+            chunks = self.listing_sets.get(params["listing_set_id"], {}).get("ingest_chunks_committed")
+            return _Result([{"chunks": chunks}])
+        else:
+            raise NotImplementedError(f"InMemorySession does not understand: {query.strip()[:80]}")
+        return _Result()
+
+    def _create_communications(self, params: dict):
+        for i, dedup_key in enumerate(params["dedup_key"]):
+            self.subscribers.add(params["caller"][i])
+            self.subscribers.add(params["recipient"][i])
+            self.devices.add(params["imei"][i])
+            self.towers.setdefault(params["location"][i], (params["lon"][i], params["lat"][i]))
+            self.communications[dedup_key] = {
+                "caller_num": params["caller"][i],
+                "callee_num": params["recipient"][i],
+                "timestamp": params["timestamp"][i],
+                "type": "SMS" if params["is_sms"][i] else "CALL",
+                "fingerprint": params["fingerprint"][i],
+                "listing_sets": {params["listing_set_id"]},
+            }
+
+    def _find_owner_events(self, params: dict) -> list:
+        owned = {
+            listing_set_id for listing_set_id, listing_set in self.listing_sets.items()
+            if listing_set.get("owner_username") == params["owner_username"]
+        }
+        by_fingerprint = {}
+        for key, communication in self.communications.items():
+            if communication["listing_sets"] & owned:
+                linked = params["listing_set_id"] in communication["listing_sets"]
+                found = by_fingerprint.get(communication["fingerprint"])
+                if found is None or (linked and not found[1]):
+                    by_fingerprint[communication["fingerprint"]] = (key, linked)
+        return [
+            {"dedup_key": dedup_key, "existing_key": by_fingerprint[fingerprint][0], "linked": by_fingerprint[fingerprint][1]}
+            for fingerprint, dedup_key in zip(params["fingerprints"], params["dedup_keys"]) if fingerprint in by_fingerprint
+        ]
+
+    def _upsert_contacts(self, params: dict):
+        for i, pair in enumerate(zip(params["caller"], params["recipient"])):
+            contact = self.contacts.setdefault(pair, {"calls": 0, "sms": 0, "first_seen": None, "last_seen": None, "listing_sets": set()})
+            contact["calls"] += params["calls"][i]
+            contact["sms"] += params["sms"][i]
+            contact["first_seen"] = min(filter(None, (contact["first_seen"], params["first_seen"][i])))
+            contact["last_seen"] = max(filter(None, (contact["last_seen"], params["last_seen"][i])))
+            contact["listing_sets"].add(params["listing_set_id"])
+
+    def _upsert_device_usage(self, params: dict):
+        for i, pair in enumerate(zip(params["caller"], params["imei"])):
+            usage = self.device_usage.setdefault(pair, {"communications": 0, "first_seen": None, "last_seen": None})
+            usage["communications"] += params["communications"][i]
+            usage["first_seen"] = min(filter(None, (usage["first_seen"], params["first_seen"][i])))
+            usage["last_seen"] = max(filter(None, (usage["last_seen"], params["last_seen"][i])))
+
+    def _upsert_activity(self, params: dict):
+        for i, key in enumerate(zip(params["scope"], params["hour"])):
+            bucket = self.activity.setdefault((params["listing_set_id"],) + key, {"calls": 0, "sms": 0})
+            bucket["calls"] += params["calls"][i]
+            bucket["sms"] += params["sms"][i]
+
+    def _upsert_tiles(self, params: dict):
+        for i, key in enumerate(zip(params["zoom"], params["x"], params["y"])):
+            tile = self.tiles.setdefault((params["listing_set_id"],) + key, {"calls": 0, "sms": 0})
+            tile["calls"] += params["calls"][i]
+            tile["sms"] += params["sms"][i]
+
+
+@contextmanager
+def memory_backend(owner_username: str = "benchmark") -> Iterator[tuple]:
+    session = InMemorySession()
+    listing_set_id = str(uuid.uuid4())
+    session.listing_sets[listing_set_id] = {"owner_username": owner_username}
+    yield session, listing_set_id
+
+
+@contextmanager
+def neo4j_backend() -> Iterator[tuple]:
+    """
+    Writes to the Neo4j instance configured in .env, under a throwaway ListingSet
+    that is deleted (with its communications) afterwards.
+    """
+    from app.crud import listings_crud
+    from app.db.graph_db import db_manager
+
+    listing_set_id = str(uuid.uuid4())
+    with db_manager.get_session() as session:
+        session.run(
+            "CREATE (:ListingSet {id: $id, name: 'benchmark', createdAt: datetime()})", id=listing_set_id
+        ).consume()
+        try:
+            yield session, listing_set_id
+        finally:
+            pairs = [record["pair"] for record in session.run(listings_crud.CONTACT_PAIRS_QUERY, id=listing_set_id)]
+            session.run(
+                """
+                MATCH (:ListingSet {id: $id})<-[:PART_OF]-(c:Communication)
+                CALL { WITH c DETACH DELETE c } IN TRANSACTIONS OF 10000 ROWS
+                """,
+                id=listing_set_id
+            ).consume()
+            session.run("MATCH (ls:ListingSet {id: $id}) DETACH DELETE ls", id=listing_set_id).consume()
+            session.run("MATCH (b:ActivityBucket {listing_set_id: $id}) DELETE b", id=listing_set_id).consume()
+            if pairs:
+                session.run(listings_crud.REBUILD_CONTACTS_QUERY, pairs=pairs).consume()
+
+
+BACKENDS = {
+    "memory": memory_backend,
+    "neo4j": neo4j_backend,
+}
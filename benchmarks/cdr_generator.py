@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import numpy as np
+
+# ---
+# Synthetic call detail records in the shape the frontend's Excel parser sends:
+# French column names, Day/Month/Year timestamps, numbers with or without the
+# 237 country prefix and cell locations carrying "Long:"/"Lat:" coordinates.
+# The output is fully determined by the seed, so benchmark runs are comparable.
+# ---
+
+CALLER_KEY = 'Numéro Appelant'
+RECIPIENT_KEY = 'Numéro appelé'
+MALFORMED_RECIPIENT_KEY = 'Numéro appeléA1:F1'
+DURATION_KEY = 'Durée appel'
+IMEI_KEY = 'IMEI numéro appelant'
+LOCATION_KEY = 'Localisation numéro appelant'
+TIMESTAMP_KEY = 'Date Début appel'
+
+SMS_SERVICES = ("ORANGE", "MTN INFO", "MoMo")
+# Ways a row is broken in real operator exports.
+MALFORMATIONS = ("missing_caller", "bad_timestamp", "missing_imei", "short_number")
+
+
+def generate_cdr_rows(
+    rows: int,
+    subscribers: int = 1000,
+    degree_exponent: float = 1.2,
+    malformed_rate: float = 0.01,
+    sms_rate: float = 0.3,
+    towers: int = 200,
+    malformed_header: bool = False,
+    seed: int = 42,
+) -> Iterator[dict]:
+    """
+    Yields `rows` raw listing rows exchanged between `subscribers` phone numbers.
+    Callers and recipients are drawn from a power law (weight rank ** -degree_exponent),
+    so a few subscribers account for most of the traffic. `malformed_rate` of the
+    rows are broken in one of the MALFORMATIONS ways. With `malformed_header`, the
+    recipient column uses the "Numéro appeléA1:F1" key some exports produce.
+    """
+    rng = np.random.default_rng(seed)
+    numbers = 600000000 + rng.choice(99999999, size=subscribers, replace=False)
+    weights = np.arange(1, subscribers + 1, dtype=np.float64) ** -degree_exponent
+    weights /= weights.sum()
+    imeis = 350000000000000 + rng.choice(99999999999, size=subscribers, replace=False)
+    tower_lon = rng.uniform(9.0, 16.0, size=towers).round(5)
+    tower_lat = rng.uniform(2.0, 13.0, size=towers).round(5)
+    start = datetime(2024, 1, 1)
+    recipient_key = MALFORMED_RECIPIENT_KEY if malformed_header else RECIPIENT_KEY
+
+    block = 10000
+    for offset in range(0, rows, block):
+        size = min(block, rows - offset)
+        callers = rng.choice(subscribers, size=size, p=weights)
+        recipients = rng.choice(subscribers, size=size, p=weights)
+        seconds = np.sort(rng.integers(0, 90 * 24 * 3600, size=size))
+        is_sms = rng.random(size) < sms_rate
+        to_service = rng.random(size) < 0.05
+        durations = rng.integers(1, 1800, size=size)
+        tower_ids = rng.integers(0, towers, size=size)
+        with_prefix = rng.random(size) < 0.5
+        malformed = rng.random(size) < malformed_rate
+        malformation = rng.integers(0, len(MALFORMATIONS), size=size)
+
+        for i in range(size):
+            caller = str(numbers[callers[i]])
+            row = {
+                CALLER_KEY: f"237{caller}" if with_prefix[i] else caller,
+                recipient_key: str(numbers[recipients[i]]),
+                DURATION_KEY: "SMS" if is_sms[i] else str(durations[i]),
+                IMEI_KEY: str(imeis[callers[i]]),
+                LOCATION_KEY: f"Site {tower_ids[i]} Long: {tower_lon[tower_ids[i]]} Lat: {tower_lat[tower_ids[i]]} Azimut: 120",
+                TIMESTAMP_KEY: (start + timedelta(seconds=int(seconds[i]))).strftime('%d/%m/%Y %H:%M:%S'),
+            }
+            if is_sms[i] and to_service[i]:
+                row[recipient_key] = SMS_SERVICES[i % len(SMS_SERVICES)]
+
+            if malformed[i]:
+                kind = MALFORMATIONS[malformation[i]]
+                if kind == "missing_caller":
+                    del row[CALLER_KEY]
+                elif kind == "bad_timestamp":
+                    row[TIMESTAMP_KEY] = row[TIMESTAMP_KEY].replace('/', '-')
+                elif kind == "missing_imei":
+                    del row[IMEI_KEY]
+                else:
+                    row[CALLER_KEY] = caller[:5]
+            yield row
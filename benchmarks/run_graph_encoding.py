@@ -0,0 +1,137 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from neo4j import time as neo4j_time
+
+from app.core.graph_encoder import GraphEncoder
+from app.models.graph import Edge, Graph, Node
+
+# ---
+# Graph response serialization benchmark: the per-element pydantic path the
+# graph endpoints used (Node/Edge models, then response_model validation and
+# jsonable_encoder) against GraphEncoder, on synthetic Subscriber/Communication
+# paths shaped like the ones /graph/search returns.
+#
+#   python -m benchmarks.run_graph_encoding --elements 100000
+# ---
+
+
+class FakeNode(dict):
+    """Duck-types neo4j.graph.Node: a property mapping with element_id and labels."""
+
+    def __init__(self, element_id, label, properties):
+        super().__init__(properties)
+        self.element_id = element_id
+        self.labels = frozenset([label])
+
+
+class FakeRelationship(dict):
+    def __init__(self, element_id, start_node, end_node, rel_type):
+        super().__init__()
+        self.element_id = element_id
+        self.start_node = start_node
+        self.end_node = end_node
+        self.type = rel_type
+
+
+class FakePath:
+    def __init__(self, nodes, relationships):
+        self.nodes = nodes
+        self.relationships = relationships
+
+
+def make_records(elements: int) -> list:
+    """One subscriber's neighbourhood: ~`elements` nodes and edges, as 1-hop path records."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    center = FakeNode("4:bench:0", "Subscriber", {"phoneNumber": "699000000"})
+    records = [{"p": FakePath([center], [])}]
+    for i in range(1, elements // 2 + 1):
+        event = FakeNode(f"4:bench:{i}", "Communication", {
+            "caller_num": "699000000",
+            "callee_num": f"6{i:08d}",
+            "timestamp": neo4j_time.DateTime.from_native(start + timedelta(minutes=i)),
+            "duration_str": str(i % 600),
+            "type": "CALL" if i % 3 else "SMS",
+            "location": "Site 12 Long: 9.70 Lat: 4.05",
+        })
+        records.append({"p": FakePath([center, event], [FakeRelationship(f"5:bench:{i}", center, event, "INITIATED")])})
+    return records
+
+
+def legacy_format_graph_response(records: list) -> Graph:
+    """The previous format_graph_response: pydantic models per element, edges not deduplicated."""
+    def convert_properties(props):
+        converted = {}
+        for key, value in props.items():
+            if isinstance(value, neo4j_time.DateTime):
+                converted[key] = value.to_native().isoformat()
+            else:
+                converted[key] = value
+        return converted
+
+    nodes, edges, node_ids = [], [], set()
+    for record in records:
+        path = record.get("p")
+        for node in path.nodes:
+            if node.element_id not in node_ids:
+                nodes.append(Node(id=node.element_id, label=list(node.labels)[0], properties=convert_properties(dict(node))))
+                node_ids.add(node.element_id)
+        for edge in path.relationships:
+            edges.append(Edge(
+                id=edge.element_id, source=edge.start_node.element_id, target=edge.end_node.element_id,
+                label=edge.type, properties=convert_properties(dict(edge))
+            ))
+    return Graph(nodes=nodes, edges=edges)
+
+
+def legacy_response_bytes(records: list) -> bytes:
+    graph = legacy_format_graph_response(records)
+    # What response_model=Graph does on the way out: validate again, then encode.
+    validated = Graph.model_validate(graph.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def encoder_response_bytes(records: list) -> bytes:
+    encoder = GraphEncoder()
+    encoder.add_records(records)
+    return encoder.to_response().body
+
+
+def timed(function, records, repeat: int):
+    best, body = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = function(records)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark graph response serialization.")
+    parser.add_argument("--elements", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    records = make_records(args.elements)
+    legacy_seconds, legacy_body = timed(legacy_response_bytes, records, args.repeat)
+    encoder_seconds, encoder_body = timed(encoder_response_bytes, records, args.repeat)
+    report = {
+        "elements": args.elements,
+        "response_bytes": len(encoder_body),
+        "byte_identical": legacy_body == encoder_body,
+        "pydantic_seconds": round(legacy_seconds, 4),
+        "encoder_seconds": round(encoder_seconds, 4),
+        "speedup": round(legacy_seconds / encoder_seconds, 2),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
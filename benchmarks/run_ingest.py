@@ -0,0 +1,123 @@
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Callable
+
+from app.core.normalization import normalize_listing_batch
+from app.core.parsing_helpers import compile_row_extractor, find_field_value
+from benchmarks.backends import BACKENDS
+from benchmarks.cdr_generator import generate_cdr_rows
+from scripts.ingest_data import LISTING_FIELDS, ingest_listings_data, iter_chunks
+
+# ---
+# Ingestion benchmark. Times each stage of the import path on the same synthetic
+# data set and prints one JSON document (rows/sec and peak traced memory per
+# stage) that can be stored and compared between commits:
+#
+#   python -m benchmarks.run_ingest --rows 100000 --output bench.json
+# ---
+
+
+def measure(name: str, rows: int, stage: Callable[[], object], trace_memory: bool = True) -> dict:
+    """
+    Times one stage, then runs it again under tracemalloc for its peak memory;
+    tracing slows allocations down too much to time both in the same run.
+    """
+    # The ingestion path logs every chunk; keep the JSON output clean.
+    with redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - started
+
+        peak = None
+        if trace_memory:
+            tracemalloc.start()
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {
+        "stage": name,
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_find_field_value(rows: list):
+    for row in rows:
+        for fields in LISTING_FIELDS.values():
+            find_field_value(row, fields)
+
+
+def bench_row_extractor(rows: list):
+    extractor = compile_row_extractor(rows[0].keys(), LISTING_FIELDS)
+    for row in rows:
+        extractor.extract(row)
+
+
+def bench_normalization(rows: list, batch_size: int):
+    extractor = compile_row_extractor(rows[0].keys(), LISTING_FIELDS)
+    for chunk in iter_chunks(rows, batch_size):
+        normalize_listing_batch(chunk, extractor)
+
+
+def bench_ingest(rows: list, args: argparse.Namespace):
+    with BACKENDS[args.backend]() as (session, listing_set_id):
+        ingest_listings_data(session, iter(rows), listing_set_id, batch_size=args.batch_size)
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    rows = list(generate_cdr_rows(
+        args.rows,
+        subscribers=args.subscribers,
+        degree_exponent=args.degree_exponent,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    ))
+    trace = not args.no_memory
+    stages = [
+        measure("find_field_value", len(rows), lambda: bench_find_field_value(rows), trace),
+        measure("row_extractor", len(rows), lambda: bench_row_extractor(rows), trace),
+        measure("normalization", len(rows), lambda: bench_normalization(rows, args.batch_size), trace),
+        measure(f"ingest_listings_data[{args.backend}]", len(rows), lambda: bench_ingest(rows, args), trace),
+    ]
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": vars(args),
+        "stages": stages,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the listing ingestion path on synthetic CDRs.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--degree-exponent", type=float, default=1.2, help="Power-law exponent of subscriber activity.")
+    parser.add_argument("--malformed-rate", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass of every stage.")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,588 @@
-from neo4j import Session
+import hashlib
+import itertools
+import time
+import numpy as np
+from neo4j import Session, ManagedTransaction
+from neo4j.exceptions import ClientError
 from datetime import datetime
-from app.core.parsing_helpers import find_field_value
-
-def ingest_listings_data(db: Session, listings: list, listing_set_id: str):
-    print(f"🚀 Starting ingestion for ListingSet ID: {listing_set_id}...")
-    
-    processed_count = 0
-    # These are the keys from the original Excel file we will look for.
-    # These MUST match what your FileUploader is sending.
-    caller_fields = ['Numéro Appelant']
-    recipient_fields = ['Numéro appelé', 'Numéro appeléA1:F1'] # Handles the malformed key
-    duration_fields = ['Durée appel']
-    imei_fields = ['IMEI numéro appelant']
-    location_fields = ['Localisation', 'Localisation numéro appelant']
-    timestamp_fields = ['Date Début appel']
-
-    for i, listing_row in enumerate(listings):
-        if not listing_row:
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from app.core.config import INGEST_BATCH_SIZE, INGEST_NORMALIZE_WORKERS
+from app.core.normalization import ListingBatch, normalize_listing_batch, normalize_in_pool
+from app.core.parsing_helpers import RowExtractor, compile_row_extractor
+from app.core.geo import tower_index
+from app.core.phone_index import phone_index
+from app.core.result_cache import result_cache
+
+# These are the keys from the original Excel file we will look for.
+# These MUST match what your FileUploader is sending.
+CALLER_FIELDS = ['Numéro Appelant']
+RECIPIENT_FIELDS = ['Numéro appelé', 'Numéro appeléA1:F1'] # Handles the malformed key
+DURATION_FIELDS = ['Durée appel']
+IMEI_FIELDS = ['IMEI numéro appelant']
+LOCATION_FIELDS = ['Localisation', 'Localisation numéro appelant']
+TIMESTAMP_FIELDS = ['Date Début appel']
+
+LISTING_FIELDS = {
+    "caller": CALLER_FIELDS,
+    "recipient": RECIPIENT_FIELDS,
+    "duration": DURATION_FIELDS,
+    "imei": IMEI_FIELDS,
+    "location": LOCATION_FIELDS,
+    "timestamp": TIMESTAMP_FIELDS,
+}
+
+# One round trip per chunk: the ListingSet is matched once, then every
+# normalized row of the chunk is written by the same UNWIND. Rows are sent
+# as parallel columns, so property names are not repeated for every row.
+BATCH_INGEST_QUERY = """
+MATCH (ls:ListingSet {id: $listing_set_id})
+UNWIND range(0, size($caller) - 1) AS i
+WITH ls, $caller[i] AS caller_num, $recipient[i] AS callee_num, $imei[i] AS imei,
+     $location[i] AS location, $timestamp[i] AS timestamp, $duration_str[i] AS duration_str,
+     $is_sms[i] AS is_sms, $lon[i] AS lon, $lat[i] AS lat,
+     $fingerprint[i] AS fingerprint, $dedup_key[i] AS dedup_key
+MERGE (caller:Subscriber {phoneNumber: caller_num})
+MERGE (callee:Subscriber {phoneNumber: callee_num})
+MERGE (device:Device {imei: imei})
+MERGE (tower:CellTower {name: location})
+ON CREATE SET tower.longitude = lon, tower.latitude = lat
+CREATE (event:Communication {
+    caller_num: caller_num,
+    callee_num: callee_num,
+    timestamp: datetime(timestamp),
+    duration_str: duration_str,
+    type: CASE WHEN is_sms THEN 'SMS' ELSE 'CALL' END,
+    imei: imei,
+    location: location,
+    fingerprint: fingerprint,
+    dedup_key: dedup_key
+})
+CREATE (caller)-[:INITIATED]->(event)
+CREATE (event)-[:IS_DIRECTED_TO]->(callee)
+CREATE (event)-[:USED_DEVICE]->(device)
+CREATE (event)-[:ROUTED_THROUGH]->(tower)
+CREATE (event)-[:PART_OF]->(ls)
+"""
+
+# Subscriber-to-Subscriber contacts, pre-aggregated so the graph endpoints can
+# walk one edge per pair instead of two hops per communication. Rows arrive
+# already grouped per (caller, recipient) pair for the chunk (see
+# ListingBatch.contact_columns), so every pair is merged once per chunk.
+CONTACTED_UPSERT_QUERY = """
+UNWIND range(0, size($caller) - 1) AS i
+WITH $caller[i] AS caller_num, $recipient[i] AS callee_num, $calls[i] AS calls, $sms[i] AS sms,
+     datetime($first_seen[i]) AS first_seen, datetime($last_seen[i]) AS last_seen
+MATCH (caller:Subscriber {phoneNumber: caller_num})
+MATCH (callee:Subscriber {phoneNumber: callee_num})
+MERGE (caller)-[r:CONTACTED]->(callee)
+ON CREATE SET r.calls = 0, r.sms = 0, r.listing_sets = []
+SET r.calls = r.calls + calls,
+    r.sms = r.sms + sms,
+    r.first_seen = CASE WHEN r.first_seen IS NULL OR first_seen < r.first_seen THEN first_seen ELSE r.first_seen END,
+    r.last_seen = CASE WHEN r.last_seen IS NULL OR last_seen > r.last_seen THEN last_seen ELSE r.last_seen END,
+    r.listing_sets = CASE WHEN $listing_set_id IN r.listing_sets THEN r.listing_sets ELSE r.listing_sets + $listing_set_id END
+"""
+
+# Subscriber-to-Device usage, pre-aggregated like CONTACTED so that "which handsets
+# did this number use, and when" is answered from one edge per (subscriber, IMEI)
+# instead of walking every communication. The caller is the one using the device.
+DEVICE_USAGE_UPSERT_QUERY = """
+UNWIND range(0, size($caller) - 1) AS i
+WITH $caller[i] AS caller_num, $imei[i] AS imei, $communications[i] AS communications,
+     datetime($first_seen[i]) AS first_seen, datetime($last_seen[i]) AS last_seen
+MATCH (subscriber:Subscriber {phoneNumber: caller_num})
+MATCH (device:Device {imei: imei})
+MERGE (subscriber)-[u:USED]->(device)
+ON CREATE SET u.communications = 0
+SET u.communications = u.communications + communications,
+    u.first_seen = CASE WHEN u.first_seen IS NULL OR first_seen < u.first_seen THEN first_seen ELSE u.first_seen END,
+    u.last_seen = CASE WHEN u.last_seen IS NULL OR last_seen > u.last_seen THEN last_seen ELSE u.last_seen END
+"""
+
+# Rows whose dedup key already exists in the database are not created again;
+# the existing Communication is linked to the ListingSet being imported instead.
+# The lookup is backed by the communication_dedup_key constraint (app.db.schema).
+EXISTING_EVENTS_QUERY = """
+UNWIND $dedup_keys AS dedup_key
+MATCH (event:Communication {dedup_key: dedup_key})
+RETURN dedup_key, dedup_key AS existing_key,
+       EXISTS { MATCH (event)-[:PART_OF]->(:ListingSet {id: $listing_set_id}) } AS linked
+"""
+
+# Owner-wide deduplication cannot rely on dedup keys alone: communications imported
+# with the default scope carry set-scoped keys. Rows are matched instead by
+# fingerprint against the communications of all the owner's ListingSets (backed
+# by the communication_fingerprint index), whatever scope they were imported with.
+EXISTING_OWNER_EVENTS_QUERY = """
+UNWIND range(0, size($fingerprints) - 1) AS i
+WITH $fingerprints[i] AS fingerprint, $dedup_keys[i] AS dedup_key
+CALL {
+    WITH fingerprint
+    MATCH (event:Communication {fingerprint: fingerprint})
+    WHERE EXISTS { MATCH (event)-[:PART_OF]->(:ListingSet)<-[:OWNS]-(:User {username: $owner_username}) }
+    RETURN event
+    ORDER BY EXISTS { MATCH (event)-[:PART_OF]->(:ListingSet {id: $listing_set_id}) } DESC
+    LIMIT 1
+}
+RETURN dedup_key, event.dedup_key AS existing_key,
+       EXISTS { MATCH (event)-[:PART_OF]->(:ListingSet {id: $listing_set_id}) } AS linked
+"""
+
+LINK_EXISTING_EVENTS_QUERY = """
+MATCH (ls:ListingSet {id: $listing_set_id})
+UNWIND $dedup_keys AS dedup_key
+MATCH (event:Communication {dedup_key: dedup_key})
+MERGE (event)-[:PART_OF]->(ls)
+WITH DISTINCT ls, event
+MATCH (caller:Subscriber)-[:INITIATED]->(event)-[:IS_DIRECTED_TO]->(callee:Subscriber)
+WITH DISTINCT ls, caller, callee
+MATCH (caller)-[r:CONTACTED]->(callee)
+WHERE NOT ls.id IN r.listing_sets
+SET r.listing_sets = r.listing_sets + ls.id
+"""
+
+# Hourly activity counters per ListingSet and per subscriber (see
+# ListingBatch.activity_columns), so time histograms read buckets instead of
+# scanning communications. The key is built from the parsed datetime, like in
+# the backfill migration (app.db.schema), so both always agree.
+ACTIVITY_UPSERT_QUERY = """
+UNWIND range(0, size($scope) - 1) AS i
+WITH $scope[i] AS scope, datetime($hour[i]) AS hour, $calls[i] AS calls, $sms[i] AS sms
+MERGE (b:ActivityBucket {key: $listing_set_id + '|' + scope + '|' + toString(hour)})
+ON CREATE SET b.listing_set_id = $listing_set_id, b.scope = scope, b.hour = hour, b.calls = 0, b.sms = 0
+SET b.calls = b.calls + calls, b.sms = b.sms + sms
+"""
+
+# Map tile counters per ListingSet at every zoom level of app.core.geo.TILE_ZOOM_LEVELS
+# (see ListingBatch.tile_columns), so heatmaps read tiles instead of raw points.
+TILE_UPSERT_QUERY = """
+UNWIND range(0, size($zoom) - 1) AS i
+WITH $zoom[i] AS zoom, $x[i] AS x, $y[i] AS y, $calls[i] AS calls, $sms[i] AS sms
+MERGE (t:ActivityTile {key: $listing_set_id + '|' + toString(zoom) + '|' + toString(x) + '|' + toString(y)})
+ON CREATE SET t.listing_set_id = $listing_set_id, t.zoom = zoom, t.x = x, t.y = y, t.calls = 0, t.sms = 0
+SET t.calls = t.calls + calls, t.sms = t.sms + sms
+"""
+
+# Deduplication scopes: within one ListingSet, or across all sets of the same owner.
+DEDUP_SCOPE_LISTING_SET = "listing_set"
+DEDUP_SCOPE_OWNER = "owner"
+
+
+class RowSkipped(Exception):
+    """Raised for rows that lack the core fields and are skipped rather than rejected."""
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    """Yields successive lists of at most `size` items without materializing the input."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def normalize_listing_row(listing_row: dict, extractor: RowExtractor = None) -> Optional[dict]:
+    """
+    Row-at-a-time reference for normalize_listing_batch: cleans a single raw listing row.
+    Returns None for rows that are silently skipped and raises for rows that are invalid.
+    """
+    if extractor is None:
+        extractor = compile_row_extractor(listing_row.keys(), LISTING_FIELDS)
+
+    # Read the raw values from the row using the compiled column plan
+    fields = extractor.extract(listing_row)
+    caller_raw = fields["caller"]
+    recipient_raw = fields["recipient"]
+    timestamp_raw = fields["timestamp"]
+
+    if not caller_raw or not recipient_raw or not timestamp_raw:
+        raise RowSkipped("missing core data (caller, recipient, or timestamp)")
+
+    # The date format from the Excel parser is Day/Month/Year.
+    timestamp = datetime.strptime(str(timestamp_raw), '%d/%m/%Y %H:%M:%S')
+
+    # Clean and validate the data
+    caller = "".join(filter(str.isdigit, caller_raw))
+    if caller.startswith('237'): caller = caller[3:]
+
+    duration_str = fields["duration"]
+    recipient_is_service = "sms" in str(duration_str).lower() and not any(char.isdigit() for char in recipient_raw)
+
+    recipient = "".join(filter(str.isdigit, recipient_raw)) if not recipient_is_service else recipient_raw.strip()
+    if recipient.startswith('237'): recipient = recipient[3:]
+
+    if not caller or not recipient or len(caller) < 8:
+        return None
+
+    is_sms = "sms" in str(duration_str).lower() or recipient_is_service
+
+    location_str = fields["location"]
+    lon, lat = None, None
+    if location_str and "Long:" in location_str and "Lat:" in location_str:
+        try:
+            lon = float(location_str.split("Long:")[1].split("Lat:")[0].strip())
+            lat = float(location_str.split("Lat:")[1].split("Azimut:")[0].strip())
+        except (ValueError, IndexError):
+            pass
+
+    imei = fields["imei"]
+    # Neo4j refuses to MERGE on a null property. The per-row query failed on
+    # such rows, so they are rejected here instead of poisoning a whole chunk.
+    if imei is None or location_str is None:
+        raise ValueError("cannot merge Device/CellTower without an IMEI and a location")
+
+    return {
+        "caller": caller,
+        "recipient": recipient,
+        "imei": imei,
+        "location": location_str,
+        "lon": lon,
+        "lat": lat,
+        "is_sms": is_sms,
+        "timestamp": timestamp.isoformat(),
+        "duration_str": duration_str
+    }
+
+
+def normalize_chunk_by_rows(chunk: List[dict], extractor: RowExtractor = None) -> ListingBatch:
+    """
+    Row path for a chunk that normalize_listing_batch failed on: every row is
+    normalized on its own, so a row it cannot handle is skipped or rejected
+    instead of failing the chunk.
+    """
+    if extractor is None:
+        first = next((row for row in chunk if row), None)
+        extractor = compile_row_extractor(first.keys(), LISTING_FIELDS) if first else None
+    listings = []
+    skipped: List[Tuple[int, Optional[str]]] = []
+    rejected: List[Tuple[int, str]] = []
+    for position, row in enumerate(chunk):
+        if not row:
+            skipped.append((position, None))
+            continue
+        try:
+            listing = normalize_listing_row(row, extractor)
+        except RowSkipped as e:
+            skipped.append((position, str(e)))
+            continue
+        except Exception as e:
+            rejected.append((position, str(e)))
             continue
+        if listing is None:
+            skipped.append((position, None))
+        else:
+            listings.append(listing)
+
+    def column(name: str, dtype=object) -> np.ndarray:
+        return np.array([listing[name] for listing in listings], dtype=dtype)
+
+    def coordinate(name: str) -> np.ndarray:
+        return np.array([np.nan if listing[name] is None else listing[name] for listing in listings], dtype=np.float64)
+
+    return ListingBatch(
+        caller=column("caller", str),
+        recipient=column("recipient", str),
+        timestamp=column("timestamp", "datetime64[s]"),
+        duration_str=column("duration_str"),
+        is_sms=column("is_sms", bool),
+        imei=column("imei"),
+        location=column("location"),
+        lon=coordinate("lon"),
+        lat=coordinate("lat"),
+        rows_seen=len(chunk),
+        skipped=skipped,
+        rejected=rejected,
+    )
+
 
+def _normalize_chunk_by_rows_after(chunk: List[dict], error: Exception, extractor: RowExtractor = None) -> ListingBatch:
+    print(f"  -> Batch normalization failed ({error}); normalizing the chunk row by row.")
+    return normalize_chunk_by_rows(chunk, extractor)
+
+
+CHECKPOINT_QUERY = """
+MATCH (ls:ListingSet {id: $listing_set_id})
+SET ls.ingest_chunks_committed = $chunks_committed,
+    ls.rows_seen = coalesce(ls.rows_seen, 0) + $rows_seen,
+    ls.rows_written = coalesce(ls.rows_written, 0) + $rows_written,
+    ls.rows_rejected = coalesce(ls.rows_rejected, 0) + $rows_rejected,
+    ls.rows_duplicate = coalesce(ls.rows_duplicate, 0) + $rows_duplicate,
+    ls.rows_per_second = $rows_per_second,
+    ls.version = coalesce(ls.version, 0) + 1
+"""
+
+
+class DuplicateFilter:
+    """
+    In-memory filter over the dedup keys seen during one import. It is an exact
+    hash set of 16-byte digests, so it never drops a row that is not a duplicate.
+    """
+
+    def __init__(self):
+        self._seen = set()
+
+    def first_occurrences(self, dedup_keys: List[str]) -> np.ndarray:
+        """Marks the keys that were not seen before and remembers them."""
+        fresh = np.zeros(len(dedup_keys), dtype=bool)
+        for i, key in enumerate(dedup_keys):
+            digest = bytes.fromhex(key)
+            if digest not in self._seen:
+                self._seen.add(digest)
+                fresh[i] = True
+        return fresh
+
+
+def make_dedup_keys(fingerprints: Iterable[str], dedup_scope: str) -> List[str]:
+    """Scopes row fingerprints to a ListingSet or an owner, e.g. "listing_set:<id>" or "owner:<username>"."""
+    return [
+        hashlib.blake2b(f"{dedup_scope}\x1f{fingerprint}".encode("utf-8"), digest_size=16).hexdigest()
+        for fingerprint in fingerprints
+    ]
+
+
+def dedup_owner(dedup_scope: str) -> Optional[str]:
+    """The owner username of an "owner:<username>" dedup scope, None for other scopes."""
+    scope, _, owner_username = dedup_scope.partition(":")
+    return owner_username if scope == DEDUP_SCOPE_OWNER else None
+
+
+def write_listing_rows(
+    tx: ManagedTransaction,
+    batch: ListingBatch,
+    listing_set_id: str,
+    dedup_keys: List[str],
+    owner_username: str = None
+) -> dict:
+    """
+    Writes normalized rows together with the CONTACTED and USED edges, hourly
+    activity buckets and map tiles they add to. Rows that already exist are linked
+    instead of created. Returns how many rows were written and found duplicate.
+    """
+    # row dedup key -> (dedup key of the existing Communication, whether it is already part of this ListingSet)
+    existing = {}
+    if len(batch):
+        if owner_username:
+            records = tx.run(
+                EXISTING_OWNER_EVENTS_QUERY, fingerprints=batch.fingerprint.tolist(), dedup_keys=dedup_keys,
+                owner_username=owner_username, listing_set_id=listing_set_id
+            )
+        else:
+            records = tx.run(EXISTING_EVENTS_QUERY, dedup_keys=dedup_keys, listing_set_id=listing_set_id)
+        existing = {record["dedup_key"]: (record["existing_key"], record["linked"]) for record in records}
+    unlinked = [existing_key for existing_key, linked in existing.values() if not linked]
+    if unlinked:
+        tx.run(LINK_EXISTING_EVENTS_QUERY, listing_set_id=listing_set_id, dedup_keys=unlinked).consume()
+
+    new_rows = np.array([key not in existing for key in dedup_keys], dtype=bool)
+    new_batch = batch.select(new_rows)
+    if len(new_batch):
+        new_keys = [key for key in dedup_keys if key not in existing]
+        tx.run(BATCH_INGEST_QUERY, listing_set_id=listing_set_id, dedup_key=new_keys, **new_batch.to_columns()).consume()
+        tx.run(CONTACTED_UPSERT_QUERY, listing_set_id=listing_set_id, **new_batch.contact_columns()).consume()
+        tx.run(DEVICE_USAGE_UPSERT_QUERY, **new_batch.device_columns()).consume()
+
+    # New communications and existing ones joining the ListingSet count toward its activity.
+    joined_batch = batch.select(np.array([not existing.get(key, (None, False))[1] for key in dedup_keys], dtype=bool))
+    if len(joined_batch):
+        tx.run(ACTIVITY_UPSERT_QUERY, listing_set_id=listing_set_id, **joined_batch.activity_columns()).consume()
+        tiles = joined_batch.tile_columns()
+        if tiles["zoom"]:
+            tx.run(TILE_UPSERT_QUERY, listing_set_id=listing_set_id, **tiles).consume()
+
+    return {"rows_written": len(new_batch), "rows_duplicate": len(batch) - len(new_batch)}
+
+
+def write_checkpoint(tx: ManagedTransaction, listing_set_id: str, chunk_index: int, progress: dict, written: dict):
+    """Advances the ListingSet's checkpoint and progress counters past a chunk."""
+    tx.run(
+        CHECKPOINT_QUERY,
+        listing_set_id=listing_set_id,
+        chunks_committed=chunk_index + 1,
+        rows_seen=progress["rows_seen"],
+        rows_written=written["rows_written"],
+        rows_rejected=progress["rows_rejected"] + written.get("rows_rejected", 0),
+        rows_duplicate=progress["rows_duplicate"] + written["rows_duplicate"],
+        rows_per_second=progress["rows_per_second"]
+    ).consume()
+
+
+def write_listing_batch(
+    tx: ManagedTransaction,
+    batch: ListingBatch,
+    listing_set_id: str,
+    chunk_index: int,
+    dedup_keys: List[str],
+    progress: dict,
+    owner_username: str = None
+) -> dict:
+    """
+    Writes one normalized chunk inside a single write transaction. The ListingSet's
+    checkpoint and progress counters are advanced in the same transaction, so a
+    resumed import never writes or counts a chunk twice.
+    """
+    written = write_listing_rows(tx, batch, listing_set_id, dedup_keys, owner_username)
+    write_checkpoint(tx, listing_set_id, chunk_index, progress, written)
+    return written
+
+
+def write_listing_rows_one_by_one(
+    db: Session,
+    batch: ListingBatch,
+    listing_set_id: str,
+    chunk_index: int,
+    dedup_keys: List[str],
+    progress: dict,
+    owner_username: str = None
+) -> Tuple[dict, np.ndarray]:
+    """
+    Row path for a chunk whose batch write the database refused: every row is
+    written in its own transaction, so only the rows refused again are rejected.
+    The checkpoint is advanced once every row is done; a resumed import finds the
+    rows already written through their dedup keys. Returns the counters and the
+    mask of the rows committed.
+    """
+    written = {"rows_written": 0, "rows_duplicate": 0, "rows_rejected": 0}
+    committed = np.zeros(len(batch), dtype=bool)
+    for i in range(len(batch)):
         try:
-            # Find the raw values from the row using the helper
-            caller_raw = find_field_value(listing_row, caller_fields)
-            recipient_raw = find_field_value(listing_row, recipient_fields)
-            timestamp_raw = find_field_value(listing_row, timestamp_fields)
-            
-            if not caller_raw or not recipient_raw or not timestamp_raw:
-                print(f"  -> Skipping row {i+1} due to missing core data (caller, recipient, or timestamp).")
-                continue
+            row_written = db.execute_write(write_listing_rows, batch.select(slice(i, i + 1)), listing_set_id, dedup_keys[i:i + 1], owner_username)
+        except ClientError as e:
+            written["rows_rejected"] += 1
+            print(f"  -> FAILED to ingest record {batch.caller[i]} -> {batch.recipient[i]} at {batch.timestamp[i]}. Error: {e}")
+            continue
+        committed[i] = True
+        written["rows_written"] += row_written["rows_written"]
+        written["rows_duplicate"] += row_written["rows_duplicate"]
+    db.execute_write(write_checkpoint, listing_set_id, chunk_index, progress, written)
+    return written, committed
 
-            # --- THIS IS THE DEFINITIVE FIX ---
-            # The date format from your Excel parser is Day/Month/Year.
-            # We will parse it with the correct format code: '%d/%m/%Y %H:%M:%S'.
-            timestamp = datetime.strptime(str(timestamp_raw), '%d/%m/%Y %H:%M:%S')
-            # ------------------------------------
-
-            # Clean and validate the data
-            caller = "".join(filter(str.isdigit, caller_raw))
-            if caller.startswith('237'): caller = caller[3:]
-            
-            duration_str = find_field_value(listing_row, duration_fields)
-            recipient_is_service = "sms" in str(duration_str).lower() and not any(char.isdigit() for char in recipient_raw)
-            
-            recipient = "".join(filter(str.isdigit, recipient_raw)) if not recipient_is_service else recipient_raw.strip()
-            if recipient.startswith('237'): recipient = recipient[3:]
-
-            if not caller or not recipient or len(caller) < 8:
-                continue
 
-            is_sms = "sms" in str(duration_str).lower() or recipient_is_service
-            
-            location_str = find_field_value(listing_row, location_fields)
-            lon, lat = None, None
-            if location_str and "Long:" in location_str and "Lat:" in location_str:
-                try:
-                    lon = float(location_str.split("Long:")[1].split("Lat:")[0].strip())
-                    lat = float(location_str.split("Lat:")[1].split("Azimut:")[0].strip())
-                except (ValueError, IndexError):
-                    pass
-
-            query = """
-            MATCH (ls:ListingSet {id: $listing_set_id})
-            MERGE (caller:Subscriber {phoneNumber: $caller})
-            MERGE (callee:Subscriber {phoneNumber: $recipient})
-            MERGE (device:Device {imei: $imei})
-            MERGE (tower:CellTower {name: $location})
-            ON CREATE SET tower.longitude = $lon, tower.latitude = $lat
-            CREATE (event:Communication {
-                caller_num: $caller,
-                callee_num: $recipient,
-                timestamp: datetime($timestamp),
-                duration_str: $duration_str,
-                type: CASE WHEN $is_sms THEN 'SMS' ELSE 'CALL' END,
-                imei: $imei,
-                location: $location
-            })
-            CREATE (caller)-[:INITIATED]->(event)
-            CREATE (event)-[:IS_DIRECTED_TO]->(callee)
-            CREATE (event)-[:USED_DEVICE]->(device)
-            CREATE (event)-[:ROUTED_THROUGH]->(tower)
-            CREATE (event)-[:PART_OF]->(ls)
-            """
-            
-            db.run(query, {
-                "listing_set_id": listing_set_id,
-                "caller": caller,
-                "recipient": recipient,
-                "imei": find_field_value(listing_row, imei_fields),
-                "location": location_str,
-                "lon": lon,
-                "lat": lat,
-                "is_sms": is_sms,
-                "timestamp": timestamp.isoformat(),
-                "duration_str": duration_str
-            })
-            processed_count += 1
+def get_ingest_checkpoint(db: Session, listing_set_id: str) -> int:
+    """Returns how many chunks of a ListingSet's import are already committed."""
+    record = db.run(
+        "MATCH (ls:ListingSet {id: $listing_set_id}) RETURN ls.ingest_chunks_committed AS chunks",
+        listing_set_id=listing_set_id
+    ).single()
+    return (record["chunks"] or 0) if record else 0
+
+
+def iter_listing_batches(listings: Iterable[dict], batch_size: int, workers: int = 0) -> Iterator[Tuple[List[dict], ListingBatch]]:
+    """
+    Splits the listings into chunks and normalizes each one into a ListingBatch,
+    in this process or across a pool of `workers` processes.
+    """
+    chunks = iter_chunks(listings, batch_size)
+    if workers > 1:
+        yield from normalize_in_pool(chunks, LISTING_FIELDS, workers, fallback=_normalize_chunk_by_rows_after)
+        return
+
+    # All rows of a listing share one header layout, so the columns are resolved once.
+    extractor = None
+    for chunk in chunks:
+        if extractor is None:
+            first = next((row for row in chunk if row), None)
+            if first is None:
+                yield chunk, normalize_listing_batch(chunk, field_map=LISTING_FIELDS)
+                continue
+            extractor = compile_row_extractor(first.keys(), LISTING_FIELDS)
+            print(f"  -> Column plan: {extractor.describe()}")
+        try:
+            batch = normalize_listing_batch(chunk, extractor)
         except Exception as e:
-            print(f"  -> FAILED to ingest record {i+1}. Error: {e}. Data: {listing_row}")
+            batch = _normalize_chunk_by_rows_after(chunk, e, extractor)
+        yield chunk, batch
+
+    if extractor is not None and extractor.recompiles:
+        print(f"  -> Column plan widened {extractor.recompiles} time(s) for ragged rows: {extractor.describe()}")
+
+
+def ingest_listings_data(
+    db: Session,
+    listings: Iterable[dict],
+    listing_set_id: str,
+    batch_size: int = None,
+    start_chunk: int = 0,
+    on_chunk: Callable[[int, dict], None] = None,
+    dedup_scope: str = None
+) -> dict:
+    """
+    Normalizes listing rows and writes them to Neo4j in chunks of `batch_size`.
+    Each chunk is one managed write transaction, so transient failures are retried
+    by the driver. The first `start_chunk` chunks are skipped (resuming an import),
+    and `on_chunk(chunk_index, stats)` is called after every committed chunk.
+    Duplicate communications within `dedup_scope` (the ListingSet by default) are
+    dropped; with an owner scope, rows already in any of the owner's ListingSets are
+    linked to this one instead. Returns the ingestion statistics.
+    """
+    batch_size = batch_size or INGEST_BATCH_SIZE
+    dedup_scope = dedup_scope or f"{DEDUP_SCOPE_LISTING_SET}:{listing_set_id}"
+    owner_username = dedup_owner(dedup_scope)
+    print(f"🚀 Starting ingestion for ListingSet ID: {listing_set_id} (batch size {batch_size})...")
+    if start_chunk:
+        print(f"  -> Resuming after {start_chunk} committed chunk(s).")
+        listings = itertools.islice(listings, start_chunk * batch_size, None)
+
+    stats = {"rows_seen": 0, "rows_written": 0, "rows_rejected": 0, "rows_duplicate": 0}
+    started = time.perf_counter()
+    duplicate_filter = DuplicateFilter()
+
+    batches = iter_listing_batches(listings, batch_size, INGEST_NORMALIZE_WORKERS)
+    for chunk_index, (chunk, batch) in enumerate(batches, start=start_chunk):
+        offset = chunk_index * batch_size
+        stats["rows_seen"] += batch.rows_seen
+        for position, reason in batch.skipped:
+            if reason:
+                print(f"  -> Skipping row {offset + position + 1} due to {reason}.")
+        for position, error in batch.rejected:
+            stats["rows_rejected"] += 1
+            print(f"  -> FAILED to ingest record {offset + position + 1}. Error: {error}. Data: {chunk[position]}")
+
+        # Drop rows already seen earlier in this import before they reach the database.
+        dedup_keys = make_dedup_keys(batch.fingerprint, dedup_scope)
+        fresh = duplicate_filter.first_occurrences(dedup_keys)
+        fresh_keys = [key for key, keep in zip(dedup_keys, fresh) if keep]
+
+        elapsed = time.perf_counter() - started
+        progress = {
+            "rows_seen": batch.rows_seen,
+            "rows_rejected": len(batch.rejected),
+            "rows_duplicate": len(batch) - len(fresh_keys),
+            "rows_per_second": round((stats["rows_written"] + len(fresh_keys)) / elapsed, 1) if elapsed else 0.0,
+        }
+        fresh_batch = batch.select(fresh)
+        try:
+            written = db.execute_write(write_listing_batch, fresh_batch, listing_set_id, chunk_index, fresh_keys, progress, owner_username)
+        except ClientError as e:
+            # The database refused the chunk (e.g. a value it cannot store): write it
+            # row by row so that only the offending rows are lost.
+            print(f"  -> Chunk {chunk_index + 1} was refused ({e}); writing its rows one by one.")
+            written, committed = write_listing_rows_one_by_one(
+                db, fresh_batch, listing_set_id, chunk_index, fresh_keys, progress, owner_username
+            )
+            fresh_batch = fresh_batch.select(committed)
+        # Committed subscribers become searchable by partial number right away.
+        phone_index.add(fresh_batch.caller, fresh_batch.recipient)
+        tower_index.add(fresh_batch.location, fresh_batch.lon, fresh_batch.lat)
+        # The chunk bumped the ListingSet's version; drop the results it made stale.
+        result_cache.invalidate(listing_set_id)
+        stats["rows_written"] += written["rows_written"]
+        stats["rows_rejected"] += written.get("rows_rejected", 0)
+        stats["rows_duplicate"] += progress["rows_duplicate"] + written["rows_duplicate"]
+
+        if len(batch):
+            elapsed = time.perf_counter() - started
+            print(f"  -> Committed {stats['rows_written']} records ({stats['rows_written'] / elapsed:.0f} rows/s).")
+        if on_chunk:
+            on_chunk(chunk_index, stats)
 
-    print(f"✅ Ingestion complete. Processed {processed_count} valid records.")
\ No newline at end of file
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    stats["rows_per_second"] = round(stats["rows_written"] / stats["elapsed_seconds"], 1) if stats["elapsed_seconds"] else 0.0
+    print(
+        f"✅ Ingestion complete. Processed {stats['rows_written']} valid records "
+        f"in {stats['elapsed_seconds']}s ({stats['rows_per_second']} rows/s), "
+        f"dropped {stats['rows_duplicate']} duplicate(s)."
+    )
+    return stats
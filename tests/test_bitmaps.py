@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from app.core.bitmaps import ARRAY_MAX_SIZE, CompressedBitmap
+
+
+def _ids(rng, dense_groups, sparse_count):
+    """Ids mixing dense containers (more than ARRAY_MAX_SIZE ids) and sparse ones."""
+    dense = [group * 65536 + rng.choice(65536, ARRAY_MAX_SIZE + 500, replace=False) for group in dense_groups]
+    sparse = rng.integers(0, 2 ** 32, sparse_count, dtype=np.uint64)
+    return set(np.concatenate(dense + [sparse]).astype(np.uint32).tolist())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_set_operations_match_python_sets(seed):
+    rng = np.random.default_rng(seed)
+    a = _ids(rng, [0, 3], 2000)
+    b = _ids(rng, [3, 7], 2000) | set(list(a)[:3000])
+    left, right = CompressedBitmap.from_ids(sorted(a)), CompressedBitmap.from_ids(sorted(b))
+
+    assert left.to_array().tolist() == sorted(a)
+    assert len(left) == len(a)
+    assert (left & right).to_array().tolist() == sorted(a & b)
+    assert (left | right).to_array().tolist() == sorted(a | b)
+    assert (left - right).to_array().tolist() == sorted(a - b)
+    assert (right - left).to_array().tolist() == sorted(b - a)
+    assert left.intersection_count(right) == len(a & b)
+
+
+def test_containers_switch_between_array_and_bitmap_forms():
+    dense = CompressedBitmap.from_ids(range(ARRAY_MAX_SIZE + 1))
+    sparse = CompressedBitmap.from_ids(range(0, 2 * ARRAY_MAX_SIZE, 2))
+
+    assert dense.containers[0].dtype == np.uint64
+    assert sparse.containers[0].dtype == np.uint16
+    # The difference shrinks back below ARRAY_MAX_SIZE ids.
+    assert (dense - CompressedBitmap.from_ids(range(10, ARRAY_MAX_SIZE + 1))).to_array().tolist() == list(range(10))
+
+
+def test_empty_bitmaps():
+    empty = CompressedBitmap.from_ids([])
+    other = CompressedBitmap.from_ids([1, 65536, 2 ** 32 - 1])
+
+    assert len(empty) == 0 and empty.to_array().tolist() == []
+    assert (empty | other).to_array().tolist() == [1, 65536, 2 ** 32 - 1]
+    assert len(empty & other) == 0
+    assert (other - empty).to_array().tolist() == [1, 65536, 2 ** 32 - 1]
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from app.core import colocation
+from app.core.colocation import TowerEvents, sweep_colocations
+
+
+def _events(seed, count=400):
+    rng = np.random.default_rng(seed)
+    towers = rng.choice([f"Site {i}" for i in range(5)], count).tolist()
+    subscribers = rng.choice([f"6{i:08d}" for i in range(12)], count).tolist()
+    seconds = (1_700_000_000 + rng.integers(0, 20_000, count)).tolist()
+    return towers, subscribers, seconds
+
+
+def _brute_force(towers, subscribers, seconds, window, start=None, end=None):
+    keep = [k for k in range(len(seconds)) if (start is None or seconds[k] >= start) and (end is None or seconds[k] < end)]
+    pairs = defaultdict(lambda: {"count": 0, "towers": set(), "first": None, "last": None})
+    for p, q in combinations(keep, 2):
+        if towers[p] != towers[q] or subscribers[p] == subscribers[q] or abs(seconds[p] - seconds[q]) > window:
+            continue
+        pair = pairs[tuple(sorted((subscribers[p], subscribers[q])))]
+        pair["count"] += 1
+        pair["towers"].add(towers[p])
+        low, high = min(seconds[p], seconds[q]), max(seconds[p], seconds[q])
+        pair["first"] = low if pair["first"] is None else min(pair["first"], low)
+        pair["last"] = high if pair["last"] is None else max(pair["last"], high)
+    return {key: (value["count"], len(value["towers"]), value["first"], value["last"]) for key, value in pairs.items()}
+
+
+def _as_dict(events, result):
+    names = events.subscriber_names
+    return {
+        (str(names[a]), str(names[b])): (count, towers, first, last)
+        for a, b, count, towers, first, last in zip(
+            result.a.tolist(), result.b.tolist(), result.count.tolist(), result.towers.tolist(),
+            result.first_seen.tolist(), result.last_seen.tolist()
+        )
+    }
+
+
+@pytest.mark.parametrize("block_pairs", [1_000_000, 7, 1])
+@pytest.mark.parametrize("seed", range(3))
+def test_sweep_matches_brute_force(monkeypatch, seed, block_pairs):
+    monkeypatch.setattr(colocation, "BLOCK_PAIRS", block_pairs)
+    towers, subscribers, seconds = _events(seed)
+    events = TowerEvents.from_columns(1, towers, subscribers, seconds)
+
+    result = sweep_colocations(events, window_seconds=300)
+
+    assert not result.truncated
+    assert result.events == len(seconds)
+    assert _as_dict(events, result) == _brute_force(towers, subscribers, seconds, 300)
+    # Most co-located pairs first, earliest first among equals.
+    assert list(zip((-result.count).tolist(), result.first_seen.tolist())) == sorted(zip((-result.count).tolist(), result.first_seen.tolist()))
+
+
+def test_sweep_restricts_to_the_time_range():
+    towers, subscribers, seconds = _events(4)
+    events = TowerEvents.from_columns(1, towers, subscribers, seconds)
+    start, end = 1_700_005_000, 1_700_012_000
+
+    result = sweep_colocations(events, window_seconds=600, start=start, end=end)
+
+    assert _as_dict(events, result) == _brute_force(towers, subscribers, seconds, 600, start, end)
+
+
+def test_truncated_sweep_reports_it_and_undercounts_only(monkeypatch):
+    monkeypatch.setattr(colocation, "BLOCK_PAIRS", 5)
+    towers, subscribers, seconds = _events(5)
+    events = TowerEvents.from_columns(1, towers, subscribers, seconds)
+    expected = _brute_force(towers, subscribers, seconds, 300)
+
+    result = sweep_colocations(events, window_seconds=300, max_candidates=50)
+
+    assert result.truncated
+    found = _as_dict(events, result)
+    assert found and sum(count for count, _, _, _ in found.values()) <= 50
+    for pair, (count, shared_towers, first, last) in found.items():
+        assert count <= expected[pair][0] and shared_towers <= expected[pair][1]
+        assert first >= expected[pair][2] and last <= expected[pair][3]
+
+
+def test_sweep_without_pairs():
+    events = TowerEvents.from_columns(1, ["Site 1", "Site 2"], ["600000001", "600000002"], [0, 10])
+
+    result = sweep_colocations(events, window_seconds=60)
+
+    assert len(result.a) == 0 and result.events == 2 and not result.truncated
@@ -0,0 +1,37 @@
+from app.core.file_readers import iter_csv_rows, sniff_csv_encoding
+from scripts.ingest_data import CALLER_FIELDS, RECIPIENT_FIELDS, TIMESTAMP_FIELDS
+
+HEADER = "Numéro Appelant;Numéro appelé;Date Début appel;Localisation\r\n"
+ROW = "699001122;677889900;01/02/2024 10:00:00;Yaoundé Centre\r\n"
+
+
+def _write(tmp_path, text, encoding):
+    path = tmp_path / "listing.csv"
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_cp1252_headers_match_the_listing_fields(tmp_path):
+    path = _write(tmp_path, HEADER + ROW, "cp1252")
+
+    rows = list(iter_csv_rows(path))
+
+    assert rows == [{
+        CALLER_FIELDS[0]: "699001122",
+        RECIPIENT_FIELDS[0]: "677889900",
+        TIMESTAMP_FIELDS[0]: "01/02/2024 10:00:00",
+        "Localisation": "Yaoundé Centre",
+    }]
+
+
+def test_utf8_with_bom_is_read_as_utf8(tmp_path):
+    path = _write(tmp_path, HEADER + ROW, "utf-8-sig")
+
+    assert list(iter_csv_rows(path))[0][CALLER_FIELDS[0]] == "699001122"
+
+
+def test_sample_cut_inside_a_utf8_character_is_still_utf8():
+    sample = "Numéro".encode("utf-8")[:4]
+
+    assert sniff_csv_encoding(sample) == "utf-8-sig"
+    assert sniff_csv_encoding("Numéro".encode("cp1252")) == "cp1252"
@@ -0,0 +1,61 @@
+import numpy as np
+
+from app.core import geo
+from app.core.geo import TowerGridIndex
+
+
+def _brute_force(names, lon, lat, bbox):
+    west, south, east, north = bbox
+    in_longitude = (lon >= west) & (lon <= east) if west <= east else (lon >= west) | (lon <= east)
+    return set(names[in_longitude & (lat >= south) & (lat <= north)].tolist())
+
+
+def test_towers_within_match_brute_force_including_the_antimeridian():
+    rng = np.random.default_rng(5)
+    names = np.array([f"Site {i}" for i in range(2000)], dtype=object)
+    lon, lat = rng.uniform(-180, 180, 2000), rng.uniform(-80, 80, 2000)
+    index = TowerGridIndex()
+    index.add(names[:1000], lon[:1000], lat[:1000])
+    index.add(names[1000:], lon[1000:], lat[1000:])
+
+    for bbox in [(-10.0, -5.0, 20.0, 30.0), (170.0, -40.0, -170.0, 40.0), (-180.0, -80.0, 180.0, 80.0), (3.0, 3.0, 3.5, 3.5)]:
+        found, _, _ = index.within(bbox)
+        assert set(found.tolist()) == _brute_force(names, lon, lat, bbox)
+
+
+def test_clear_keeps_the_lock_and_empties_the_index():
+    index = TowerGridIndex()
+    lock = index._lock
+    index.add(["Site 1"], [11.5], [3.8])
+    index.loaded = True
+
+    index.clear()
+
+    assert index._lock is lock
+    assert len(index) == 0
+    assert not index.loaded
+    index.add(["Site 2"], [11.5], [3.8])
+    assert index.within((11.0, 3.0, 12.0, 4.0))[0].tolist() == ["Site 2"]
+
+
+def test_index_reloads_when_another_process_changed_the_data(monkeypatch):
+    data = {"version": (1, 1), "towers": [{"name": "Site 1", "longitude": 11.5, "latitude": 3.8}]}
+    monkeypatch.setattr(geo.listings_crud, "get_data_version", lambda db: data["version"])
+    monkeypatch.setattr(geo.graph_crud, "get_cell_towers", lambda db: data["towers"])
+    monkeypatch.setattr(geo, "INDEX_REFRESH_SECONDS", 0)
+    index = TowerGridIndex()
+    box = (11.0, 3.0, 12.0, 4.0)
+
+    index.ensure_loaded(None)
+    index.add(["Site 2"], [11.6], [3.9])
+    assert sorted(index.within(box)[0].tolist()) == ["Site 1", "Site 2"]
+
+    # Same version: what this process added is kept without a reload.
+    data["towers"] = []
+    index.ensure_loaded(None)
+    assert sorted(index.within(box)[0].tolist()) == ["Site 1", "Site 2"]
+
+    data["version"] = (2, 5)
+    data["towers"] = [{"name": "Site 3", "longitude": 11.7, "latitude": 3.7}]
+    index.ensure_loaded(None)
+    assert index.within(box)[0].tolist() == ["Site 3"]
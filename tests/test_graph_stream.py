@@ -0,0 +1,70 @@
+import json
+from contextlib import contextmanager
+
+from app.routers import graph
+
+
+class _Node(dict):
+    def __init__(self, element_id, label, **properties):
+        super().__init__(properties)
+        self.element_id = element_id
+        self.labels = {label}
+
+
+class _Edge(dict):
+    def __init__(self, element_id, start_node, end_node, rel_type):
+        super().__init__()
+        self.element_id = element_id
+        self.start_node = start_node
+        self.end_node = end_node
+        self.type = rel_type
+
+
+class _Session:
+    def __init__(self, records):
+        self.records = records
+        self.pulled = 0
+
+    def run(self, query, **params):
+        for record in self.records:
+            self.pulled += 1
+            yield record
+
+
+def _stream(monkeypatch, records, max_edges):
+    session = _Session(records)
+
+    @contextmanager
+    def get_session():
+        yield session
+
+    monkeypatch.setattr(graph.db_manager, "get_session", get_session)
+    chunks = list(graph._stream_graph(graph.FULL_GRAPH_STREAM_QUERY, {}, max_edges))
+    return chunks, [json.loads(line) for chunk in chunks for line in chunk.splitlines()], session
+
+
+def _records(edges):
+    hub = _Node("n0", "Subscriber", phoneNumber="600000000")
+    records = []
+    for i in range(1, edges + 1):
+        event = _Node(f"n{i}", "Communication", type="CALL")
+        records.append({"a": hub, "r": _Edge(f"r{i}", hub, event, "INITIATED"), "b": event})
+    return records
+
+
+def test_stream_flushes_batches_and_sends_every_node_once(monkeypatch):
+    monkeypatch.setattr(graph, "STREAM_FLUSH_RECORDS", 10)
+    chunks, lines, _ = _stream(monkeypatch, _records(25), max_edges=100)
+
+    assert len(chunks) == 3
+    assert [line["id"] for line in lines if line["type"] == "node"] == [f"n{i}" for i in range(26)]
+    assert sum(line["type"] == "edge" for line in lines) == 25
+    assert lines[-1] == {"type": "end", "edges": 25, "truncated": False}
+
+
+def test_stream_stops_pulling_records_at_max_edges(monkeypatch):
+    _, lines, session = _stream(monkeypatch, _records(25), max_edges=5)
+
+    assert sum(line["type"] == "edge" for line in lines) == 5
+    assert lines[-1] == {"type": "end", "edges": 5, "truncated": True}
+    assert session.pulled == 6
@@ -0,0 +1,54 @@
+from benchmarks.backends import InMemorySession
+from benchmarks.cdr_generator import generate_cdr_rows
+from scripts.ingest_data import DEDUP_SCOPE_OWNER, ingest_listings_data
+
+
+def _session(*listing_set_ids, owner_username="analyst"):
+    session = InMemorySession()
+    for listing_set_id in listing_set_ids:
+        session.listing_sets[listing_set_id] = {"owner_username": owner_username}
+    return session
+
+
+def _members(session, listing_set_id):
+    return {key for key, communication in session.communications.items() if listing_set_id in communication["listing_sets"]}
+
+
+def test_dedupe_across_sets_links_rows_imported_with_the_default_scope():
+    rows = list(generate_cdr_rows(90, subscribers=50, malformed_rate=0.0, seed=7))
+    session = _session("first", "second")
+
+    first = ingest_listings_data(session, iter(rows[:60]), "first", batch_size=25)
+    second = ingest_listings_data(session, iter(rows[30:]), "second", batch_size=25, dedup_scope=f"{DEDUP_SCOPE_OWNER}:analyst")
+
+    assert first["rows_written"] == 60
+    assert second["rows_written"] == 30
+    assert second["rows_duplicate"] == 30
+    assert len(session.communications) == 90
+    assert len(_members(session, "second")) == 60
+    assert len(_members(session, "first") & _members(session, "second")) == 30
+
+
+def test_dedupe_across_sets_ignores_other_owners():
+    rows = list(generate_cdr_rows(40, subscribers=50, malformed_rate=0.0, seed=7))
+    session = _session("first")
+    session.listing_sets["second"] = {"owner_username": "someone-else"}
+
+    ingest_listings_data(session, iter(rows), "first", batch_size=25)
+    second = ingest_listings_data(session, iter(rows), "second", batch_size=25, dedup_scope=f"{DEDUP_SCOPE_OWNER}:someone-else")
+
+    assert second["rows_written"] == 40
+    assert len(session.communications) == 80
+
+
+def test_resumed_owner_scoped_import_does_not_duplicate_its_own_rows():
+    rows = list(generate_cdr_rows(50, subscribers=50, malformed_rate=0.0, seed=7))
+    session = _session("first")
+    scope = f"{DEDUP_SCOPE_OWNER}:analyst"
+
+    ingest_listings_data(session, iter(rows), "first", batch_size=25, dedup_scope=scope)
+    again = ingest_listings_data(session, iter(rows), "first", batch_size=25, dedup_scope=scope)
+
+    assert again["rows_written"] == 0
+    assert again["rows_duplicate"] == 50
+    assert len(session.communications) == 50
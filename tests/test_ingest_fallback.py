@@ -0,0 +1,64 @@
+from neo4j.exceptions import ClientError
+
+from benchmarks import cdr_generator
+from benchmarks.backends import InMemorySession
+from scripts import ingest_data
+from scripts.ingest_data import ingest_listings_data, normalize_chunk_by_rows, normalize_listing_batch
+
+POISON_CALLER = "699999999"
+
+
+class _RefusingSession(InMemorySession):
+    """Refuses every write of a communication from POISON_CALLER, like a database constraint would."""
+
+    def run(self, query, **params):
+        if query is ingest_data.BATCH_INGEST_QUERY and POISON_CALLER in params["caller"]:
+            raise ClientError("refused")
+        return super().run(query, **params)
+
+
+def _rows(count, malformed_rate=0.0):
+    return list(cdr_generator.generate_cdr_rows(count, subscribers=50, malformed_rate=malformed_rate, seed=11))
+
+
+def _import(session, rows):
+    session.listing_sets["listing-set"] = {"owner_username": "analyst"}
+    return ingest_listings_data(session, iter(rows), "listing-set", batch_size=20)
+
+
+def test_row_path_matches_the_batch_normalization():
+    rows = _rows(200, malformed_rate=0.2)
+    batch = normalize_listing_batch(rows, field_map=ingest_data.LISTING_FIELDS)
+    by_rows = normalize_chunk_by_rows(rows)
+
+    assert by_rows.fingerprint.tolist() == batch.fingerprint.tolist()
+    assert [position for position, _ in by_rows.skipped] == [position for position, _ in batch.skipped]
+    assert [position for position, _ in by_rows.rejected] == [position for position, _ in batch.rejected]
+
+
+def test_failed_chunk_normalization_falls_back_to_the_row_path(monkeypatch):
+    rows = _rows(100, malformed_rate=0.1)
+    expected = _import(InMemorySession(), rows)
+
+    def broken(chunk, extractor=None, field_map=None):
+        raise IndexError("vectorized normalization bug")
+
+    monkeypatch.setattr(ingest_data, "normalize_listing_batch", broken)
+    stats = _import(InMemorySession(), rows)
+
+    for counter in ("rows_seen", "rows_written", "rows_rejected", "rows_duplicate"):
+        assert stats[counter] == expected[counter]
+
+
+def test_refused_chunk_is_written_row_by_row():
+    rows = _rows(100)
+    poison = dict(rows[30], **{cdr_generator.CALLER_KEY: POISON_CALLER})
+    session = _RefusingSession()
+
+    stats = _import(session, rows[:30] + [poison] + rows[30:])
+
+    assert stats["rows_written"] == 100
+    assert stats["rows_rejected"] == 1
+    assert len(session.communications) == 100
+    assert session.listing_sets["listing-set"]["ingest_chunks_committed"] == 6
+    assert session.listing_sets["listing-set"]["rows_rejected"] == 1
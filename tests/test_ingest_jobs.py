@@ -0,0 +1,71 @@
+import socket
+import sqlite3
+
+from app.core.ingest_jobs import JOB_STATUS_QUEUED, JOB_STATUS_RUNNING, IngestWorkerPool, JobStore
+
+
+def _running_job(tmp_path, claimed_by=None, updated_at="2000-01-01T00:00:00+00:00"):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = store.enqueue("listing-set", "analyst", str(tmp_path / "rows.json"), "json")
+    assert store.claim_next(max_running_per_user=1)["id"] == job["id"]
+    with store._connect() as conn:
+        if claimed_by is not None:
+            conn.execute("UPDATE ingest_jobs SET claimed_by = ? WHERE id = ?", (claimed_by, job["id"]))
+        conn.execute("UPDATE ingest_jobs SET updated_at = ? WHERE id = ?", (updated_at, job["id"]))
+    return store, job["id"]
+
+
+def test_live_worker_of_this_process_keeps_a_slow_job(tmp_path):
+    store, job_id = _running_job(tmp_path)
+
+    assert store.requeue_abandoned(stale_seconds=1) == []
+    assert store.get(job_id)["status"] == JOB_STATUS_RUNNING
+
+
+def test_own_jobs_are_recovered_at_startup(tmp_path):
+    store, job_id = _running_job(tmp_path)
+
+    assert store.requeue_abandoned(stale_seconds=1, at_startup=True) == [job_id]
+    assert store.get(job_id)["status"] == JOB_STATUS_QUEUED
+
+
+def test_jobs_of_a_dead_local_process_are_recovered(tmp_path):
+    # PIDs are below 2**22 on Linux, so this one is never alive.
+    store, job_id = _running_job(tmp_path, claimed_by=f"{socket.gethostname()}:{2 ** 30}", updated_at="2999-01-01T00:00:00+00:00")
+
+    assert store.requeue_abandoned(stale_seconds=600) == [job_id]
+
+
+def test_jobs_of_another_host_are_recovered_only_when_stale(tmp_path):
+    store, job_id = _running_job(tmp_path, claimed_by="elsewhere:123", updated_at="2999-01-01T00:00:00+00:00")
+    assert store.requeue_abandoned(stale_seconds=600) == []
+
+    with store._connect() as conn:
+        conn.execute("UPDATE ingest_jobs SET updated_at = ? WHERE id = ?", ("2000-01-01T00:00:00+00:00", job_id))
+    assert store.requeue_abandoned(stale_seconds=600) == [job_id]
+
+
+class _LockedStore:
+    """Raises "database is locked" on the first claims, then stops the pool."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.claims = 0
+        self.pool = None
+
+    def claim_next(self, max_running_per_user):
+        self.claims += 1
+        if self.claims <= self.failures:
+            raise sqlite3.OperationalError("database is locked")
+        self.pool._stop.set()
+        return None
+
+
+def test_worker_survives_a_locked_job_store():
+    store = _LockedStore(failures=2)
+    pool = IngestWorkerPool(store, workers=1, max_running_per_user=1, poll_interval=0.01)
+    store.pool = pool
+
+    pool._run()
+
+    assert store.claims == 3
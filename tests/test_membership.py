@@ -0,0 +1,48 @@
+from app.core import membership
+from app.core.membership import MembershipIndex
+
+
+def _index(monkeypatch, sets, max_bytes=1 << 20):
+    """MembershipIndex over `sets`: {listing_set_id: [subscriber phone numbers]}."""
+    monkeypatch.setattr(membership.listings_crud, "get_listing_set_versions", lambda db, owner, ids: {i: 1 for i in ids if i in sets})
+    monkeypatch.setattr(membership.graph_crud, "get_listing_set_members", lambda db, listing_set_id: {
+        "subscriber": sets[listing_set_id], "device": [], "tower": [],
+    })
+    return MembershipIndex(max_bytes)
+
+
+def _subscribers(entry):
+    return entry.decode("subscriber", entry.bitmaps["subscriber"].to_array())
+
+
+def test_least_recently_used_sets_are_evicted_past_the_budget(monkeypatch):
+    sets = {f"ls-{i}": [f"6{i:02d}{j:06d}" for j in range(100)] for i in range(4)}
+    probe = _index(monkeypatch, sets)
+    entry_bytes = probe.get(None, ["ls-0"], "analyst")["ls-0"].nbytes
+    index = _index(monkeypatch, sets, max_bytes=2 * entry_bytes)
+
+    for listing_set_id in ("ls-0", "ls-1", "ls-0", "ls-2"):
+        index.get(None, [listing_set_id], "analyst")
+
+    assert list(index._entries) == ["ls-0", "ls-2"]
+    assert index.stats()["size_bytes"] <= 2 * entry_bytes
+    assert index.stats()["evictions"] == 1
+
+
+def test_dictionaries_are_rebuilt_with_the_live_ids_in_order(monkeypatch):
+    monkeypatch.setattr(membership, "DICTIONARY_REBUILD_MIN_IDS", 10)
+    sets = {f"ls-{i}": [f"6{i:02d}{j:06d}" for j in range(20)] + ["699999999"] for i in range(6)}
+    probe = _index(monkeypatch, sets)
+    entry_bytes = probe.get(None, ["ls-0"], "analyst")["ls-0"].nbytes
+    index = _index(monkeypatch, sets, max_bytes=entry_bytes)
+
+    old = index.get(None, ["ls-0"], "analyst")["ls-0"]
+    for i in range(1, 6):
+        index.get(None, [f"ls-{i}"], "analyst")
+
+    assert index.stats()["dictionary_rebuilds"] >= 1
+    assert len(index.dictionaries["subscriber"]) <= membership.DICTIONARY_REBUILD_FACTOR * len(sets["ls-5"])
+    current = index.get(None, ["ls-5"], "analyst")["ls-5"]
+    assert _subscribers(current) == sorted(sets["ls-5"], key=lambda phone: phone != "699999999")
+    # A request holding an entry from before the rebuild still decodes it.
+    assert sorted(_subscribers(old)) == sorted(sets["ls-0"])
@@ -0,0 +1,111 @@
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.core.normalization import (
+    ACTIVITY_SCOPE_LISTING_SET,
+    TIMESTAMP_FORMAT,
+    ListingBatch,
+    clean_phone_numbers,
+    parse_coordinates,
+    parse_timestamps,
+)
+
+PHONE_NUMBERS = [
+    "699123456", "237699123456", "+237 699 12 34 56", "(237) 699-123-456", "00237699123456",
+    "2376", "237", "23", "", "   ", "abc", "6 99 12 34 56 ", "٦٩٩١٢٣٤٥٦", "237٦٩٩١٢٣٤٥٦", "69９1", "ORANGE", " MTN INFO ",
+]
+
+
+def _clean_phone_number(value: str, keep_text: bool) -> str:
+    """The row-at-a-time cleaning of scripts.ingest_data.normalize_listing_row."""
+    value = value.strip() if keep_text else "".join(filter(str.isdigit, value))
+    return value[3:] if value.startswith("237") else value
+
+
+def _batch(callers, recipients, timestamps, is_sms):
+    n = len(callers)
+    return ListingBatch(
+        caller=np.array(callers, dtype=str),
+        recipient=np.array(recipients, dtype=str),
+        timestamp=np.array(timestamps, dtype="datetime64[s]"),
+        duration_str=np.array(["SMS" if sms else "60" for sms in is_sms], dtype=object),
+        is_sms=np.array(is_sms, dtype=bool),
+        imei=np.full(n, "350000000000000", dtype=object),
+        location=np.full(n, "Site 1", dtype=object),
+        lon=np.full(n, np.nan),
+        lat=np.full(n, np.nan),
+    )
+
+
+def test_activity_buckets_count_every_participant_once():
+    rng = np.random.default_rng(3)
+    numbers = [f"6{i:08d}" for i in range(6)]
+    callers = rng.choice(numbers, 300).tolist()
+    recipients = rng.choice(numbers, 300).tolist()
+    timestamps = (np.datetime64("2024-03-01T00:00:00") + rng.integers(0, 6 * 3600, 300).astype("timedelta64[s]")).tolist()
+    is_sms = (rng.random(300) < 0.4).tolist()
+    assert any(caller == recipient for caller, recipient in zip(callers, recipients))
+
+    expected = Counter()
+    for caller, recipient, timestamp, sms in zip(callers, recipients, timestamps, is_sms):
+        hour = np.datetime64(timestamp, "h").astype("datetime64[s]").astype(str)
+        for scope in {ACTIVITY_SCOPE_LISTING_SET, caller, recipient}:
+            expected[(scope, hour, "sms" if sms else "calls")] += 1
+
+    columns = _batch(callers, recipients, timestamps, is_sms).activity_columns()
+    actual = Counter()
+    for scope, hour, calls, sms in zip(columns["scope"], columns["hour"], columns["calls"], columns["sms"]):
+        actual[(scope, hour, "calls")] += calls
+        actual[(scope, hour, "sms")] += sms
+
+    assert +actual == expected
+
+
+@pytest.mark.parametrize("keep_text", [False, True])
+def test_phone_cleaning_matches_the_row_path(keep_text):
+    values = np.array(PHONE_NUMBERS, dtype=str)
+
+    cleaned = clean_phone_numbers(values, np.full(len(values), keep_text))
+
+    assert cleaned.tolist() == [_clean_phone_number(value, keep_text) for value in PHONE_NUMBERS]
+
+
+def test_phone_cleaning_of_random_numbers_matches_the_row_path():
+    rng = np.random.default_rng(1)
+    alphabet = list("0123456789 +-()237") + ["٣", "A"]
+    values = ["".join(rng.choice(alphabet, rng.integers(0, 18))) for _ in range(2000)]
+    keep_text = rng.random(2000) < 0.1
+
+    cleaned = clean_phone_numbers(np.array(values, dtype=str), keep_text)
+
+    assert cleaned.tolist() == [_clean_phone_number(value, keep) for value, keep in zip(values, keep_text.tolist())]
+
+
+def test_timestamps_match_strptime():
+    values = [
+        "05/01/2024 10:30:00", "31/12/1999 23:59:59", "29/02/2024 00:00:00", "29/02/2023 00:00:00",
+        "31/04/2024 12:00:00", "5/1/2024 10:30:00", "05/13/2024 10:30:00", "05/01/2024 24:00:00",
+        "05-01-2024 10:30:00", "not a date", "",
+    ]
+
+    parsed, errors = parse_timestamps(np.array(values, dtype=str))
+
+    for value, timestamp, error in zip(values, parsed.tolist(), errors.tolist()):
+        try:
+            expected = datetime.strptime(value, TIMESTAMP_FORMAT)
+        except ValueError:
+            assert error is not None
+        else:
+            assert error is None and timestamp == expected
+
+
+def test_coordinates_are_read_from_the_location():
+    lon, lat = parse_coordinates(np.array([
+        "Site 1 Long: 11.5 Lat: 3.8 Azimut: 120", "Site 2 Long: x Lat: 3.8", "Site 3", "Long: -1.25 Lat: -2.5",
+    ], dtype=str))
+
+    assert lon[[0, 3]].tolist() == [11.5, -1.25] and lat[[0, 3]].tolist() == [3.8, -2.5]
+    assert np.isnan(lon[[1, 2]]).all() and np.isnan(lat[2])
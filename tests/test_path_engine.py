@@ -0,0 +1,131 @@
+import json
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.core.path_engine import (
+    STATUS_FOUND,
+    STATUS_MAX_DEPTH,
+    STATUS_NOT_FOUND,
+    STATUS_TIMEOUT,
+    PathSearchTimeout,
+    bidirectional_shortest_paths,
+)
+from app.routers import graph
+
+
+class _GraphAdjacency:
+    """AdjacencyProvider over an in-memory undirected graph."""
+
+    def __init__(self, edges):
+        self.adjacency = {}
+        for a, b in edges:
+            self.adjacency.setdefault(a, []).append(b)
+            self.adjacency.setdefault(b, []).append(a)
+
+    def neighbors(self, frontier, timeout):
+        return {node: self.adjacency[node] for node in frontier if node in self.adjacency}
+
+
+def _random_graph(seed, nodes=60, edges=90):
+    rng = np.random.default_rng(seed)
+    names = [f"6{i:08d}" for i in range(nodes)]
+    pairs = list(combinations(range(nodes), 2))
+    chosen = rng.choice(len(pairs), edges, replace=False)
+    return names, [(names[pairs[i][0]], names[pairs[i][1]]) for i in chosen]
+
+
+def _shortest_paths(adjacency, source, target):
+    """Every shortest path, from a plain BFS over the whole graph."""
+    distance, parents = {source: 0}, {source: []}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in adjacency.get(node, ()):
+            if neighbor not in distance:
+                distance[neighbor] = distance[node] + 1
+                parents[neighbor] = [node]
+                queue.append(neighbor)
+            elif distance[neighbor] == distance[node] + 1:
+                parents[neighbor].append(node)
+    if target not in distance:
+        return []
+
+    def walk(node):
+        if node == source:
+            return [[source]]
+        return [path + [node] for parent in parents[node] for path in walk(parent)]
+
+    return walk(target)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_paths_are_all_shortest_and_distinct(seed):
+    names, edges = _random_graph(seed)
+    provider = _GraphAdjacency(edges)
+    rng = np.random.default_rng(100 + seed)
+
+    for source, target in rng.choice(names, (15, 2)).tolist():
+        expected = _shortest_paths(provider.adjacency, source, target)
+        result = bidirectional_shortest_paths(provider, source, target, max_depth=20, k=5)
+        if not expected:
+            assert result.status == STATUS_NOT_FOUND and result.paths == []
+            continue
+        assert result.status == STATUS_FOUND
+        assert len(result.paths) == min(5, len(expected))
+        assert len({tuple(path) for path in result.paths}) == len(result.paths)
+        assert all(path in expected for path in result.paths)
+
+
+def test_max_depth_stops_the_search():
+    chain = [f"6{i:08d}" for i in range(8)]
+    provider = _GraphAdjacency(zip(chain, chain[1:]))
+
+    assert bidirectional_shortest_paths(provider, chain[0], chain[-1], max_depth=7).paths == [chain]
+    result = bidirectional_shortest_paths(provider, chain[0], chain[-1], max_depth=6)
+    assert result.status == STATUS_MAX_DEPTH and result.paths == []
+
+
+def test_timeout_reports_an_incomplete_search():
+    class _SlowAdjacency(_GraphAdjacency):
+        def neighbors(self, frontier, timeout):
+            raise PathSearchTimeout()
+
+    result = bidirectional_shortest_paths(_SlowAdjacency([("600000001", "600000002")]), "600000001", "600000002")
+
+    assert result.status == STATUS_TIMEOUT
+    assert not result.complete
+
+
+def test_same_source_and_target():
+    result = bidirectional_shortest_paths(_GraphAdjacency([]), "600000001", "600000001")
+
+    assert result.paths == [["600000001"]] and result.status == STATUS_FOUND
+
+
+def _shortest_path_endpoint(monkeypatch, edges, start_phone, end_phone):
+    provider = _GraphAdjacency(edges)
+    provider.missing = lambda phone_numbers: [phone for phone in phone_numbers if phone not in provider.adjacency]
+    monkeypatch.setattr(graph, "CypherContactAdjacency", lambda session: provider)
+    monkeypatch.setattr(graph.listings_crud, "get_listing_set_versions", lambda session: {})
+    monkeypatch.setattr(graph, "cached_response", lambda key, compute: json.loads(compute()))
+    return graph.get_shortest_path(start_phone, end_phone, "events", {"sub": "analyst"}, None)
+
+
+def test_shortest_path_route_runs_on_the_bounded_engine(monkeypatch):
+    chain = [f"6{i:08d}" for i in range(4)]
+    network = _shortest_path_endpoint(monkeypatch, list(zip(chain, chain[1:])), chain[0], chain[-1])
+
+    assert {node["properties"]["phoneNumber"] for node in network["nodes"]} == set(chain)
+    assert {edge["label"] for edge in network["edges"]} == {"CONTACTED"}
+
+
+def test_shortest_path_route_stops_at_the_default_depth(monkeypatch):
+    chain = [f"6{i:08d}" for i in range(graph.SHORTEST_PATH_MAX_DEPTH + 2)]
+
+    with pytest.raises(HTTPException) as error:
+        _shortest_path_endpoint(monkeypatch, list(zip(chain, chain[1:])), chain[0], chain[-1])
+    assert error.value.status_code == 404
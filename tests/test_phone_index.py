@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.core import phone_index as phone_index_module
+from app.core.phone_index import PhoneNumberIndex
+
+
+def test_prefix_and_suffix_lookups_match_a_scan():
+    rng = np.random.default_rng(9)
+    numbers = sorted({str(number) for number in 600000000 + rng.integers(0, 99999999, 3000)})
+    index = PhoneNumberIndex()
+    index.add(numbers[:1500])
+    index.add(numbers[1000:], ["ORANGE"])
+
+    for digits in ["6", "61", "6999", "12", "0000000", "ORA"]:
+        prefix, prefix_total = index.lookup(digits, "prefix", limit=5)
+        suffix, suffix_total = index.lookup(digits, "suffix", limit=5)
+        expected_prefix = sorted(n for n in numbers + ["ORANGE"] if n.startswith(digits))
+        expected_suffix = [n for n in numbers + ["ORANGE"] if n.endswith(digits)]
+        assert (prefix, prefix_total) == (expected_prefix[:5], len(expected_prefix))
+        assert suffix_total == len(expected_suffix)
+        assert set(suffix) <= set(expected_suffix) and len(suffix) == min(5, len(expected_suffix))
+
+
+def test_index_reloads_when_another_process_changed_the_data(monkeypatch):
+    data = {"version": (1, 1), "numbers": ["600000001"]}
+    monkeypatch.setattr(phone_index_module.listings_crud, "get_data_version", lambda db: data["version"])
+    monkeypatch.setattr(phone_index_module.graph_crud, "get_subscriber_phone_numbers", lambda db: data["numbers"])
+    monkeypatch.setattr(phone_index_module, "INDEX_REFRESH_SECONDS", 0)
+    index = PhoneNumberIndex()
+
+    index.ensure_loaded(None)
+    index.add(["600000002"])
+    assert index.lookup("6000")[0] == ["600000001", "600000002"]
+
+    data["version"] = (1, 4)
+    data["numbers"] = ["600000001", "600000002", "600000003"]
+    index.ensure_loaded(None)
+    assert index.lookup("6000")[0] == ["600000001", "600000002", "600000003"]
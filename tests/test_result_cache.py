@@ -0,0 +1,36 @@
+import os
+
+from app.core.result_cache import ResultCache, result_key
+
+
+def _spilled(directory):
+    return sorted(os.listdir(directory))
+
+
+def test_spill_files_live_in_a_per_process_directory(tmp_path):
+    cache = ResultCache(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=1000)
+    first, second = result_key("test", {"n": 1}, {}), result_key("test", {"n": 2}, {})
+
+    cache.put(first, b"0123456789")
+    cache.put(second, b"abcdefghij")
+
+    own = tmp_path / str(os.getpid())
+    assert _spilled(own) == [first.file_name]
+    assert cache.get(first) == b"0123456789"
+    # Reading it back moved `second` to disk in its place; no temporary file is left.
+    assert _spilled(own) == [second.file_name]
+
+
+def test_startup_keeps_the_files_of_other_live_processes(tmp_path):
+    live, dead = tmp_path / str(os.getppid()), tmp_path / str(2 ** 30)
+    for directory in (live, dead):
+        directory.mkdir()
+        (directory / "x.result").write_bytes(b"body")
+    (tmp_path / str(os.getpid())).mkdir()
+    (tmp_path / str(os.getpid()) / "old.result").write_bytes(b"body")
+
+    ResultCache(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=1000)
+
+    assert _spilled(live) == ["x.result"]
+    assert not dead.exists()
+    assert _spilled(tmp_path / str(os.getpid())) == []
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.models.listings import IngestionStatus
+from app.routers import workbench
+
+
+def _events(monkeypatch, statuses):
+    statuses = iter(statuses)
+    monkeypatch.setattr(workbench, "_read_ingestion_status", lambda listing_set_id, username: next(statuses))
+    monkeypatch.setattr(workbench, "STATUS_STREAM_INTERVAL_SECONDS", 0)
+
+    async def collect():
+        return [event async for event in workbench._ingestion_status_events("listing-set", "analyst")]
+
+    return asyncio.run(collect())
+
+
+def test_stream_ends_for_sets_without_an_ingestion_status(monkeypatch):
+    events = _events(monkeypatch, [IngestionStatus(listing_set_id="listing-set")])
+
+    assert len(events) == 1
+    assert events[0].startswith("event: progress")
+
+
+def test_stream_follows_ingestion_until_it_is_over(monkeypatch):
+    events = _events(monkeypatch, [
+        IngestionStatus(listing_set_id="listing-set", status="queued"),
+        IngestionStatus(listing_set_id="listing-set", status="running", rows_written=10),
+        IngestionStatus(listing_set_id="listing-set", status="running", rows_written=10),
+        IngestionStatus(listing_set_id="listing-set", status="completed", rows_written=20),
+    ])
+
+    assert [event.split("\n")[0] for event in events] == ["event: progress"] * 3
+    assert '"status":"completed"' in events[-1]
+
+
+def test_stream_reports_a_deleted_set(monkeypatch):
+    events = _events(monkeypatch, [IngestionStatus(listing_set_id="listing-set", status="running"), None])
+
+    assert events[-1].startswith("event: error")
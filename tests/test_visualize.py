@@ -0,0 +1,55 @@
+import base64
+import json
+from contextlib import contextmanager
+
+import pytest
+
+from app.routers import workbench
+
+
+class _Session:
+    def __init__(self, records):
+        self.records = records
+
+    def run(self, query, **params):
+        return iter(self.records)
+
+
+def _chunks(monkeypatch, records):
+    @contextmanager
+    def get_session():
+        yield _Session(records)
+
+    monkeypatch.setattr(workbench.db_manager, "get_session", get_session)
+    return list(workbench._visualize_chunks("analyst", ["listing-set"], None, None, "start", "end"))
+
+
+@pytest.mark.parametrize("rows", [0, 1, 3, 7])
+def test_visualize_streams_a_json_array_in_chunks(monkeypatch, rows):
+    monkeypatch.setattr(workbench, "VISUALIZE_PAGE_SIZE", 3)
+    records = [{"listing": [["caller_num", str(i)], ["type", "CALL"]]} for i in range(rows)]
+
+    chunks = _chunks(monkeypatch, records)
+
+    assert json.loads(b"".join(chunks)) == [{"caller_num": str(i), "type": "CALL"} for i in range(rows)]
+    assert len(chunks) == rows // 3 + 1
+
+
+def test_visualize_fields_exclude_deduplication_internals():
+    assert not set(workbench.INTERNAL_COMMUNICATION_FIELDS) & set(workbench.VISUALIZE_FIELDS)
+    with pytest.raises(workbench.HTTPException) as error:
+        workbench._visualize_fields(["caller_num", "dedup_key"])
+    assert error.value.status_code == 422
+
+
+def test_cursor_round_trips_nanosecond_timestamps():
+    cursor = workbench._encode_cursor("2024-01-05T10:00:00.123456789Z", "4:abc:12")
+
+    assert workbench._decode_cursor(cursor) == ["2024-01-05T10:00:00.123456789Z", "4:abc:12"]
+
+
+@pytest.mark.parametrize("payload", [b"not json", b'["yesterday", "4:abc:12"]', b'[12, "4:abc:12"]', b'["2024-01-05"]'])
+def test_malformed_cursors_are_rejected(payload):
+    with pytest.raises(workbench.HTTPException) as error:
+        workbench._decode_cursor(base64.urlsafe_b64encode(payload).decode("ascii"))
+    assert error.value.status_code == 422